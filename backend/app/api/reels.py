@@ -1,6 +1,8 @@
 """Reels routes"""
 
+import os
 from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi.responses import FileResponse
 from sqlalchemy.orm import Session
 from app.core.database import get_db
 from app.models import Reel, Video
@@ -69,6 +71,42 @@ async def get_reel_details(
     return reel
 
 
+@router.get("/{reel_id}/preview")
+async def get_reel_preview(
+    reel_id: str,
+    db: Session = Depends(get_db)
+):
+    """Stream the reel's low-resolution preview proxy (falls back to the full reel)"""
+    reel = db.query(Reel).filter_by(id=reel_id).first()
+    
+    if not reel:
+        raise HTTPException(status_code=404, detail="Reel not found")
+    
+    path = reel.preview_path if reel.preview_path and os.path.exists(reel.preview_path) else reel.file_path
+    if not path or not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Reel file not found")
+    
+    return FileResponse(path, media_type="video/mp4")
+
+
+@router.get("/{reel_id}/sprite")
+async def get_reel_sprite(
+    reel_id: str,
+    db: Session = Depends(get_db)
+):
+    """Get the reel's scrub sprite sheet; the grid layout is in sprite_sheet on the reel details"""
+    reel = db.query(Reel).filter_by(id=reel_id).first()
+    
+    if not reel:
+        raise HTTPException(status_code=404, detail="Reel not found")
+    
+    path = (reel.sprite_sheet or {}).get('path')
+    if not path or not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Sprite sheet not found")
+    
+    return FileResponse(path, media_type="image/jpeg")
+
+
 @router.post("/{reel_id}/publish")
 async def publish_reel(
     reel_id: str,
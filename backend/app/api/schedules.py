@@ -4,10 +4,13 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from sqlalchemy import and_
 from datetime import datetime
+from typing import Optional
+from app.core.config import get_settings
 from app.db.database import get_db
 from app.models.instagram_account import InstagramAccount, AccountStatus
 from app.models.reel_schedule import ReelSchedule, ScheduleStatus
 from app.models.reel import Reel
+from app.services.fingerprints import ReelPrint, load_fingerprint_index
 from app.schemas.reel_schedule import (
     ReelScheduleCreate,
     ReelScheduleUpdate,
@@ -17,6 +20,32 @@ from app.schemas.reel_schedule import (
 )
 
 router = APIRouter(prefix="/schedules", tags=["Reel Schedules"])
+settings = get_settings()
+
+# Schedules that still hold a reel's slot on an account
+ACTIVE_STATUSES = [ScheduleStatus.SCHEDULED, ScheduleStatus.READY_FOR_UPLOAD, ScheduleStatus.UPLOADED]
+
+
+def _scheduled_duplicate(db: Session, reel: Reel, instagram_account_id: int) -> Optional[ReelSchedule]:
+    """Active schedule on the account for another reel with the same content (by fingerprint), if any"""
+    if not settings.reel_fingerprints or not reel.fingerprint:
+        return None
+    index = load_fingerprint_index(db)
+    if not index:
+        return None
+    
+    fingerprint = ReelPrint.decode(reel.fingerprint.frame_hashes, reel.fingerprint.audio_codes)
+    matches = [reel_id for reel_id, _ in index.duplicates(fingerprint, exclude={reel.id})]
+    if not matches:
+        return None
+    
+    return db.query(ReelSchedule).filter(
+        and_(
+            ReelSchedule.reel_id.in_(matches),
+            ReelSchedule.instagram_account_id == instagram_account_id,
+            ReelSchedule.status.in_(ACTIVE_STATUSES)
+        )
+    ).first()
 
 
 @router.post("", response_model=ReelScheduleResponse, status_code=status.HTTP_201_CREATED)
@@ -55,11 +84,7 @@ async def create_schedule(
     existing = db.query(ReelSchedule).filter(
         and_(
             ReelSchedule.reel_id == schedule_data.reel_id,
-            ReelSchedule.status.in_([
-                ScheduleStatus.SCHEDULED,
-                ScheduleStatus.READY_FOR_UPLOAD,
-                ScheduleStatus.UPLOADED
-            ])
+            ReelSchedule.status.in_(ACTIVE_STATUSES)
         )
     ).first()
     
@@ -69,6 +94,15 @@ async def create_schedule(
             detail=f"Reel {schedule_data.reel_id} is already scheduled (schedule_id: {existing.id})"
         )
     
+    # Same clip from another reel (e.g. a re-upload of the video under a new URL)
+    duplicate = _scheduled_duplicate(db, reel, account.id)
+    if duplicate:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Reel {schedule_data.reel_id} repeats reel {duplicate.reel_id}, already scheduled on "
+                   f"'{account.username}' (schedule_id: {duplicate.id})"
+        )
+    
     # TODO: Get user_id from auth
     user_id = 1
     
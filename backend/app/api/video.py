@@ -1,12 +1,15 @@
-from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi import APIRouter, HTTPException, Depends, Query, Body
+from typing import Optional
 from sqlalchemy.orm import Session
 from app.core.database import get_db
 from app.models import Video, Reel
-from app.schemas import VideoCreate, VideoResponse, VideoDetailResponse, SocialStatusResponse
+from app.schemas import VideoCreate, VideoResponse, VideoDetailResponse, VideoSelection, SocialStatusResponse
 from app.services.youtube_downloader import YouTubeDownloader
 from app.core.config import get_settings
+import asyncio
 import uuid
 from datetime import datetime
+from pathlib import Path
 
 settings = get_settings()
 router = APIRouter(prefix="/api/video", tags=["video"])
@@ -41,6 +44,7 @@ async def upload_youtube_video(
             youtube_video_id=video_id,
             title="Processing...",
             custom_caption=request.custom_caption,
+            video_metadata=_selection_metadata(request),
             status="pending",
             created_at=datetime.utcnow()
         )
@@ -83,14 +87,23 @@ async def list_videos(
 @router.post("/{video_id}/process")
 async def process_video(
     video_id: str,
+    selection: Optional[VideoSelection] = Body(None),
     db: Session = Depends(get_db)
 ):
-    """Trigger video processing pipeline"""
+    """
+    Trigger video processing pipeline
+    
+    An optional body limits processing to time ranges and/or the first N reels;
+    otherwise the selection given at upload (if any) is used.
+    """
     video = db.query(Video).filter_by(id=video_id).first()
     
     if not video:
         raise HTTPException(status_code=404, detail="Video not found")
     
+    if selection is not None:
+        video.video_metadata = {**(video.video_metadata or {}), **_selection_metadata(selection)}
+    
     # Update status to processing
     video.status = "processing"
     db.commit()
@@ -122,6 +135,10 @@ async def process_video(
                 video_local.description = metadata.get("description", "")[:500] if metadata.get("description") else None
                 video_local.duration = int(metadata.get("duration", 0)) if metadata.get("duration") else None
                 video_local.thumbnail_url = metadata.get("thumbnail")
+                if video_local.duration:
+                    video_local.video_metadata = _plan_selection(
+                        video_local.video_metadata, video_local.duration, video_local.youtube_video_id,
+                    )
                 video_local.status = "completed"
             else:
                 video_local.status = "failed"
@@ -142,10 +159,48 @@ async def process_video(
     return {
         "video_id": video_id,
         "status": "processing",
+        "selection": (video.video_metadata or {}).get("selection"),
         "message": "Video processing started"
     }
 
 
+def _selection_metadata(selection: VideoSelection) -> dict:
+    """video_metadata entry recording which part of the video to process"""
+    if not selection.time_ranges and not selection.max_reels:
+        return {"selection": None}
+    return {
+        "selection": {
+            "time_ranges": [time_range.model_dump() for time_range in selection.time_ranges or []],
+            "max_reels": selection.max_reels,
+        }
+    }
+
+
+def _plan_selection(video_metadata: Optional[dict], duration: float, youtube_video_id: str) -> Optional[dict]:
+    """
+    Add the chunk numbers the selection covers, numbered as in the full-video plan
+    
+    Uses the same planner as the processing jobs. Before the download there is
+    no source to analyse, so the preview uses the uniform grid without storing
+    it; the jobs snap the boundaries later, within boundary_tolerance, keeping
+    the chunk count and numbering.
+    """
+    selection = (video_metadata or {}).get("selection")
+    if not selection:
+        return video_metadata
+    
+    from app.services.video_service import VideoProcessingService
+    video_service = VideoProcessingService()
+    video_dir = Path(video_service.storage_base) / youtube_video_id
+    plan = asyncio.run(video_service.plan_video_chunks(video_dir, duration, str(video_dir / f"{youtube_video_id}.mp4")))
+    selected = video_service.select_chunks(
+        plan,
+        selection.get("time_ranges"),
+        selection.get("max_reels"),
+    )
+    return {**video_metadata, "selection": {**selection, "chunk_numbers": [chunk["chunk_number"] for chunk in selected]}}
+
+
 @router.get("/{video_id}/status")
 async def get_video_status(
     video_id: str,
@@ -49,8 +49,28 @@ class Settings(BaseSettings):
     # Storage & Files
     videos_dir: str = os.getenv("VIDEOS_DIR", "./videos")
     chunk_duration: int = 35
+    # Extra analysis passes below are opt-in (env, e.g. BOUNDARY_SNAPPING=true), so a default render costs one encode per reel
+    boundary_snapping: bool = False  # move chunk boundaries onto nearby scene cuts / pauses (one analysis decode per source)
+    boundary_tolerance: float = 3.0  # seconds a boundary may move from the chunk_duration grid
+    highlight_top_k: int = 0  # 0 = a reel per chunk; N = only the N best-scoring windows (audio, speech, motion)
     reel_width: int = 1080
     reel_height: int = 1920
+    reel_layout: str = os.getenv("REEL_LAYOUT", "pad")  # pad (black bars) | blur (blurred background fill) | crop (smart crop following the action)
+    reel_aspects: str = os.getenv("REEL_ASPECTS", "9:16")  # e.g. "9:16,4:5,1:1"; first is the reel, the rest are variants
+    burn_captions: bool = False  # burn the yt-dlp transcript into reels
+    caption_style: str = os.getenv("CAPTION_STYLE", "bold")  # bold | boxed | minimal
+    bumper_intro_path: str = os.getenv("BUMPER_INTRO_PATH", "")  # brand intro joined before every reel, "" = none
+    bumper_outro_path: str = os.getenv("BUMPER_OUTRO_PATH", "")  # brand outro joined after every reel, "" = none
+    reel_covers: bool = False  # extract a cover + thumbnail per reel after rendering (one decode per video)
+    cover_format: str = os.getenv("COVER_FORMAT", "jpg")  # jpg | webp
+    thumbnail_width: int = 270  # px; covers keep the reel size
+    reel_previews: bool = False  # also write a low-res preview proxy + scrub sprite sheet from the render decode
+    preview_width: int = 360  # px; 360x640 for 9:16 reels
+    sprite_columns: int = 5
+    sprite_rows: int = 5
+    sprite_tile_width: int = 108  # px per sprite tile
+    reel_fingerprints: bool = False  # fingerprint reels and skip ranges / schedules that repeat an existing reel
+    quality_scoring: bool = False  # measure each reel's quality_score from its frames and audio (one sampled decode)
     
     # Tools
     yt_dlp_path: str = os.getenv("YT_DLP_PATH", "yt-dlp")
@@ -72,13 +92,47 @@ class Settings(BaseSettings):
     # FFmpeg
     ffprobe_path: str = os.getenv("FFPROBE_PATH", "ffprobe")
     
+    # Subprocess concurrency caps per binary (0 = number of CPU cores)
+    ffmpeg_max_concurrency: int = int(os.getenv("FFMPEG_MAX_CONCURRENCY", 0))
+    ffprobe_max_concurrency: int = int(os.getenv("FFPROBE_MAX_CONCURRENCY", 8))
+    yt_dlp_max_concurrency: int = int(os.getenv("YT_DLP_MAX_CONCURRENCY", 2))
+    
+    # Media probe cache (in-process LRU + Redis)
+    media_probe_cache_size: int = 512
+    media_probe_cache_ttl: int = 7 * 24 * 3600  # seconds
+    
     # Video Processing
-    video_quality: str = "high"
+    video_quality: str = "high"  # low | medium | high: highest encoder profile automatic selection may pick
+    encoder_profile: str = os.getenv("ENCODER_PROFILE", "auto")  # auto (from source resolution/bitrate) | draft | standard | archival
     max_video_size_mb: int = 500
+    chunking_mode: str = os.getenv("CHUNKING_MODE", "segment")  # segment (single pass) | per_chunk | smart (copy GOP interiors)
+    ingest_mode: str = os.getenv("INGEST_MODE", "batch")  # batch | progressive (cut while downloading)
+    download_format_mode: str = os.getenv("DOWNLOAD_FORMAT_MODE", "auto")  # auto (smallest source covering the reel) | best
+    
+    # Loudness (EBU R128 measured once per source, linear loudnorm in each reel encode; opt-in, one extra audio decode)
+    loudness_normalization: bool = False
+    loudness_target: float = -14.0  # integrated LUFS
+    loudness_true_peak: float = -1.5  # dBTP ceiling
+    loudness_range: float = 11.0  # target LRA in LU, raised to the measured LRA to keep loudnorm linear
+    
+    # Artifact cache (content-addressed chunks/reels on the storage volume)
+    artifact_cache_enabled: bool = True
+    artifact_cache_dir: str = os.getenv("ARTIFACT_CACHE_DIR", "")  # default: <storage_base_path>/.artifact_cache
+    artifact_cache_max_gb: float = float(os.getenv("ARTIFACT_CACHE_MAX_GB", 20))
+    
+    # Parallel Encoding
+    encode_cpu_budget: int = int(os.getenv("ENCODE_CPU_BUDGET", 0))  # cores shared by all ffmpeg jobs, 0 = all cores
+    encode_max_parallel: int = int(os.getenv("ENCODE_MAX_PARALLEL", 0))  # concurrent ffmpeg jobs, 0 = derive from budget
+    encode_threads_per_job: int = 4  # used to derive encode_max_parallel when it is 0
+    
+    # Streaming pipeline (render -> AI metadata)
+    pipeline_queue_size: int = 4  # rendered reels waiting for AI metadata before rendering pauses
+    pipeline_ai_concurrency: int = 2  # concurrent Gemini calls
     
     # Job Configuration
     max_retries: int = 3
     job_timeout: int = 3600
+    checkpoint_duration_tolerance: float = 0.5  # seconds a checkpointed output may differ from its expected duration
     queue_name: str = "default"
     
     # Celery
@@ -2,7 +2,7 @@
 
 from app.models.user import User
 from app.models.video import Video, VideoChunk
-from app.models.reel import Reel, InstagramToken, ReelQuality
+from app.models.reel import Reel, ReelVariant, ReelFingerprint, InstagramToken, ReelQuality
 from app.models.video_job import VideoJob, JobStatus
 from app.models.instagram_account import InstagramAccount, AccountStatus
 from app.models.reel_schedule import ReelSchedule, ScheduleStatus
@@ -13,6 +13,8 @@ __all__ = [
     "Video",
     "VideoChunk",
     "Reel",
+    "ReelVariant",
+    "ReelFingerprint",
     "InstagramToken",
     "ReelQuality",
     "VideoJob",
@@ -26,14 +26,19 @@ class Reel(Base, IDMixin, TimestampMixin):
     file_path = Column(String(500), nullable=False)  # 1080x1920 vertical video
     file_size = Column(Integer, nullable=True)  # in bytes
     duration = Column(Float, nullable=False)  # in seconds
+    cover_path = Column(String(500), nullable=True)  # cover frame at reel size (jpg/webp)
+    thumbnail_path = Column(String(500), nullable=True)  # small copy of the cover for listings
+    preview_path = Column(String(500), nullable=True)  # low-res, low-bitrate proxy for reviewing
+    sprite_sheet = Column(JSON, nullable=True)  # {"path", "columns", "rows", "interval", "tile_width", "tile_height"}
     
     # AI Generated Metadata
     title = Column(String(500), nullable=True)
     caption = Column(Text, nullable=True)
     hashtags = Column(JSON, nullable=True)  # ["#hashtag1", "#hashtag2"]
     topics = Column(JSON, nullable=True)  # ["topic1", "topic2"]
-    quality_score = Column(Float, nullable=True)  # 0.0 - 1.0
+    quality_score = Column(Float, nullable=True)  # 0.0 - 1.0, measured from the rendered reel
     quality_grade = Column(Enum(ReelQuality), nullable=True)
+    quality_metrics = Column(JSON, nullable=True)  # {"sharpness", "black_ratio", "activity", "silence_ratio", "loudness", "score"}
     
     # Instagram Upload
     instagram_post_id = Column(String(100), unique=True, nullable=True, index=True)
@@ -44,11 +49,46 @@ class Reel(Base, IDMixin, TimestampMixin):
     # Relationships
     video = relationship("Video", back_populates="reels")
     chunk = relationship("VideoChunk", back_populates="reels")
+    variants = relationship("ReelVariant", back_populates="reel", cascade="all, delete-orphan")
+    fingerprint = relationship("ReelFingerprint", back_populates="reel", uselist=False, cascade="all, delete-orphan")
     
     def __repr__(self):
         return f"<Reel(id={self.id}, video_id={self.video_id}, is_uploaded={self.is_uploaded})>"
 
 
+class ReelVariant(Base, IDMixin, TimestampMixin):
+    """Same reel rendered at another aspect ratio (4:5 feed post, 1:1 square, ...)"""
+    __tablename__ = "reel_variants"
+    
+    reel_id = Column(Integer, ForeignKey("reels.id"), nullable=False, index=True)
+    aspect = Column(String(20), nullable=False)  # "4:5", "1:1"
+    width = Column(Integer, nullable=False)
+    height = Column(Integer, nullable=False)
+    file_path = Column(String(500), nullable=False)
+    file_size = Column(Integer, nullable=True)  # in bytes
+    
+    # Relationships
+    reel = relationship("Reel", back_populates="variants")
+    
+    def __repr__(self):
+        return f"<ReelVariant(reel_id={self.reel_id}, aspect={self.aspect}, {self.width}x{self.height})>"
+
+
+class ReelFingerprint(Base, IDMixin, TimestampMixin):
+    """Perceptual fingerprint of a reel's source range, for spotting repeats (see app.services.fingerprints)"""
+    __tablename__ = "reel_fingerprints"
+    
+    reel_id = Column(Integer, ForeignKey("reels.id"), nullable=False, unique=True, index=True)
+    frame_hashes = Column(Text, nullable=False)  # 16 hex digits (64-bit dHash) per second, dashes for flat frames
+    audio_codes = Column(Text, nullable=True)  # 2 hex digits per second, dashes for silence
+    
+    # Relationships
+    reel = relationship("Reel", back_populates="fingerprint")
+    
+    def __repr__(self):
+        return f"<ReelFingerprint(reel_id={self.reel_id}, seconds={len(self.frame_hashes or '') // 16})>"
+
+
 class InstagramToken(Base, IDMixin, TimestampMixin):
     """Instagram and Facebook access token storage"""
     __tablename__ = "instagram_tokens"
@@ -119,6 +159,7 @@ class Job(Base, IDMixin, TimestampMixin):
     progress = Column(Float, default=0.0)  # 0-100
     total_steps = Column(Integer, nullable=True)
     completed_steps = Column(Integer, nullable=True)
+    checkpoint = Column(JSON, nullable=True)  # {"vertical_conversion": {"<chunk_number>": {...output...}}}
     
     # Results
     result = Column(JSON, nullable=True)
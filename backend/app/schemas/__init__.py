@@ -1,6 +1,6 @@
 """Pydantic schemas for request/response validation"""
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, model_validator
 from datetime import datetime
 from typing import Optional, List
 
@@ -11,7 +11,24 @@ class VideoBase(BaseModel):
     custom_caption: Optional[str] = None
 
 
-class VideoCreate(VideoBase):
+class TimeRange(BaseModel):
+    start: float = Field(..., ge=0)  # seconds
+    end: float = Field(..., gt=0)  # seconds
+    
+    @model_validator(mode='after')
+    def validate_order(self):
+        if self.end <= self.start:
+            raise ValueError('Time range end must be after start')
+        return self
+
+
+class VideoSelection(BaseModel):
+    """Process only part of a video; chunks keep their full-video numbering"""
+    time_ranges: Optional[List[TimeRange]] = None
+    max_reels: Optional[int] = Field(None, ge=1)
+
+
+class VideoCreate(VideoBase, VideoSelection):
     pass
 
 
@@ -68,9 +85,14 @@ class ReelResponse(BaseModel):
     caption: str
     hashtags: str
     topics: str
-    quality_score: float
+    quality_score: Optional[float] = None
+    quality_metrics: Optional[dict] = None
     publish_status: str
     ig_media_id: Optional[str] = None
+    cover_path: Optional[str] = None
+    thumbnail_path: Optional[str] = None
+    preview_path: Optional[str] = None
+    sprite_sheet: Optional[dict] = None
     created_at: datetime
 
     class Config:
@@ -31,11 +31,16 @@ class ReelResponse(BaseModel):
     reel_number: int
     file_path: str
     duration: float
+    cover_path: Optional[str] = None
+    thumbnail_path: Optional[str] = None
+    preview_path: Optional[str] = None
+    sprite_sheet: Optional[dict] = None
     title: Optional[str]
     caption: Optional[str]
     hashtags: Optional[List[str]]
     topics: Optional[List[str]]
     quality_score: Optional[float]
+    quality_metrics: Optional[dict] = None
     is_uploaded: bool
     instagram_url: Optional[str]
 
@@ -0,0 +1,176 @@
+"""Content-addressed cache for pipeline artifacts (chunks, reels)"""
+
+import asyncio
+import hashlib
+import json
+import os
+import shutil
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+from app.core.config import get_settings
+from app.utils.helpers import get_logger
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+HASH_BLOCK_SIZE = 4 * 1024 * 1024  # 4 MiB reads when hashing large sources
+EVICT_LOW_WATER = 0.9  # eviction trims the cache to this fraction of max_bytes, so scans stay rare
+
+
+class ArtifactCache:
+    """
+    Cache encoded artifacts by a hash of everything that determines their bytes
+    
+    Keys combine the input file digest with the stage parameters (time range,
+    filter graph, encoder arguments). A hit hard-links the cached file to the
+    requested output path, so ffmpeg is skipped entirely. The cache directory is
+    kept under artifact_cache_max_gb by evicting the least recently used files.
+    
+    The cache size is tracked as a running total (one directory scan per
+    process, then one per eviction), so storing an artifact costs O(1).
+    """
+    
+    def __init__(self, root: Optional[str] = None, max_bytes: Optional[int] = None):
+        self.root = Path(root or settings.artifact_cache_dir or Path(settings.storage_base_path) / ".artifact_cache")
+        self.objects_dir = self.root / "objects"
+        self.digests_dir = self.root / "digests"
+        self.max_bytes = max_bytes or int(settings.artifact_cache_max_gb * 1024 ** 3)
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        self.digests_dir.mkdir(parents=True, exist_ok=True)
+        self._digests: Dict[Tuple[str, int, int], str] = {}
+        self._lock = threading.Lock()
+        self._size: Optional[int] = None  # bytes in objects_dir as of the last scan, plus stores since
+    
+    async def file_digest(self, path: str) -> str:
+        """SHA-256 of a file, streamed in blocks and memoized by (path, size, mtime)"""
+        return await asyncio.to_thread(self._file_digest, path)
+    
+    def _file_digest(self, path: str) -> str:
+        stat = os.stat(path)
+        real_path = os.path.realpath(path)
+        memo_key = (real_path, stat.st_size, stat.st_mtime_ns)
+        
+        with self._lock:
+            if memo_key in self._digests:
+                return self._digests[memo_key]
+        
+        # Persisted digest so other worker processes do not re-hash the same source
+        sidecar = self.digests_dir / f"{hashlib.sha1(real_path.encode()).hexdigest()}.json"
+        try:
+            saved = json.loads(sidecar.read_text())
+            if saved.get('size') == stat.st_size and saved.get('mtime_ns') == stat.st_mtime_ns:
+                digest = saved['sha256']
+                with self._lock:
+                    self._digests[memo_key] = digest
+                return digest
+        except (OSError, ValueError, KeyError):
+            pass
+        
+        sha = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+                sha.update(block)
+        digest = sha.hexdigest()
+        
+        sidecar.write_text(json.dumps({'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': digest}))
+        with self._lock:
+            self._digests[memo_key] = digest
+        return digest
+    
+    def make_key(self, kind: str, **parts: Any) -> str:
+        """Stable key from a stage name and its JSON-serialisable parameters"""
+        payload = json.dumps({'kind': kind, **parts}, sort_keys=True, separators=(',', ':'), default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+    
+    def _object_path(self, key: str, suffix: str) -> Path:
+        return self.objects_dir / key[:2] / f"{key}{suffix}"
+    
+    def fetch(self, key: str, output_path: str) -> bool:
+        """Materialise a cached artifact at output_path. Returns False on a miss."""
+        cached = self._object_path(key, Path(output_path).suffix)
+        if not cached.exists():
+            return False
+        
+        try:
+            os.utime(cached)  # Mark as recently used for LRU eviction
+            self._place(cached, Path(output_path))
+            return True
+        except OSError as e:
+            logger.warning(f"Artifact cache fetch failed for {key}: {str(e)}")
+            return False
+    
+    def store(self, key: str, output_path: str) -> None:
+        """Add a freshly written artifact to the cache, then enforce the size limit"""
+        cached = self._object_path(key, Path(output_path).suffix)
+        try:
+            if cached.exists():
+                return
+            cached.parent.mkdir(parents=True, exist_ok=True)
+            tmp = cached.with_name(cached.name + f".tmp{os.getpid()}")
+            self._place(Path(output_path), tmp)
+            os.replace(tmp, cached)
+            
+            added = cached.stat().st_size
+            with self._lock:
+                if self._size is not None:
+                    self._size += added
+                over = self._size is None or self._size > self.max_bytes
+            if over:
+                self.evict()
+        except OSError as e:
+            logger.warning(f"Artifact cache store failed for {key}: {str(e)}")
+    
+    def _place(self, src: Path, dest: Path) -> None:
+        """Hard-link src to dest (same volume), falling back to a copy"""
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        dest.unlink(missing_ok=True)
+        try:
+            os.link(src, dest)
+        except OSError:
+            shutil.copyfile(src, dest)
+    
+    def evict(self) -> int:
+        """
+        Rescan the cache and, if it is over max_bytes, delete least recently used
+        artifacts down to EVICT_LOW_WATER of it. Returns bytes freed.
+        
+        The rescan also picks up artifacts other worker processes stored since.
+        """
+        entries = []
+        total = 0
+        for shard in self.objects_dir.iterdir():
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard):
+                if entry.is_file():
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    total += stat.st_size
+        
+        if total <= self.max_bytes:
+            with self._lock:
+                self._size = total
+            return 0
+        
+        freed = 0
+        target = int(self.max_bytes * EVICT_LOW_WATER)
+        for _, size, path in sorted(entries):
+            if total - freed <= target:
+                break
+            try:
+                os.remove(path)
+                freed += size
+            except OSError:
+                pass
+        
+        with self._lock:
+            self._size = total - freed
+        logger.info(f"Artifact cache evicted {freed} bytes ({total} -> {total - freed})")
+        return freed
+
+
+@lru_cache()
+def get_artifact_cache() -> ArtifactCache:
+    return ArtifactCache()
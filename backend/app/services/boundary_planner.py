@@ -0,0 +1,170 @@
+"""Chunk boundaries snapped to scene cuts and pauses found by the source analysis pass"""
+
+import os
+from pathlib import Path
+from typing import Dict, List, Optional
+from app.core.config import get_settings
+from app.services.source_analysis import SourceAnalysis, SourceAnalyzer
+from app.utils.helpers import get_logger, load_json, save_json
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+PLAN_FILE = "chunk_plan.json"
+DURATION_SLACK = 1.0  # seconds between a stored plan's duration and the caller's (metadata vs probed) that still reuse it
+SOURCE_MISSING = "the source is not on disk to analyse yet"
+
+
+def snapped_boundaries(analysis: SourceAnalysis, total_duration: float, chunk_duration: float,
+                       tolerance: float) -> List[float]:
+    """
+    End time of every chunk: the uniform grid, each inner boundary snapped
+
+    Boundaries stay within tolerance of k * chunk_duration, so the chunk count
+    (and numbering) is the same as an unsnapped plan.
+    """
+    ends = []
+    previous = 0.0
+    grid = chunk_duration
+    while grid < total_duration:
+        # Keep every chunk, including the last, at least half a chunk long
+        low = max(previous + chunk_duration / 2, grid - tolerance)
+        high = min(total_duration - min(chunk_duration / 2, (total_duration - grid) / 2), grid + tolerance)
+        end = analysis.snap(grid, tolerance, low, high)
+        ends.append(end)
+        previous = end
+        grid += chunk_duration
+    ends.append(total_duration)
+    return ends
+
+
+def uniform_boundaries(total_duration: float, chunk_duration: float) -> List[float]:
+    """End time of every chunk of the plain k * chunk_duration grid"""
+    ends = []
+    grid = chunk_duration
+    while grid < total_duration:
+        ends.append(grid)
+        grid += chunk_duration
+    ends.append(total_duration)
+    return ends
+
+
+def fit_boundaries(ends: List[float], total_duration: float) -> List[float]:
+    """
+    Stored chunk ends fitted to a slightly different duration
+
+    Inner boundaries are kept as they are (those at or past the new end are
+    dropped), and the last chunk ends at total_duration.
+    """
+    return [end for end in ends[:-1] if end < total_duration] + [total_duration]
+
+
+class BoundaryPlanner:
+    """
+    Snap chunk boundaries to the scene cuts and pauses of a source
+
+    The analysis comes from SourceAnalyzer and is stored next to the source, so
+    re-planning with another chunk length or tolerance costs no decode.
+    """
+
+    def __init__(self, ffmpeg_path: Optional[str] = None, ffprobe_path: Optional[str] = None):
+        self.analyzer = SourceAnalyzer(ffmpeg_path, ffprobe_path)
+
+    async def boundaries(self, media_path: str, total_duration: float, chunk_duration: float,
+                         tolerance: Optional[float] = None) -> List[float]:
+        """
+        Snapped end time of every chunk of the source
+
+        Falls back to the uniform grid when the analysis fails.
+        """
+        tolerance = settings.boundary_tolerance if tolerance is None else tolerance
+        analysis = await self.analyzer.analyze(media_path)
+        if not analysis or tolerance <= 0:
+            analysis = SourceAnalysis(duration=total_duration)
+        return snapped_boundaries(analysis, total_duration, chunk_duration, tolerance)
+
+    async def video_boundaries(self, video_dir: Path, total_duration: float, chunk_duration: float,
+                               media_path: Optional[str] = None, cutting: bool = False) -> List[float]:
+        """
+        Chunk end times of a video, the same for every mode that plans it
+
+        Batch and progressive cutting, section downloads and the selection preview
+        all come here. A plan is stored in <video_dir>/chunk_plan.json together
+        with the snapping settings it was made with, and later calls with the same
+        chunk length and settings reuse it, fitted to their duration, so
+        boundaries and numbering never depend on which mode ran first. A stored
+        plan for other settings or a duration more than DURATION_SLACK away is
+        replaced.
+
+        A new plan is snapped when boundary_snapping is on and media_path is on
+        disk to analyse; otherwise it is the uniform grid, and the log says why.
+        A uniform plan made only because the source isn't there yet (the API
+        preview) is not stored, so the first run with the source snaps it;
+        cutting=True (progressive cutting, section downloads) stores it anyway,
+        as its chunks are cut right away and later modes must match them.
+        """
+        plan_path = Path(video_dir) / PLAN_FILE
+        stored = load_json(str(plan_path)) if plan_path.exists() else {}
+        if (stored.get('chunk_duration') == chunk_duration and stored.get('ends')
+                and stored.get('snapping') == self._snapping()
+                and abs(stored.get('duration', 0) - total_duration) <= DURATION_SLACK):
+            if not stored.get('snapped'):
+                logger.info(f"Reusing the uniform chunk plan of {video_dir}: {stored.get('reason')}")
+            return fit_boundaries(stored['ends'], total_duration)
+
+        reason = None
+        if not settings.boundary_snapping:
+            reason = "boundary snapping is off"
+        elif not media_path or not os.path.exists(media_path):
+            reason = SOURCE_MISSING
+        else:
+            analysis = await self.analyzer.analyze(media_path)
+            if not analysis:
+                reason = "the source analysis failed"
+
+        if reason:
+            logger.info(f"Uniform chunk plan for {video_dir}: {reason}")
+            ends = uniform_boundaries(total_duration, chunk_duration)
+        else:
+            ends = snapped_boundaries(analysis, total_duration, chunk_duration, settings.boundary_tolerance)
+
+        if reason == SOURCE_MISSING and not cutting:
+            logger.info(f"Not storing the chunk plan of {video_dir} until the source can be analysed")
+            return ends
+        if stored:
+            logger.info(f"Replacing the stored chunk plan of {video_dir} "
+                        f"({stored.get('duration')}s / {stored.get('chunk_duration')}s chunks, "
+                        f"snapping {stored.get('snapping')})")
+
+        self._store(plan_path, total_duration, chunk_duration, ends, reason)
+        return ends
+
+    def fit_video_boundaries(self, video_dir: Path, ends: List[float], total_duration: float,
+                             chunk_duration: float) -> List[float]:
+        """
+        Fit the chunk ends a video was actually cut at to its measured duration, and store them
+
+        For progressive cutting, which plans from the metadata duration before
+        the source exists: later modes then reuse the measured plan.
+        """
+        plan_path = Path(video_dir) / PLAN_FILE
+        stored = load_json(str(plan_path)) if plan_path.exists() else {}
+        ends = fit_boundaries(ends, total_duration)
+        self._store(plan_path, total_duration, chunk_duration, ends,
+                    None if stored.get('snapped') else stored.get('reason'))
+        return ends
+
+    def _snapping(self) -> Dict:
+        """The settings a plan depends on besides the chunk length"""
+        return {'enabled': settings.boundary_snapping, 'tolerance': settings.boundary_tolerance}
+
+    def _store(self, plan_path: Path, total_duration: float, chunk_duration: float, ends: List[float],
+               reason: Optional[str]) -> None:
+        save_json({
+            'duration': total_duration,
+            'chunk_duration': chunk_duration,
+            'snapping': self._snapping(),
+            'snapped': reason is None,
+            'reason': reason,
+            'ends': ends,
+        }, str(plan_path))
@@ -0,0 +1,190 @@
+"""Brand intro/outro bumpers, pre-encoded to match the reels and joined by stream copy"""
+
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+from dataclasses import asdict, dataclass
+from fractions import Fraction
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from app.core.config import get_settings
+from app.services.encoder_profiles import INSTAGRAM_MAX_FPS, EncoderProfile
+from app.services.media_probe import MediaInfo, get_media_probe
+from app.services.reel_layout import letterbox_filter
+from app.utils.helpers import get_logger
+from app.utils.process_runner import run_process
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+
+@dataclass(frozen=True)
+class ReelFormat:
+    """Stream parameters a bumper must share with a reel for the concat demuxer to copy both"""
+    width: int
+    height: int
+    fps: str  # rational, e.g. "30000/1001"
+    sample_rate: Optional[int] = None  # None: the reel has no audio
+    channels: Optional[int] = None
+
+    @classmethod
+    def for_source(cls, info: Optional[MediaInfo], size: Tuple[int, int]) -> "ReelFormat":
+        """
+        Format of a reel rendered from this source at this size
+
+        Reels keep the source frame rate (capped by the profile's -fpsmax) and the
+        source audio rate/layout, whether the audio is copied or re-encoded.
+        """
+        fps = min(info.fps or 30, INSTAGRAM_MAX_FPS) if info else 30
+        has_audio = bool(info and info.has_audio)
+        return cls(
+            width=size[0],
+            height=size[1],
+            fps=str(Fraction(fps).limit_denominator(1001)),
+            sample_rate=(info.audio_sample_rate or 44100) if has_audio else None,
+            channels=(info.audio_channels or 2) if has_audio else None,
+        )
+
+
+class BumperLibrary:
+    """
+    Encode each bumper once per (encoder profile, reel format) and reuse it
+
+    Bumpers are encoded with the reel's own profile arguments, size, frame rate
+    and audio parameters into <storage_base_path>/.bumpers, keyed by a hash of
+    the bumper file and those parameters. Attaching them is then a concat demuxer
+    pass with -c copy instead of a second encode of the whole reel.
+    """
+
+    def __init__(self, ffmpeg_path: Optional[str] = None, ffprobe_path: Optional[str] = None,
+                 root: Optional[str] = None):
+        self.ffmpeg_path = ffmpeg_path or settings.ffmpeg_path
+        self.media_probe = get_media_probe(ffprobe_path or settings.ffprobe_path)
+        self.root = Path(root or Path(settings.storage_base_path) / ".bumpers")
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    async def prepare(self, bumper_path: str, profile: EncoderProfile, reel_format: ReelFormat,
+                      threads: Optional[int] = None) -> Optional[str]:
+        """
+        Path of the bumper encoded for this profile and format, encoding it on first use
+
+        Returns: None if the bumper is missing or fails to encode
+        """
+        try:
+            stat = os.stat(bumper_path)
+        except OSError as e:
+            logger.error(f"Bumper not found: {str(e)}")
+            return None
+
+        key = hashlib.sha1(json.dumps({
+            'bumper': os.path.realpath(bumper_path),
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'encode': profile.encode_args(),
+            'format': asdict(reel_format),
+        }, sort_keys=True).encode()).hexdigest()[:16]
+        output_path = self.root / (
+            f"{Path(bumper_path).stem}_{profile.name}_{reel_format.width}x{reel_format.height}_{key}.mp4"
+        )
+
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            if output_path.exists():
+                return str(output_path)
+            if await self._encode(bumper_path, str(output_path), profile, reel_format, threads):
+                logger.info(f"Bumper {bumper_path} pre-encoded for profile {profile.name}: {output_path}")
+                return str(output_path)
+            return None
+
+    async def attach(self, reel_path: str, intro_path: Optional[str] = None,
+                     outro_path: Optional[str] = None) -> bool:
+        """
+        Prepend/append pre-encoded bumpers to reel_path in place, by stream copy
+
+        The result is written next to the reel and renamed over it, so a reel that
+        is hard-linked into the artifact cache is never modified.
+        """
+        if not intro_path and not outro_path:
+            return True
+
+        reel_dir = Path(reel_path).parent
+        with tempfile.TemporaryDirectory(dir=reel_dir, prefix='.bumpers_') as work_dir:
+            pieces = [path for path in (intro_path, reel_path, outro_path) if path]
+            list_path = Path(work_dir) / 'pieces.txt'
+            list_path.write_text(''.join(f"file '{Path(path).resolve()}'\n" for path in pieces))
+            joined_path = Path(work_dir) / Path(reel_path).name
+
+            cmd = [
+                self.ffmpeg_path,
+                '-f', 'concat',
+                '-safe', '0',
+                '-i', str(list_path),
+                '-map', '0:v:0',
+                '-map', '0:a:0?',
+                '-c', 'copy',
+                '-movflags', '+faststart',
+                str(joined_path),
+                '-y'
+            ]
+            result = await run_process(cmd, timeout=600)
+
+            if not result.ok:
+                logger.error(f"FFmpeg bumper concat error: {result.stderr}")
+                return False
+
+            os.replace(joined_path, reel_path)
+        return True
+
+    async def duration(self, bumper_path: Optional[str]) -> float:
+        """Duration of a prepared bumper in seconds (0 for none)"""
+        if not bumper_path:
+            return 0.0
+        return await self.media_probe.get_duration(bumper_path) or 0.0
+
+    async def _encode(self, bumper_path: str, output_path: str, profile: EncoderProfile,
+                      reel_format: ReelFormat, threads: Optional[int] = None) -> bool:
+        """Encode the bumper with exactly the reel's stream parameters"""
+        info = await self.media_probe.probe(bumper_path)
+        if not info or not info.has_video:
+            logger.error(f"Bumper has no video stream: {bumper_path}")
+            return False
+
+        width, height = reel_format.width, reel_format.height
+        video_filter = letterbox_filter(
+            f"scale={width}:{height}:force_original_aspect_ratio=decrease:force_divisible_by=2", width, height,
+        )
+        cmd: List[str] = [self.ffmpeg_path, '-i', bumper_path]
+
+        if reel_format.sample_rate and not info.has_audio:
+            # The reel has audio, so the bumper needs a track too: silence for its length
+            layout = 'mono' if reel_format.channels == 1 else 'stereo'
+            cmd += ['-f', 'lavfi', '-i', f"anullsrc=r={reel_format.sample_rate}:cl={layout}", '-shortest']
+            audio_map = '1:a:0'
+        else:
+            audio_map = '0:a:0'
+
+        cmd += [
+            '-map', '0:v:0',
+            '-vf', f"{video_filter},fps={reel_format.fps},setsar=1",
+            *profile.encode_args(threads),
+        ]
+        if reel_format.sample_rate:
+            cmd += ['-map', audio_map, '-ar', str(reel_format.sample_rate), '-ac', str(reel_format.channels)]
+        else:
+            cmd += ['-an']
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        # Encode under a temporary name so other workers never pick up a partial file
+        partial_path = f"{output_path}.partial.mp4"
+        cmd += ['-movflags', '+faststart', partial_path, '-y']
+
+        result = await run_process(cmd, timeout=600)
+        if not result.ok:
+            logger.error(f"FFmpeg bumper encode error: {result.stderr}")
+            Path(partial_path).unlink(missing_ok=True)
+            return False
+
+        os.replace(partial_path, output_path)
+        return True
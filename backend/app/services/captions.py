@@ -0,0 +1,207 @@
+"""Timed captions from yt-dlp WebVTT files, rendered as ASS for burning into reels"""
+
+import hashlib
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Optional
+from app.utils.helpers import escape_filter_path, get_logger
+
+logger = get_logger(__name__)
+
+CUE_TIMING = re.compile(r"^(\S+)\s+-->\s+(\S+)")
+INLINE_TAG = re.compile(r"<[^>]*>")
+
+# yt-dlp auto-subs show each line twice: once while it is spoken, then for ~10ms
+# as the upper line of a rolling pair. Cues shorter than this are skipped.
+MIN_CUE_SECONDS = 0.05
+
+
+@dataclass(frozen=True)
+class CaptionSegment:
+    """One caption line with its time window in source seconds"""
+    start: float
+    end: float
+    text: str
+
+
+@dataclass(frozen=True)
+class CaptionStyle:
+    """ASS style for burned-in captions; sizes are fractions of the canvas so one style fits every aspect"""
+    name: str
+    font: str
+    font_size: float  # of canvas width
+    primary_colour: str  # ASS &HAABBGGRR
+    outline_colour: str
+    back_colour: str
+    bold: bool
+    border_style: int  # 1 = outline + shadow, 3 = opaque box
+    outline: float  # of canvas width
+    shadow: float
+    margin_v: float  # of canvas height, from the bottom
+
+    def ass_style_line(self, width: int, height: int) -> str:
+        return (
+            f"Style: Default,{self.font},{round(width * self.font_size)},{self.primary_colour},"
+            f"&H000000FF,{self.outline_colour},{self.back_colour},{-1 if self.bold else 0},0,0,0,"
+            f"100,100,0,0,{self.border_style},{max(1, round(width * self.outline))},{self.shadow},"
+            f"2,{round(width * 0.06)},{round(width * 0.06)},{round(height * self.margin_v)},1"
+        )
+
+
+CAPTION_STYLES = {
+    # White bold text with a heavy black outline, sitting in the lower bar
+    'bold': CaptionStyle('bold', font='DejaVu Sans', font_size=0.058, primary_colour='&H00FFFFFF',
+                         outline_colour='&H00000000', back_colour='&H80000000', bold=True,
+                         border_style=1, outline=0.005, shadow=0, margin_v=0.2),
+    # White text on a translucent black box
+    'boxed': CaptionStyle('boxed', font='DejaVu Sans', font_size=0.05, primary_colour='&H00FFFFFF',
+                          outline_colour='&H60000000', back_colour='&H60000000', bold=False,
+                          border_style=3, outline=0.01, shadow=0, margin_v=0.2),
+    'minimal': CaptionStyle('minimal', font='DejaVu Sans', font_size=0.045, primary_colour='&H00FFFFFF',
+                            outline_colour='&H00000000', back_colour='&H00000000', bold=False,
+                            border_style=1, outline=0.002, shadow=1, margin_v=0.12),
+}
+
+
+def parse_vtt(vtt_path: str) -> List[CaptionSegment]:
+    """
+    Parse a WebVTT file into caption segments
+
+    Handles both plain subtitles and YouTube auto-subs, whose rolling two-line
+    cues repeat the previous line and carry per-word <timestamp><c> tags.
+    """
+    try:
+        with open(vtt_path, 'r', encoding='utf-8') as f:
+            blocks = f.read().replace('\r\n', '\n').split('\n\n')
+    except Exception as e:
+        logger.error(f"VTT read error: {str(e)}")
+        return []
+
+    segments: List[CaptionSegment] = []
+    for block in blocks:
+        lines = block.strip().split('\n')
+        timing_index = next((i for i, line in enumerate(lines) if '-->' in line), None)
+        if timing_index is None:
+            continue
+
+        match = CUE_TIMING.match(lines[timing_index].strip())
+        if not match:
+            continue
+        start, end = _vtt_seconds(match.group(1)), _vtt_seconds(match.group(2))
+        if start is None or end is None or end - start < MIN_CUE_SECONDS:
+            continue
+
+        text_lines = [INLINE_TAG.sub('', line).strip() for line in lines[timing_index + 1:]]
+        text_lines = [line for line in text_lines if line]
+        # Rolling auto-sub cue: the first line is the one already shown
+        if segments and len(text_lines) > 1 and text_lines[0] == segments[-1].text:
+            text_lines = text_lines[1:]
+        text = ' '.join(text_lines)
+        if not text:
+            continue
+
+        if segments and text == segments[-1].text:
+            segments[-1] = CaptionSegment(segments[-1].start, end, text)
+        else:
+            segments.append(CaptionSegment(start, end, text))
+
+    return segments
+
+
+@lru_cache(maxsize=32)
+def ass_header(style_name: str, width: int, height: int) -> str:
+    """Pre-built [Script Info] + [V4+ Styles] + [Events] header for a style and canvas size"""
+    style = CAPTION_STYLES.get(style_name)
+    if style is None:
+        logger.warning(f"Unknown caption style {style_name}, using bold")
+        style = CAPTION_STYLES['bold']
+    return (
+        "[Script Info]\n"
+        "ScriptType: v4.00+\n"
+        f"PlayResX: {width}\n"
+        f"PlayResY: {height}\n"
+        "WrapStyle: 0\n"
+        "ScaledBorderAndShadow: yes\n"
+        "\n"
+        "[V4+ Styles]\n"
+        "Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, BackColour, "
+        "Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, Shadow, "
+        "Alignment, MarginL, MarginR, MarginV, Encoding\n"
+        f"{style.ass_style_line(width, height)}\n"
+        "\n"
+        "[Events]\n"
+        "Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text\n"
+    )
+
+
+def build_ass(segments: List[CaptionSegment], start_time: float, end_time: float, style_name: str,
+              width: int, height: int) -> Optional[str]:
+    """
+    ASS document for the segments overlapping [start_time, end_time)
+
+    Event times are shifted to the reel's own timeline (0 = start_time).
+    Returns: None when no caption falls inside the window
+    """
+    events = []
+    for segment in segments:
+        if segment.end <= start_time or segment.start >= end_time:
+            continue
+        start = max(segment.start, start_time) - start_time
+        end = min(segment.end, end_time) - start_time
+        events.append(f"Dialogue: 0,{_ass_time(start)},{_ass_time(end)},Default,,0,0,0,,{_ass_text(segment.text)}")
+
+    if not events:
+        return None
+    return ass_header(style_name, width, height) + '\n'.join(events) + '\n'
+
+
+def write_ass(segments: List[CaptionSegment], start_time: float, end_time: float, style_name: str,
+              width: int, height: int, captions_dir: Path) -> Optional[str]:
+    """
+    Write the window's ASS file, named by its content hash
+
+    Identical captions share one file, and the path (which ends up in the filter
+    graph and the artifact cache key) changes whenever the content does.
+    Returns: path, or None when the window has no captions
+    """
+    document = build_ass(segments, start_time, end_time, style_name, width, height)
+    if document is None:
+        return None
+
+    captions_dir.mkdir(parents=True, exist_ok=True)
+    ass_path = captions_dir / f"{hashlib.sha1(document.encode('utf-8')).hexdigest()[:16]}.ass"
+    if not ass_path.exists():
+        ass_path.write_text(document, encoding='utf-8')
+    return str(ass_path)
+
+
+def ass_filter(ass_path: str) -> str:
+    """ass filter for a filter graph, with the path escaped for both option and graph parsing"""
+    return f"ass=filename={escape_filter_path(ass_path)}"
+
+
+def _vtt_seconds(timestamp: str) -> Optional[float]:
+    """'01:02:03.456' or '02:03.456' -> seconds"""
+    try:
+        seconds = 0.0
+        for part in timestamp.replace(',', '.').split(':'):
+            seconds = seconds * 60 + float(part)
+        return seconds
+    except ValueError:
+        return None
+
+
+def _ass_time(seconds: float) -> str:
+    """Seconds -> ASS H:MM:SS.cc"""
+    centiseconds = int(round(seconds * 100))
+    hours, centiseconds = divmod(centiseconds, 360000)
+    minutes, centiseconds = divmod(centiseconds, 6000)
+    secs, centiseconds = divmod(centiseconds, 100)
+    return f"{hours}:{minutes:02d}:{secs:02d}.{centiseconds:02d}"
+
+
+def _ass_text(text: str) -> str:
+    """Keep transcript text from being read as ASS override blocks"""
+    return text.replace('\\', '/').replace('{', '(').replace('}', ')').replace('\n', ' ')
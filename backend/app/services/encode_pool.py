@@ -0,0 +1,84 @@
+"""Bounded parallel pool for running ffmpeg encodes within a CPU budget"""
+
+import asyncio
+import os
+from typing import Any, Awaitable, Callable, List, Optional, Sequence, TypeVar
+from app.core.config import get_settings
+from app.utils.helpers import get_logger
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+T = TypeVar("T")
+
+
+class EncodeError(Exception):
+    """Raised by an encode job to fail the whole batch"""
+
+
+class EncodePool:
+    """
+    Run N encode jobs at once and split a CPU budget between them
+    
+    Each job receives the number of threads it may use, which callers pass to
+    ffmpeg (-threads, -filter_threads and x264 threads) so concurrent processes
+    never oversubscribe the box. Results keep the input order. The first failing
+    job cancels all of its siblings before the error is re-raised.
+    """
+    
+    def __init__(self, max_parallel: Optional[int] = None, cpu_budget: Optional[int] = None):
+        self.cpu_budget = cpu_budget or settings.encode_cpu_budget or os.cpu_count() or 1
+        
+        max_parallel = max_parallel or settings.encode_max_parallel
+        if not max_parallel:
+            max_parallel = self.cpu_budget // max(1, settings.encode_threads_per_job)
+        self.max_parallel = max(1, min(max_parallel, self.cpu_budget))
+        
+        self.threads_per_job = max(1, self.cpu_budget // self.max_parallel)
+    
+    async def map(self, func: Callable[[Any, int], Awaitable[T]], items: Sequence[Any]) -> List[T]:
+        """
+        Run func(item, threads) for every item with at most max_parallel in flight
+        
+        Returns: results in the same order as items
+        """
+        if not items:
+            return []
+        
+        logger.info(
+            f"Encoding {len(items)} jobs: {self.max_parallel} parallel x {self.threads_per_job} threads "
+            f"(cpu budget {self.cpu_budget})"
+        )
+        
+        semaphore = asyncio.Semaphore(self.max_parallel)
+        
+        async def run(item: Any) -> T:
+            async with semaphore:
+                return await func(item, self.threads_per_job)
+        
+        tasks = [asyncio.ensure_future(run(item)) for item in items]
+        
+        try:
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        finally:
+            pending = [task for task in tasks if not task.done()]
+            for task in pending:
+                task.cancel()
+            if pending:
+                # Let cancelled jobs kill their ffmpeg processes before returning
+                await asyncio.gather(*pending, return_exceptions=True)
+        
+        for task in tasks:
+            if not task.cancelled() and task.exception() is not None:
+                raise task.exception()
+        
+        return [task.result() for task in tasks]
+    
+    @staticmethod
+    def thread_args(threads: int) -> List[str]:
+        """ffmpeg output options that cap a process to the given thread count"""
+        return [
+            '-threads', str(threads),
+            '-filter_threads', str(threads),
+            '-x264-params', f'threads={threads}',
+        ]
@@ -0,0 +1,121 @@
+"""Named libx264 encoder profiles and per-source profile selection"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from app.core.config import get_settings
+from app.services.encode_pool import EncodePool
+from app.services.media_probe import MediaInfo
+from app.utils.helpers import get_logger
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+# Instagram Reels ingest limits: H.264, <= 25 Mbps video, AAC <= 128 kbps, <= 60 fps
+INSTAGRAM_MAX_VIDEO_KBPS = 25000
+INSTAGRAM_MAX_FPS = 60
+
+
+@dataclass(frozen=True)
+class EncoderProfile:
+    """One rung of the quality ladder: x264 speed/quality plus VBV caps and output width"""
+    name: str
+    preset: str
+    crf: int
+    maxrate_kbps: int
+    bufsize_kbps: int
+    audio_bitrate: str
+    reel_width: int
+
+    def encode_args(self, threads: Optional[int] = None) -> List[str]:
+        """Codec arguments for ffmpeg, capped to `threads` when given"""
+        args = [
+            '-c:v', 'libx264',
+            '-preset', self.preset,
+            '-crf', str(self.crf),
+            '-maxrate', f"{self.maxrate_kbps}k",  # VBV cap so CRF peaks stay under the ingest limit
+            '-bufsize', f"{self.bufsize_kbps}k",
+            '-profile:v', 'high',
+            '-pix_fmt', 'yuv420p',
+            '-fpsmax', str(INSTAGRAM_MAX_FPS),
+            '-c:a', 'aac',
+            '-b:a', self.audio_bitrate,
+        ]
+        if threads:
+            args += EncodePool.thread_args(threads)
+        return args
+
+    def reel_size(self) -> Tuple[int, int]:
+        """Output reel (width, height): the configured reel aspect at this profile's width"""
+        width = min(self.reel_width, settings.reel_width)
+        height = round(settings.reel_height * width / settings.reel_width / 2) * 2
+        return width, height
+
+
+PROFILES: Dict[str, EncoderProfile] = {
+    # Fast previews and low-resolution sources: 720-wide reels, nothing is upscaled to 1080
+    'draft': EncoderProfile('draft', preset='veryfast', crf=28, maxrate_kbps=3000, bufsize_kbps=6000,
+                            audio_bitrate='96k', reel_width=720),
+    'standard': EncoderProfile('standard', preset='medium', crf=23, maxrate_kbps=8000, bufsize_kbps=16000,
+                               audio_bitrate='128k', reel_width=1080),
+    # High-detail sources: near-transparent quality, VBV capped at the Instagram limit
+    'archival': EncoderProfile('archival', preset='slow', crf=18, maxrate_kbps=INSTAGRAM_MAX_VIDEO_KBPS,
+                               bufsize_kbps=2 * INSTAGRAM_MAX_VIDEO_KBPS, audio_bitrate='128k', reel_width=1080),
+}
+
+LADDER = ['draft', 'standard', 'archival']
+
+# Settings.video_quality caps how far up the ladder automatic selection may go
+QUALITY_CEILING = {'low': 'draft', 'medium': 'standard', 'high': 'archival'}
+
+
+def get_profile(name: str) -> EncoderProfile:
+    """Look up a profile by name ("preview" is accepted for "draft")"""
+    if name == 'preview':
+        name = 'draft'
+    if name not in PROFILES:
+        raise ValueError(f"Unknown encoder profile: {name}")
+    return PROFILES[name]
+
+
+def default_profile() -> EncoderProfile:
+    """Profile used when there is no source to inspect: the configured one, or standard for "auto\""""
+    if settings.encoder_profile != 'auto':
+        return get_profile(settings.encoder_profile)
+    return _cap(PROFILES['standard'])
+
+
+def select_profile(info: Optional[MediaInfo]) -> EncoderProfile:
+    """
+    Pick the profile for a source from its resolution and bitrate
+
+    - short side below 720 or under 1.2 Mbps: draft (upscaling to 1080 adds cost, not detail)
+    - short side 1080+ and at least 8 Mbps: archival
+    - everything else: standard
+
+    An explicit settings.encoder_profile wins; settings.video_quality caps the result.
+    """
+    if settings.encoder_profile != 'auto':
+        return get_profile(settings.encoder_profile)
+    if not info or not info.width or not info.height:
+        return default_profile()
+
+    short_side = min(info.width, info.height)
+    bit_rate = info.video_bit_rate or info.bit_rate
+
+    if short_side < 720 or (bit_rate and bit_rate < 1_200_000):
+        name = 'draft'
+    elif short_side >= 1080 and bit_rate and bit_rate >= 8_000_000:
+        name = 'archival'
+    else:
+        name = 'standard'
+
+    profile = _cap(PROFILES[name])
+    logger.info(f"Encoder profile {profile.name} for {info.width}x{info.height} @ {bit_rate or 0} bps")
+    return profile
+
+
+def _cap(profile: EncoderProfile) -> EncoderProfile:
+    ceiling = QUALITY_CEILING.get(settings.video_quality, 'archival')
+    if LADDER.index(profile.name) > LADDER.index(ceiling):
+        return PROFILES[ceiling]
+    return profile
@@ -0,0 +1,270 @@
+"""Perceptual fingerprints of reels and a Hamming-distance index to find repeats"""
+
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import numpy as np
+from app.utils.helpers import get_logger
+
+logger = get_logger(__name__)
+
+# One 9x8 gray frame per second gives a 64-bit dHash; one second of 8 kHz audio
+# gives an 8-bit code from the energy slopes of 9 bands
+HASH_WIDTH, HASH_HEIGHT = 9, 8
+FLAT_STD = 3.0  # frames with less luma spread than this (black, fades) hash to noise and are skipped
+AUDIO_BANDS = np.geomspace(150, 3500, 10)  # Hz, edges of the 9 bands
+SILENT_ENERGY = 1e-6  # mean squared amplitude below which a second has no audio code
+
+FRAME_DISTANCE = 10  # dHash bits two frames may differ by and still match
+MATCH_RATIO = 0.6  # fraction of a reel's frames that must match another reel's
+MIN_FRAMES = 5  # reels with fewer usable frames are never called duplicates
+AUDIO_AGREEMENT = 0.7  # fraction of audio code bits that must agree when both reels have sound
+AUDIO_MAX_OFFSET = 2  # seconds the two audio tracks may be shifted against each other
+
+
+def frame_hashes(frames: np.ndarray) -> List[Optional[int]]:
+    """64-bit dHash of each (HASH_HEIGHT, HASH_WIDTH) gray frame; None for flat frames"""
+    if not len(frames):
+        return []
+    bits = frames[:, :, 1:] > frames[:, :, :-1]
+    packed = np.packbits(bits.reshape(len(frames), -1), axis=1)
+    values = packed.view('>u8').ravel()
+    flat = frames.reshape(len(frames), -1).std(axis=1) < FLAT_STD
+    return [None if is_flat else int(value) for value, is_flat in zip(values, flat)]
+
+
+def audio_codes(samples: np.ndarray, sample_rate: int) -> List[Optional[int]]:
+    """
+    8-bit code per second of mono audio; None for silent seconds
+
+    Bit k is set when the energy difference between bands k and k+1 grew since
+    the previous second, which survives re-encoding and level changes.
+    """
+    seconds = len(samples) // sample_rate
+    if not seconds:
+        return []
+    windows = samples[:seconds * sample_rate].reshape(seconds, sample_rate).astype(np.float64)
+    spectrum = np.abs(np.fft.rfft(windows, axis=1)) ** 2
+    frequencies = np.fft.rfftfreq(sample_rate, 1 / sample_rate)
+    band = np.digitize(frequencies, AUDIO_BANDS) - 1
+    energies = np.stack([spectrum[:, band == index].sum(axis=1) for index in range(len(AUDIO_BANDS) - 1)], axis=1)
+
+    slopes = energies[:, :-1] - energies[:, 1:]
+    bits = np.diff(slopes, axis=0, prepend=slopes[:1]) > 0
+    codes = np.packbits(bits, axis=1).ravel()
+    silent = (windows ** 2).mean(axis=1) < SILENT_ENERGY
+    return [None if is_silent else int(code) for code, is_silent in zip(codes, silent)]
+
+
+def hamming(first: int, second: int) -> int:
+    return (first ^ second).bit_count()
+
+
+@dataclass
+class ReelPrint:
+    """Per-second frame hashes and audio codes of one reel's source range"""
+    frames: List[Optional[int]] = field(default_factory=list)
+    audio: List[Optional[int]] = field(default_factory=list)
+
+    def to_dict(self) -> Dict:
+        return {'frames': self.frames, 'audio': self.audio}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "ReelPrint":
+        return cls(frames=list(data.get('frames') or []), audio=list(data.get('audio') or []))
+
+    def encoded(self) -> Dict[str, str]:
+        """Hex strings for storage: 16 digits per frame hash, 2 per audio code, dashes for gaps"""
+        return {
+            'frame_hashes': ''.join('-' * 16 if value is None else f"{value:016x}" for value in self.frames),
+            'audio_codes': ''.join('--' if value is None else f"{value:02x}" for value in self.audio),
+        }
+
+    @classmethod
+    def decode(cls, frame_hashes: Optional[str], audio_codes: Optional[str]) -> "ReelPrint":
+        def parse(text: Optional[str], width: int) -> List[Optional[int]]:
+            text = text or ''
+            return [
+                None if text[index] == '-' else int(text[index:index + width], 16)
+                for index in range(0, len(text) - width + 1, width)
+            ]
+        return cls(frames=parse(frame_hashes, 16), audio=parse(audio_codes, 2))
+
+    def usable_frames(self) -> List[int]:
+        return [value for value in self.frames if value is not None]
+
+    def audio_agreement(self, other: "ReelPrint") -> Optional[float]:
+        """
+        Fraction of agreeing audio code bits at the best alignment within AUDIO_MAX_OFFSET
+
+        Returns: None when the reels share fewer than MIN_FRAMES seconds with sound
+        """
+        best = None
+        for offset in range(-AUDIO_MAX_OFFSET, AUDIO_MAX_OFFSET + 1):
+            pairs = [
+                (code, other.audio[index + offset])
+                for index, code in enumerate(self.audio)
+                if code is not None and 0 <= index + offset < len(other.audio) and other.audio[index + offset] is not None
+            ]
+            if len(pairs) < MIN_FRAMES:
+                continue
+            agreement = 1 - sum(hamming(first, second) for first, second in pairs) / (8 * len(pairs))
+            best = agreement if best is None else max(best, agreement)
+        return best
+
+
+class BKTree:
+    """
+    Burkhard-Keller tree over 64-bit hashes under Hamming distance
+
+    Children are keyed by their distance to the parent; the triangle inequality
+    limits a radius-r search to children keyed within r of the query's distance,
+    so lookups visit a small part of the tree.
+    """
+
+    def __init__(self):
+        self.root: Optional[list] = None  # [hash, [values], {distance: child}]
+        self.size = 0
+
+    def add(self, value: int, item) -> None:
+        self.size += 1
+        if self.root is None:
+            self.root = [value, [item], {}]
+            return
+        node = self.root
+        while True:
+            distance = hamming(value, node[0])
+            if distance == 0:
+                node[1].append(item)
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = [value, [item], {}]
+                return
+            node = child
+
+    def search(self, value: int, radius: int) -> List[Tuple[int, object]]:
+        """(distance, item) of every stored hash within radius of value"""
+        found = []
+        stack = [self.root] if self.root else []
+        while stack:
+            node = stack.pop()
+            distance = hamming(value, node[0])
+            if distance <= radius:
+                found.extend((distance, item) for item in node[1])
+            for child_distance, child in node[2].items():
+                if distance - radius <= child_distance <= distance + radius:
+                    stack.append(child)
+        return found
+
+
+class FingerprintIndex:
+    """
+    Find reels that repeat a fingerprint: frame hashes in a BK-tree, audio confirms
+
+    A candidate must match MATCH_RATIO of the query's usable frames within
+    FRAME_DISTANCE bits, so re-encodes, rescaled re-uploads and slightly shifted
+    cuts still match. When both reels have sound, their audio codes must also
+    agree, which keeps look-alike footage with different audio apart.
+    """
+
+    def __init__(self):
+        self.tree = BKTree()
+        self.prints: Dict[int, ReelPrint] = {}
+
+    def add(self, reel_id: int, fingerprint: ReelPrint) -> None:
+        self.prints[reel_id] = fingerprint
+        for value in set(fingerprint.usable_frames()):
+            self.tree.add(value, reel_id)
+
+    def duplicates(self, fingerprint: ReelPrint, exclude: Optional[set] = None) -> List[Tuple[int, float]]:
+        """(reel_id, fraction of matching frames) of indexed reels that repeat fingerprint, best first"""
+        frames = fingerprint.usable_frames()
+        if len(frames) < MIN_FRAMES:
+            return []
+
+        hits: Dict[int, int] = {}
+        for value in frames:
+            for reel_id in {item for _, item in self.tree.search(value, FRAME_DISTANCE)}:
+                hits[reel_id] = hits.get(reel_id, 0) + 1
+
+        found = []
+        for reel_id, count in hits.items():
+            ratio = count / len(frames)
+            if ratio < MATCH_RATIO or (exclude and reel_id in exclude):
+                continue
+            agreement = fingerprint.audio_agreement(self.prints[reel_id])
+            if agreement is not None and agreement < AUDIO_AGREEMENT:
+                continue
+            found.append((reel_id, round(ratio, 3)))
+        return sorted(found, key=lambda match: -match[1])
+
+
+_index = FingerprintIndex()
+_loaded_up_to = 0  # highest ReelFingerprint id already in _index
+
+
+def load_fingerprint_index(db=None) -> Optional[FingerprintIndex]:
+    """
+    The process-wide index of stored reel fingerprints, topped up with rows added since the last call
+
+    db: session to query with (default: a new one). Blocking; rows of deleted
+    reels stay in the index, so callers check candidates against the database.
+    Returns None if the database is unreachable.
+    """
+    global _loaded_up_to
+    from app.db.database import SessionLocal
+    from app.models.reel import ReelFingerprint
+
+    own_session = db is None
+    db = db or SessionLocal()
+    try:
+        rows = (db.query(ReelFingerprint)
+                .filter(ReelFingerprint.id > _loaded_up_to)
+                .order_by(ReelFingerprint.id)
+                .all())
+        for row in rows:
+            _index.add(row.reel_id, ReelPrint.decode(row.frame_hashes, row.audio_codes))
+            _loaded_up_to = row.id
+        return _index
+    except Exception as e:
+        logger.warning(f"Could not load reel fingerprints: {str(e)}")
+        return None
+    finally:
+        if own_session:
+            db.close()
+
+
+def other_owned_reels(reel_ids: Iterable[int], youtube_video_id: str) -> Set[int]:
+    """
+    The reels among reel_ids that still exist and belong to another video of the same owner
+
+    youtube_video_id identifies the video being planned; its owner is its
+    Video.user_id. Blocking. Returns an empty set when the video has no row or
+    the database is unreachable, so nothing is called a repeat.
+    """
+    from app.db.database import SessionLocal
+    from app.models.reel import Reel
+    from app.models.video import Video
+
+    reel_ids = list(reel_ids)
+    if not reel_ids:
+        return set()
+
+    db = SessionLocal()
+    try:
+        video = db.query(Video).filter(Video.youtube_video_id == youtube_video_id).first()
+        if not video:
+            logger.info(f"No video row for {youtube_video_id}, not checking for repeats")
+            return set()
+
+        same_owner = Video.user_id.is_(None) if video.user_id is None else Video.user_id == video.user_id
+        rows = (db.query(Reel.id)
+                .join(Video, Reel.video_id == Video.id)
+                .filter(Reel.id.in_(reel_ids), Video.id != video.id, same_owner)
+                .all())
+        return {row.id for row in rows}
+    except Exception as e:
+        logger.warning(f"Could not check reel owners: {str(e)}")
+        return set()
+    finally:
+        db.close()
@@ -0,0 +1,147 @@
+"""Pick the yt-dlp source format that matches the reel output geometry"""
+
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, List, Optional
+from app.core.config import get_settings
+from app.services.reel_layout import crop_size
+from app.utils.helpers import get_logger
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+# Format the downloads used before selection; also the fallback when a chosen format disappears
+DEFAULT_FORMAT = 'bestvideo[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]/best'
+
+# Lower is cheaper to decode
+CODEC_RANK = {'avc1': 0, 'h264': 0, 'vp09': 1, 'vp9': 1, 'av01': 2}
+
+
+@dataclass
+class FormatChoice:
+    """The source format chosen for a download and what it saves over the default"""
+    format_selector: str
+    format_id: str
+    width: int
+    height: int
+    fps: Optional[float]
+    vcodec: Optional[str]
+    estimated_bytes: Optional[int]
+    default_bytes: Optional[int]
+    bytes_saved: Optional[int]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class FormatSelector:
+    """
+    Choose the smallest source that still covers the reel without upscaling
+
+    With the pad and blur layouts the source is scaled to fit width x height; with
+    crop, the crop region (reel_layout.crop_size) is scaled to fill it. Any format
+    that is not upscaled gives identical output quality, so the smallest of
+    those is downloaded and decoded instead of the 4K/60 best. Ties prefer
+    cheap-to-decode codecs (H.264 over VP9/AV1), <= 30 fps and fewer bytes.
+    """
+
+    def __init__(self, width: Optional[int] = None, height: Optional[int] = None, layout: Optional[str] = None):
+        self.width = width or settings.reel_width
+        self.height = height or settings.reel_height
+        self.layout = layout or settings.reel_layout
+
+    def select(self, info: Dict[str, Any]) -> Optional[FormatChoice]:
+        """
+        Select a format from a yt-dlp info dict (extract_info with download=False)
+
+        Returns: FormatChoice, or None when the formats carry no dimensions
+        """
+        duration = info.get('duration') or 0
+        formats = info.get('formats') or []
+        videos = [f for f in formats if f.get('vcodec') not in (None, 'none') and f.get('width') and f.get('height')]
+        if not videos:
+            return None
+
+        covering = [f for f in videos if self._covers(f)]
+        if covering:
+            chosen = min(covering, key=lambda f: (
+                f['width'] * f['height'],
+                self._codec_rank(f),
+                (f.get('fps') or 0) > 30,
+                self._estimate_bytes(f, duration) or 0,
+            ))
+        else:
+            # Nothing is large enough; the biggest source upscales the least
+            chosen = max(videos, key=lambda f: (f['width'] * f['height'], f.get('tbr') or 0))
+
+        audio = self._best_audio(formats)
+        has_audio = chosen.get('acodec') not in (None, 'none')
+
+        if has_audio or not audio:
+            selector = chosen['format_id']
+            estimated = self._estimate_bytes(chosen, duration)
+        else:
+            selector = f"{chosen['format_id']}+{audio['format_id']}"
+            estimated = self._sum_bytes(self._estimate_bytes(chosen, duration), self._estimate_bytes(audio, duration))
+
+        default_bytes = self._default_bytes(videos, audio, duration)
+        bytes_saved = None
+        if estimated is not None and default_bytes is not None:
+            bytes_saved = max(0, default_bytes - estimated)
+
+        choice = FormatChoice(
+            format_selector=f"{selector}/{DEFAULT_FORMAT}",
+            format_id=selector,
+            width=chosen['width'],
+            height=chosen['height'],
+            fps=chosen.get('fps'),
+            vcodec=chosen.get('vcodec'),
+            estimated_bytes=estimated,
+            default_bytes=default_bytes,
+            bytes_saved=bytes_saved,
+        )
+
+        logger.info(
+            f"Selected source format {selector} ({choice.width}x{choice.height}, {choice.vcodec}) "
+            f"for {self.width}x{self.height} {self.layout} reels, ~{bytes_saved or 0} bytes saved"
+        )
+        return choice
+
+    def _covers(self, fmt: Dict[str, Any]) -> bool:
+        """True when placing the format on the reel canvas does not upscale it"""
+        if self.layout == 'crop':
+            # The crop fills the canvas, so it must be at least canvas sized
+            crop_width, crop_height = crop_size((fmt['width'], fmt['height']), self.width, self.height)
+            return crop_width >= self.width and crop_height >= self.height
+        return min(self.width / fmt['width'], self.height / fmt['height']) <= 1
+
+    def _codec_rank(self, fmt: Dict[str, Any]) -> int:
+        codec = (fmt.get('vcodec') or '').split('.')[0]
+        return CODEC_RANK.get(codec, 3)
+
+    def _best_audio(self, formats: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Audio-only format that bestaudio[ext=m4a]/bestaudio would pick"""
+        audio = [f for f in formats if f.get('vcodec') == 'none' and f.get('acodec') not in (None, 'none')]
+        if not audio:
+            return None
+        return max(audio, key=lambda f: (f.get('ext') == 'm4a', f.get('abr') or f.get('tbr') or 0))
+
+    def _default_bytes(self, videos: List[Dict[str, Any]], audio: Optional[Dict[str, Any]], duration: float) -> Optional[int]:
+        """Estimated size of what DEFAULT_FORMAT would have downloaded"""
+        mp4_videos = [f for f in videos if f.get('ext') == 'mp4'] or videos
+        best = max(mp4_videos, key=lambda f: (f['width'] * f['height'], f.get('fps') or 0, f.get('tbr') or 0))
+        if best.get('acodec') not in (None, 'none') or not audio:
+            return self._estimate_bytes(best, duration)
+        return self._sum_bytes(self._estimate_bytes(best, duration), self._estimate_bytes(audio, duration))
+
+    def _estimate_bytes(self, fmt: Dict[str, Any], duration: float) -> Optional[int]:
+        size = fmt.get('filesize') or fmt.get('filesize_approx')
+        if size:
+            return int(size)
+        if fmt.get('tbr') and duration:
+            return int(fmt['tbr'] * 1000 / 8 * duration)  # tbr is in kbit/s
+        return None
+
+    def _sum_bytes(self, *sizes: Optional[int]) -> Optional[int]:
+        if any(size is None for size in sizes):
+            return None
+        return sum(sizes)
@@ -1,5 +1,6 @@
 """Gemini AI service for generating reel metadata"""
 
+import asyncio
 import json
 import logging
 from typing import Dict, Optional
@@ -35,7 +36,8 @@ class GeminiAIService:
         - caption: Instagram caption
         - hashtags: List of hashtags
         - topics: List of topics
-        - quality_score: 0.0-1.0
+        
+        The reel's quality_score is measured locally (see ReelQualityScorer), not asked for here.
         """
         try:
             if not self.api_key:
@@ -47,9 +49,9 @@ class GeminiAIService:
             
             logger.info(f"Generating AI metadata for reel (duration: {duration}s)")
             
-            # Call Gemini API
+            # Call Gemini API (blocking client, so keep it off the event loop)
             model = genai.GenerativeModel(self.model_name)
-            response = model.generate_content(prompt)
+            response = await asyncio.to_thread(model.generate_content, prompt)
             
             if not response.text:
                 logger.warning("Empty response from Gemini API")
@@ -88,8 +90,7 @@ Generate the following in JSON format:
     "title": "A short, engaging title (max 50 chars)",
     "caption": "An engaging Instagram caption with call-to-action (max 150 chars)",
     "hashtags": ["#tag1", "#tag2", "#tag3", "#tag4", "#tag5"],
-    "topics": ["topic1", "topic2", "topic3"],
-    "quality_score": 0.85
+    "topics": ["topic1", "topic2", "topic3"]
 }}
 
 Important:
@@ -97,7 +98,6 @@ Important:
 - Caption should encourage engagement (likes, comments, shares)
 - Hashtags should be relevant and trending
 - Topics should describe the main content
-- Quality score: 0.0-1.0, where 1.0 is perfect viral potential
 - Return ONLY valid JSON, no extra text"""
         
         return prompt
@@ -119,14 +119,14 @@ Important:
             metadata = json.loads(json_str)
             
             # Validate required fields
-            required_fields = ['title', 'caption', 'hashtags', 'topics', 'quality_score']
+            required_fields = ['title', 'caption', 'hashtags', 'topics']
             for field in required_fields:
                 if field not in metadata:
                     logger.warning(f"Missing field in Gemini response: {field}")
                     return self._get_default_metadata()
             
-            # Ensure quality_score is between 0 and 1
-            metadata['quality_score'] = max(0.0, min(1.0, float(metadata['quality_score'])))
+            # A score the model volunteers anyway is not a measurement
+            metadata.pop('quality_score', None)
             
             return metadata
         
@@ -146,11 +146,12 @@ Important:
             'caption': 'Amazing content! Check it out! 🚀',
             'hashtags': ['#reels', '#viral', '#content', '#awesome', '#explore'],
             'topics': ['entertainment', 'trending'],
-            'quality_score': 0.5
         }
     
-    def calculate_quality_grade(self, quality_score: float) -> str:
-        """Convert quality score to grade"""
+    def calculate_quality_grade(self, quality_score: Optional[float]) -> Optional[str]:
+        """Convert quality score to grade (None for a reel that was not scored)"""
+        if quality_score is None:
+            return None
         if quality_score >= 0.85:
             return "EXCELLENT"
         elif quality_score >= 0.70:
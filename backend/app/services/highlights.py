@@ -0,0 +1,173 @@
+"""Highlight ranking: score sliding windows of a source and keep the best few as reels"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+import numpy as np
+from app.core.config import get_settings
+from app.services.captions import CaptionSegment
+from app.services.source_analysis import SILENT_DB, SourceAnalysis, SourceAnalyzer
+from app.utils.helpers import get_logger
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+# Relative weight of each per-second feature; missing features (e.g. no transcript)
+# drop out and the rest are renormalized
+FEATURE_WEIGHTS = {'audio': 0.4, 'speech': 0.35, 'motion': 0.25}
+
+DEAD_AIR_DB = -45.0  # seconds quieter than this count as dead air
+DEAD_AIR_PENALTY = 1.5  # subtracted per unit fraction of dead air in a window
+Z_CLIP = 3.0
+
+
+@dataclass(frozen=True)
+class Highlight:
+    """One chosen window in source seconds"""
+    start_time: float
+    end_time: float
+    score: float
+
+
+def feature_arrays(analysis: SourceAnalysis, captions: Optional[List[CaptionSegment]] = None) -> Dict[str, np.ndarray]:
+    """
+    Per-second features of the source, one array per feature
+
+    audio: RMS level in dBFS; speech: transcript words per second (each caption
+    line's words spread evenly over its duration); motion: mean scene score.
+    """
+    seconds = max(1, int(np.ceil(analysis.duration)))
+    features = {}
+
+    if analysis.audio_rms:
+        audio = np.full(seconds, SILENT_DB)
+        values = np.asarray(analysis.audio_rms[:seconds], dtype=float)
+        audio[:len(values)] = values
+        features['audio'] = audio
+
+    if analysis.motion:
+        motion = np.zeros(seconds)
+        values = np.asarray(analysis.motion[:seconds], dtype=float)
+        motion[:len(values)] = values
+        features['motion'] = motion
+
+    if captions:
+        speech = np.zeros(seconds)
+        second_starts = np.arange(seconds, dtype=float)
+        for segment in captions:
+            length = segment.end - segment.start
+            if length <= 0:
+                continue
+            # Overlap of the line with every second [k, k + 1), times its word rate
+            covered = np.clip(np.minimum(second_starts + 1, segment.end) - np.maximum(second_starts, segment.start), 0, None)
+            speech += covered * (len(segment.text.split()) / length)
+        features['speech'] = speech
+
+    return features
+
+
+def second_scores(features: Dict[str, np.ndarray]) -> np.ndarray:
+    """Weighted sum of the z-scored features for every second of the source"""
+    total = None
+    weight_sum = 0.0
+    for name, values in features.items():
+        weight = FEATURE_WEIGHTS.get(name, 0.0)
+        spread = values.std()
+        if weight <= 0 or spread < 1e-9:
+            continue
+        z = np.clip((values - values.mean()) / spread, -Z_CLIP, Z_CLIP)
+        total = weight * z if total is None else total + weight * z
+        weight_sum += weight
+    if total is None:
+        length = len(next(iter(features.values()))) if features else 0
+        return np.zeros(length)
+    return total / weight_sum
+
+
+def window_scores(scores: np.ndarray, window: int, audio: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Mean score of every window of `window` seconds, by start second
+
+    Sliding sums come from one cumulative sum. Windows with dead air (seconds
+    below DEAD_AIR_DB) are penalized by the fraction of it they contain.
+    """
+    window = max(1, min(window, len(scores)))
+    cumulative = np.concatenate(([0.0], np.cumsum(scores)))
+    means = (cumulative[window:] - cumulative[:-window]) / window
+    if audio is not None:
+        quiet = np.concatenate(([0], np.cumsum(audio < DEAD_AIR_DB)))
+        means = means - DEAD_AIR_PENALTY * (quiet[window:] - quiet[:-window]) / window
+    return means
+
+
+def pick_windows(scores: np.ndarray, window: int, count: int) -> List[int]:
+    """
+    Start seconds of the `count` best non-overlapping windows, best first
+
+    Greedy: take the highest-scoring start, rule out every start whose window
+    would overlap it, repeat.
+    """
+    available = np.ones(len(scores), dtype=bool)
+    picks = []
+    for _ in range(count):
+        if not available.any():
+            break
+        start = int(np.argmax(np.where(available, scores, -np.inf)))
+        picks.append(start)
+        available[max(0, start - window + 1):start + window] = False
+    return picks
+
+
+class HighlightRanker:
+    """
+    Choose the top-K reel windows of a source from its analysis pass
+
+    Per-second audio energy, transcript speech density and scene activity are
+    z-scored and combined; every window of chunk length is scored with a
+    cumulative sum, and the best non-overlapping ones are kept. Window edges
+    are snapped to nearby scene cuts and pauses like regular chunk boundaries.
+    """
+
+    def __init__(self, ffmpeg_path: Optional[str] = None, ffprobe_path: Optional[str] = None):
+        self.analyzer = SourceAnalyzer(ffmpeg_path, ffprobe_path)
+
+    async def rank(self, media_path: str, total_duration: float, chunk_duration: float, top_k: int,
+                   captions: Optional[List[CaptionSegment]] = None,
+                   tolerance: Optional[float] = None) -> List[Highlight]:
+        """
+        The top_k best windows, in source order
+
+        Returns: [] when the source can't be analysed (callers fall back to every chunk)
+        """
+        analysis = await self.analyzer.analyze(media_path)
+        if not analysis:
+            return []
+
+        features = feature_arrays(analysis, captions)
+        if not features:
+            logger.warning(f"No usable features for highlight ranking: {media_path}")
+            return []
+
+        window = int(round(chunk_duration))
+        scores = window_scores(second_scores(features), window, features.get('audio'))
+        picks = sorted(pick_windows(scores, window, top_k))
+
+        if tolerance is None:
+            tolerance = settings.boundary_tolerance if settings.boundary_snapping else 0.0
+        highlights = []
+        previous_end = 0.0
+        for pick in picks:
+            start, end = float(pick), min(pick + window, total_duration)
+            if tolerance > 0:
+                start = analysis.snap(start, tolerance, previous_end, end - chunk_duration / 2)
+                if end < total_duration:
+                    end = analysis.snap(end, tolerance, start + chunk_duration / 2, total_duration)
+            start = max(start, previous_end)
+            highlights.append(Highlight(start_time=round(start, 3), end_time=round(end, 3),
+                                        score=round(float(scores[pick]), 3)))
+            previous_end = end
+
+        logger.info(
+            f"Highlights for {media_path}: {len(highlights)} of {len(scores)} candidate windows, "
+            f"scores {[highlight.score for highlight in highlights]}"
+        )
+        return highlights
@@ -0,0 +1,215 @@
+"""EBU R128 loudness measurements and single-pass linear loudnorm for reels"""
+
+import math
+import re
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional
+from app.core.config import get_settings
+from app.utils.helpers import get_logger, read_sidecar, write_sidecar
+from app.utils.process_runner import run_process
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+# ebur128 logs one line per 100 ms: momentary (400 ms) and short-term (3 s)
+# loudness plus the true peak of that frame. The summary covers the whole input.
+MEASURE_FILTER = "ebur128=peak=true:framelog=info"
+FRAME_STEP = 0.1
+
+FRAME_LINE = re.compile(r"t:\s*([\d.]+)\s+TARGET:.*?M:\s*(-?[\d.]+|-inf)\s+S:\s*(-?[\d.]+|-inf).*?FTPK:\s*(.*?)\s*dBFS")
+SUMMARY = re.compile(
+    r"Integrated loudness:\s+I:\s+(-?[\d.]+|-inf) LUFS\s+Threshold:\s+(-?[\d.]+|-inf) LUFS"
+    r".*?Loudness range:\s+LRA:\s+(-?[\d.]+) LU"
+    r".*?True peak:\s+Peak:\s+(-?[\d.]+|-inf) dBFS",
+    re.S,
+)
+
+SILENCE = -120.7  # what ebur128 reports for blocks with no signal
+ABSOLUTE_GATE = -70.0  # BS.1770 absolute gate, LUFS
+MOMENTARY_SECONDS = 0.4
+SHORT_TERM_SECONDS = 3.0
+
+
+@dataclass
+class LoudnessStats:
+    """Measured values in the form loudnorm's measured_* options take"""
+    integrated: float  # LUFS
+    true_peak: float  # dBTP
+    lra: float  # LU
+    threshold: float  # LUFS, relative gate
+
+
+@dataclass
+class LoudnessProfile:
+    """Whole-source loudness plus the 100 ms ebur128 series, so any window can be measured later"""
+    source: LoudnessStats
+    momentary: List[float] = field(default_factory=list)  # index k: 400 ms block ending at k * FRAME_STEP
+    short_term: List[float] = field(default_factory=list)  # index k: 3 s block ending at k * FRAME_STEP
+    true_peak: List[float] = field(default_factory=list)  # index k: peak of the frame ending at k * FRAME_STEP
+
+    def window(self, start_time: float, end_time: float) -> Optional[LoudnessStats]:
+        """
+        BS.1770 / EBU 3342 stats for [start_time, end_time), from the stored series
+
+        Returns: None when the window is silent (nothing passes the gates)
+        """
+        first = math.ceil(round((start_time + MOMENTARY_SECONDS) / FRAME_STEP, 6))
+        last = math.floor(round(end_time / FRAME_STEP, 6))
+        blocks = [value for value in self.momentary[first:last + 1] if value > ABSOLUTE_GATE]
+        if not blocks:
+            return None
+
+        # Integrated loudness: relative gate 10 LU below the absolute-gated mean
+        threshold = _energy_mean(blocks) - 10
+        gated = [value for value in blocks if value > threshold]
+        integrated = _energy_mean(gated) if gated else _energy_mean(blocks)
+
+        # Loudness range: 10th-95th percentile of short-term values, relative gate 20 LU
+        first_short = math.ceil(round((start_time + SHORT_TERM_SECONDS) / FRAME_STEP, 6))
+        short_term = [value for value in self.short_term[first_short:last + 1] if value > ABSOLUTE_GATE]
+        if short_term:
+            short_gate = _energy_mean(short_term) - 20
+            short_term = sorted(value for value in short_term if value > short_gate)
+        lra = _percentile(short_term, 0.95) - _percentile(short_term, 0.10) if short_term else 0.0
+
+        peaks = self.true_peak[math.floor(round(start_time / FRAME_STEP, 6)) + 1:last + 1]
+        true_peak = max(peaks) if peaks else self.source.true_peak
+
+        return LoudnessStats(
+            integrated=round(integrated, 2),
+            true_peak=round(true_peak, 2),
+            lra=round(lra, 2),
+            threshold=round(threshold, 2),
+        )
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "LoudnessProfile":
+        return cls(**{**data, 'source': LoudnessStats(**data['source'])})
+
+
+def parse_ebur128(stderr: str) -> Optional[LoudnessProfile]:
+    """
+    Build a LoudnessProfile from the stderr of an ffmpeg run with MEASURE_FILTER
+
+    Needs the whole log (one line per 100 ms), not run_process's stderr tail:
+    collect it with on_stderr_line.
+    """
+    summary = SUMMARY.search(stderr)
+    if not summary:
+        return None
+
+    integrated, threshold, lra, true_peak = (_to_db(value) for value in summary.groups())
+    momentary: List[float] = []
+    short_term: List[float] = []
+    peaks: List[float] = []
+
+    for match in FRAME_LINE.finditer(stderr):
+        index = round(float(match.group(1)) / FRAME_STEP)
+        if index >= len(momentary):
+            missing = index + 1 - len(momentary)
+            momentary += [SILENCE] * missing
+            short_term += [SILENCE] * missing
+            peaks += [SILENCE] * missing
+        momentary[index] = _to_db(match.group(2))
+        short_term[index] = _to_db(match.group(3))
+        # One peak per channel
+        peaks[index] = max(_to_db(value) for value in match.group(4).split())
+
+    return LoudnessProfile(
+        source=LoudnessStats(integrated=integrated, true_peak=true_peak, lra=lra, threshold=threshold),
+        momentary=momentary,
+        short_term=short_term,
+        true_peak=peaks,
+    )
+
+
+def loudnorm_filter(stats: LoudnessStats, sample_rate: Optional[int] = None) -> str:
+    """
+    Single-pass linear loudnorm from previously measured stats
+
+    The target is lowered when the full gain would push the true peak over the
+    ceiling, and the target LRA is raised to the measured one, so loudnorm stays
+    in linear mode (one constant gain, no dynamic compression). loudnorm works
+    at 192 kHz, so the output is resampled back to the reel's rate.
+    """
+    target = settings.loudness_target
+    if stats.true_peak + (target - stats.integrated) > settings.loudness_true_peak:
+        target = stats.integrated + settings.loudness_true_peak - stats.true_peak
+    target = min(max(target, -70.0), -5.0)
+
+    loudnorm = (
+        f"loudnorm=I={target:.2f}:TP={settings.loudness_true_peak}"
+        f":LRA={min(max(settings.loudness_range, stats.lra), 50.0):.2f}"
+        f":measured_I={_clamp(stats.integrated, -99, 0)}:measured_TP={_clamp(stats.true_peak, -99, 99)}"
+        f":measured_LRA={_clamp(stats.lra, 0, 99)}:measured_thresh={_clamp(stats.threshold, -99, 0)}"
+        f":linear=true:print_format=none"
+    )
+    return f"{loudnorm},aresample={sample_rate or 48000}"
+
+
+def save_profile(media_path: str, profile: LoudnessProfile) -> None:
+    """Store the profile in <name>.loudness.json next to the media file"""
+    write_sidecar(media_path, 'loudness', profile.to_dict())
+
+
+def load_profile(media_path: str) -> Optional[LoudnessProfile]:
+    """Stored profile of a media file, or None if missing or the file changed since"""
+    data = read_sidecar(media_path, 'loudness')
+    try:
+        return LoudnessProfile.from_dict(data) if data else None
+    except (KeyError, TypeError):
+        return None
+
+
+class LoudnessAnalyzer:
+    """Measure a source once (audio-only decode) and keep the result in its sidecar"""
+
+    def __init__(self, ffmpeg_path: Optional[str] = None):
+        self.ffmpeg_path = ffmpeg_path or settings.ffmpeg_path
+
+    async def profile(self, media_path: str) -> Optional[LoudnessProfile]:
+        """Stored profile, or a fresh measurement when there is none"""
+        profile = load_profile(media_path)
+        if profile:
+            return profile
+
+        cmd = [
+            self.ffmpeg_path,
+            '-nostats',
+            '-i', media_path,
+            '-map', '0:a:0',
+            '-af', MEASURE_FILTER,
+            '-f', 'null', '-'
+        ]
+        logger.info(f"Measuring loudness: {media_path}")
+        log: List[str] = []
+        result = await run_process(cmd, timeout=settings.job_timeout, on_stderr_line=log.append)
+
+        profile = parse_ebur128('\n'.join(log)) if result.ok else None
+        if not profile:
+            logger.error(f"Loudness measurement failed for {media_path}: {result.stderr[-500:]}")
+            return None
+
+        save_profile(media_path, profile)
+        return profile
+
+
+def _energy_mean(values: List[float]) -> float:
+    """Loudness of the mean energy of blocks given in LUFS"""
+    return 10 * math.log10(sum(10 ** (value / 10) for value in values) / len(values))
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of sorted values"""
+    return values[min(len(values) - 1, max(0, math.ceil(fraction * len(values)) - 1))]
+
+
+def _to_db(value: str) -> float:
+    return SILENCE if value == '-inf' else float(value)
+
+
+def _clamp(value: float, low: float, high: float) -> float:
+    return round(min(max(value, low), high), 2)
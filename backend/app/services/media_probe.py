@@ -0,0 +1,265 @@
+"""Memoized media probing: one ffprobe call per file version"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, asdict, field
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+from redis import Redis
+from app.core.config import get_settings
+from app.utils.helpers import get_logger
+from app.utils.process_runner import run_process
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+CACHE_KEY_PREFIX = "media_probe:v1"
+REDIS_RETRY_SECONDS = 60
+
+
+@dataclass
+class MediaInfo:
+    """Typed result of a single ffprobe -show_streams -show_format call"""
+    path: str
+    duration: float
+    size: int
+    format_name: Optional[str] = None
+    bit_rate: Optional[int] = None
+    width: Optional[int] = None
+    height: Optional[int] = None
+    video_codec: Optional[str] = None
+    pix_fmt: Optional[str] = None
+    fps: Optional[float] = None
+    video_bit_rate: Optional[int] = None
+    audio_codec: Optional[str] = None
+    audio_sample_rate: Optional[int] = None
+    audio_channels: Optional[int] = None
+    keyframes: Optional[List[float]] = field(default=None)  # video keyframe timestamps, only when requested
+    
+    @property
+    def has_video(self) -> bool:
+        return self.video_codec is not None
+    
+    @property
+    def has_audio(self) -> bool:
+        return self.audio_codec is not None
+    
+    @property
+    def dimensions(self) -> Optional[Tuple[int, int]]:
+        if self.width and self.height:
+            return self.width, self.height
+        return None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "MediaInfo":
+        return cls(**data)
+
+
+def _to_int(value: Any) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_float(value: Any) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _parse_rate(rate: Optional[str]) -> Optional[float]:
+    """Parse an ffprobe frame rate like '30000/1001'"""
+    if not rate or rate == "0/0":
+        return None
+    try:
+        num, _, den = rate.partition("/")
+        return float(num) / float(den or 1)
+    except (ValueError, ZeroDivisionError):
+        return None
+
+
+class MediaProbe:
+    """
+    Probe media files once and memoize the result
+    
+    Results are keyed by (path, size, mtime), so a rewritten file is re-probed
+    automatically. Lookups go to an in-process LRU first, then Redis, and only
+    then to ffprobe. Redis failures are logged and skipped, never raised.
+    """
+    
+    def __init__(self, ffprobe_path: Optional[str] = None, max_entries: Optional[int] = None):
+        self.ffprobe_path = ffprobe_path or settings.ffprobe_path
+        self.max_entries = max_entries or settings.media_probe_cache_size
+        self._cache: "OrderedDict[str, MediaInfo]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._redis: Optional[Redis] = None
+        self._redis_disabled_until = 0.0
+    
+    async def probe(self, path: str, with_keyframes: bool = False) -> Optional[MediaInfo]:
+        """
+        Return MediaInfo for path, or None if the file is missing or unreadable
+        
+        with_keyframes=True also lists video keyframe timestamps (demuxes the whole
+        file, still a single ffprobe call). A cached entry without keyframes is
+        upgraded on demand.
+        """
+        try:
+            stat = os.stat(path)
+        except OSError as e:
+            logger.error(f"Cannot probe {path}: {str(e)}")
+            return None
+        
+        key = self._cache_key(path, stat)
+        
+        info = self._get_local(key) or self._get_redis(key)
+        if info and (info.keyframes is not None or not with_keyframes):
+            self._put_local(key, info)
+            return info
+        
+        info = await self._run_ffprobe(path, stat.st_size, with_keyframes)
+        if info:
+            self._put_local(key, info)
+            self._put_redis(key, info)
+        return info
+    
+    async def get_duration(self, path: str) -> Optional[float]:
+        info = await self.probe(path)
+        return info.duration if info else None
+    
+    async def get_dimensions(self, path: str) -> Optional[Tuple[int, int]]:
+        info = await self.probe(path)
+        return info.dimensions if info else None
+    
+    async def get_keyframes(self, path: str) -> Optional[List[float]]:
+        info = await self.probe(path, with_keyframes=True)
+        return info.keyframes if info else None
+    
+    def _cache_key(self, path: str, stat: os.stat_result) -> str:
+        path_hash = hashlib.sha1(os.path.realpath(path).encode()).hexdigest()
+        return f"{CACHE_KEY_PREFIX}:{path_hash}:{stat.st_size}:{stat.st_mtime_ns}"
+    
+    async def _run_ffprobe(self, path: str, size: int, with_keyframes: bool) -> Optional[MediaInfo]:
+        cmd = [self.ffprobe_path, '-v', 'error', '-of', 'json']
+        if with_keyframes:
+            cmd += ['-show_entries', 'format:stream:packet=stream_index,pts_time,flags']
+        else:
+            cmd += ['-show_format', '-show_streams']
+        cmd.append(path)
+        
+        result = await run_process(cmd, timeout=300 if with_keyframes else 30)
+        if not result.ok:
+            logger.error(f"ffprobe error for {path}: {result.stderr}")
+            return None
+        
+        try:
+            data = json.loads(result.stdout or "{}")
+        except json.JSONDecodeError as e:
+            logger.error(f"Invalid ffprobe output for {path}: {str(e)}")
+            return None
+        
+        return self._parse(path, size, data, with_keyframes)
+    
+    def _parse(self, path: str, size: int, data: Dict[str, Any], with_keyframes: bool) -> MediaInfo:
+        fmt = data.get('format', {})
+        streams = data.get('streams', [])
+        video = next((s for s in streams if s.get('codec_type') == 'video'
+                      and not s.get('disposition', {}).get('attached_pic')), None)
+        audio = next((s for s in streams if s.get('codec_type') == 'audio'), None)
+        
+        duration = _to_float(fmt.get('duration'))
+        if duration is None and video:
+            duration = _to_float(video.get('duration'))
+        
+        keyframes = None
+        if with_keyframes and video is not None:
+            video_index = video.get('index')
+            keyframes = sorted(
+                pts for pts in (
+                    _to_float(packet.get('pts_time'))
+                    for packet in data.get('packets', [])
+                    if packet.get('stream_index') == video_index and 'K' in packet.get('flags', '')
+                )
+                if pts is not None
+            )
+        
+        return MediaInfo(
+            path=path,
+            duration=duration or 0.0,
+            size=size,
+            format_name=fmt.get('format_name'),
+            bit_rate=_to_int(fmt.get('bit_rate')),
+            width=_to_int(video.get('width')) if video else None,
+            height=_to_int(video.get('height')) if video else None,
+            video_codec=video.get('codec_name') if video else None,
+            pix_fmt=video.get('pix_fmt') if video else None,
+            fps=_parse_rate(video.get('avg_frame_rate') or video.get('r_frame_rate')) if video else None,
+            video_bit_rate=_to_int(video.get('bit_rate')) if video else None,
+            audio_codec=audio.get('codec_name') if audio else None,
+            audio_sample_rate=_to_int(audio.get('sample_rate')) if audio else None,
+            audio_channels=_to_int(audio.get('channels')) if audio else None,
+            keyframes=keyframes,
+        )
+    
+    # In-process LRU
+    
+    def _get_local(self, key: str) -> Optional[MediaInfo]:
+        with self._lock:
+            info = self._cache.get(key)
+            if info is not None:
+                self._cache.move_to_end(key)
+            return info
+    
+    def _put_local(self, key: str, info: MediaInfo) -> None:
+        with self._lock:
+            self._cache[key] = info
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+    
+    # Redis second tier
+    
+    def _get_redis_client(self) -> Optional[Redis]:
+        if time.monotonic() < self._redis_disabled_until:
+            return None
+        if self._redis is None:
+            self._redis = Redis.from_url(settings.redis_url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        return self._redis
+    
+    def _redis_failed(self, e: Exception) -> None:
+        logger.warning(f"Media probe Redis cache unavailable, retrying in {REDIS_RETRY_SECONDS}s: {str(e)}")
+        self._redis_disabled_until = time.monotonic() + REDIS_RETRY_SECONDS
+    
+    def _get_redis(self, key: str) -> Optional[MediaInfo]:
+        client = self._get_redis_client()
+        if client is None:
+            return None
+        try:
+            raw = client.get(key)
+            return MediaInfo.from_dict(json.loads(raw)) if raw else None
+        except Exception as e:
+            self._redis_failed(e)
+            return None
+    
+    def _put_redis(self, key: str, info: MediaInfo) -> None:
+        client = self._get_redis_client()
+        if client is None:
+            return
+        try:
+            client.setex(key, settings.media_probe_cache_ttl, json.dumps(info.to_dict()))
+        except Exception as e:
+            self._redis_failed(e)
+
+
+@lru_cache()
+def get_media_probe(ffprobe_path: Optional[str] = None) -> MediaProbe:
+    """Shared MediaProbe per ffprobe binary, so the LRU is process-wide"""
+    return MediaProbe(ffprobe_path or settings.ffprobe_path)
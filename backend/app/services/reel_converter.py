@@ -1,7 +1,10 @@
 import os
-import subprocess
 import logging
-from typing import Tuple
+from typing import List, Tuple
+from app.services.encoder_profiles import get_profile
+from app.services.media_probe import get_media_probe
+from app.services.reel_layout import layout_filter
+from app.utils.process_runner import run_process
 
 logger = logging.getLogger(__name__)
 
@@ -9,12 +12,16 @@ logger = logging.getLogger(__name__)
 class ReelConverter:
     """Convert video chunks to vertical Instagram Reels (1080x1920)"""
     
-    def __init__(self, ffmpeg_path: str = "ffmpeg", reel_width: int = 1080, reel_height: int = 1920):
+    def __init__(self, ffmpeg_path: str = "ffmpeg", reel_width: int = 1080, reel_height: int = 1920,
+                 ffprobe_path: str = "ffprobe", encoder_profile: str = "standard", layout: str = "pad"):
         self.ffmpeg_path = ffmpeg_path
+        self.ffprobe_path = ffprobe_path
+        self.encoder_profile = get_profile(encoder_profile)
+        self.layout = layout  # pad (black bars) | blur (blurred background)
         self.reel_width = reel_width
         self.reel_height = reel_height
     
-    def convert_to_vertical(self, chunk_path: str, output_path: str) -> Tuple[str, int]:
+    async def convert_to_vertical(self, chunk_path: str, output_path: str) -> Tuple[str, int]:
         """
         Convert chunk to 1080x1920 with black borders (letterbox format)
         Input: 16:9 video chunk
@@ -36,33 +43,16 @@ class ReelConverter:
             video_height = int(1080 * 9 / 16)
             pad_height = (1920 - video_height) // 2
             
-            # FFmpeg filter to scale and pad
-            # scale=1080:-1: Scale to 1080 width, auto height maintaining aspect
-            # pad=1080:1920:(ow-iw)/2:(oh-ih)/2: Pad to 1080x1920, center content
+            cmd = self._build_command(chunk_path, output_path)
             
-            filter_complex = f"scale={self.reel_width}:-1,pad={self.reel_width}:{self.reel_height}:(ow-iw)/2:(oh-ih)/2:color=black"
+            result = await run_process(cmd, timeout=600)
             
-            cmd = [
-                self.ffmpeg_path,
-                "-i", chunk_path,
-                "-vf", filter_complex,
-                "-c:v", "libx264",  # H.264 codec
-                "-preset", "medium",  # medium speed/quality trade-off
-                "-crf", "23",  # Quality (0-51, lower is better, 23 is default)
-                "-c:a", "aac",  # Audio codec
-                "-b:a", "128k",  # Audio bitrate
-                "-y",  # Overwrite output
-                output_path
-            ]
-            
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=600)
-            
-            if result.returncode != 0:
+            if not result.ok:
                 logger.error(f"Conversion error: {result.stderr}")
                 raise Exception(f"Failed to convert to vertical: {result.stderr}")
             
             # Get duration of output
-            duration = self._get_duration(output_path)
+            duration = await self._get_duration(output_path)
             
             logger.info(f"Converted chunk to reel: {output_path} ({duration}s)")
             return output_path, int(duration)
@@ -71,22 +61,76 @@ class ReelConverter:
             logger.error(f"Reel conversion error: {str(e)}")
             raise
     
-    def _get_duration(self, video_path: str) -> float:
-        """Get video duration in seconds"""
+    async def convert_range_to_vertical(self, source_path: str, output_path: str,
+                                  start_time: float, duration: float) -> Tuple[str, int]:
+        """
+        Cut a time range from the source and convert it to 1080x1920 in one encode
+        
+        Skips the intermediate chunk file entirely. Audio is stream-copied when
+        the source audio is already AAC.
+        
+        Returns: (output_path, duration_seconds)
+        """
         try:
-            cmd = [
-                "ffprobe",
-                "-v", "error",
-                "-show_entries", "format=duration",
-                "-of", "default=noprint_wrappers=1:nokey=1",
-                video_path
-            ]
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
             
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
+            copy_audio = await self._get_audio_codec(source_path) == "aac"
+            cmd = self._build_command(source_path, output_path, start_time, duration, copy_audio)
             
-            if result.returncode == 0:
-                return float(result.stdout.strip())
-            return 0.0
+            result = await run_process(cmd, timeout=600)
+            
+            if not result.ok:
+                logger.error(f"Direct conversion error: {result.stderr}")
+                raise Exception(f"Failed to render vertical reel: {result.stderr}")
+            
+            duration = await self._get_duration(output_path)
+            
+            logger.info(f"Rendered reel from source: {output_path} ({duration}s)")
+            return output_path, int(duration)
+        
+        except Exception as e:
+            logger.error(f"Direct reel conversion error: {str(e)}")
+            raise
+    
+    def _build_command(self, input_path: str, output_path: str, start_time: float = None,
+                       duration: float = None, copy_audio: bool = False) -> List[str]:
+        """Build the scale+pad (or blurred background) FFmpeg command, optionally limited to a time range"""
+        # scale=1080:-1: Scale to 1080 width, auto height maintaining aspect
+        # then center on the 1080x1920 canvas over black bars or a blurred copy
+        filter_complex = layout_filter(self.layout, f"scale={self.reel_width}:-1", self.reel_width, self.reel_height)
+        
+        cmd = [self.ffmpeg_path]
+        if start_time is not None:
+            cmd += ["-ss", str(start_time)]  # Input-side seek
+        cmd += ["-i", input_path]
+        if duration is not None:
+            cmd += ["-t", str(duration)]
+        cmd += [
+            "-vf", filter_complex,
+            *self.encoder_profile.encode_args(),  # H.264 + AAC, CRF with VBV caps
+        ]
+        if copy_audio:
+            cmd += ["-c:a", "copy"]
+        cmd += [
+            "-movflags", "+faststart",
+            "-y",  # Overwrite output
+            output_path
+        ]
+        return cmd
+    
+    async def _get_audio_codec(self, video_path: str) -> str:
+        """Get the codec name of the first audio stream"""
+        try:
+            info = await get_media_probe(self.ffprobe_path).probe(video_path)
+            return (info.audio_codec or "") if info else ""
+        
+        except:
+            return ""
+    
+    async def _get_duration(self, video_path: str) -> float:
+        """Get video duration in seconds"""
+        try:
+            return await get_media_probe(self.ffprobe_path).get_duration(video_path) or 0.0
         
         except:
             return 0.0
@@ -0,0 +1,149 @@
+"""Cover frames and thumbnails for every reel of a video from one decode of the source"""
+
+import re
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from app.core.config import get_settings
+from app.utils.helpers import escape_filter_path, get_logger
+from app.utils.process_runner import run_process
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+# Candidates for the automatic cover: frames every COVER_SAMPLE_STEP seconds
+# within COVER_SEARCH_SECONDS of the reel midpoint
+COVER_SEARCH_SECONDS = 1.0
+COVER_SAMPLE_STEP = 0.2
+
+IMAGE_CODECS = {
+    'jpg': ['-c:v', 'mjpeg', '-q:v', '4'],
+    'webp': ['-c:v', 'libwebp', '-quality', '80', '-compression_level', '4'],
+}
+
+METADATA_FRAME = re.compile(r"frame:(\d+)\s+pts:\S+\s+pts_time:([\d.]+)\s*\n\s*lavfi\.blur=([\d.]+)")
+
+
+class CoverExtractor:
+    """
+    Pick and write a cover image per reel in a single ffmpeg run
+
+    One decode of the source feeds a select filter that keeps only a few
+    candidate frames per reel (the chosen timestamp, or samples around the
+    midpoint). Candidates are scored with blurdetect and, in the same graph,
+    rendered through the reel's vertical layout into cover and thumbnail
+    images. The sharpest candidate per reel is kept, the rest are deleted.
+    """
+
+    def __init__(self, ffmpeg_path: Optional[str] = None, image_format: Optional[str] = None,
+                 thumbnail_width: Optional[int] = None):
+        self.ffmpeg_path = ffmpeg_path or settings.ffmpeg_path
+        self.image_format = image_format or settings.cover_format
+        if self.image_format not in IMAGE_CODECS:
+            logger.warning(f"Unknown cover format {self.image_format}, using jpg")
+            self.image_format = 'jpg'
+        self.thumbnail_width = thumbnail_width or settings.thumbnail_width
+
+    async def extract(self, source_path: str, reels: List[Dict], vertical_filter: str,
+                      output_dir: Path) -> Dict[int, Dict]:
+        """
+        Write <output_dir>/reel_NNN_cover.<ext> and reel_NNN_thumb.<ext> for each reel
+
+        reels: dicts with reel_number, start_time, end_time and optionally
+        cover_time (seconds into the reel) to use that frame instead of searching.
+        vertical_filter: the reels' layout filter, so covers match the reel framing.
+
+        Returns: {reel_number: {"cover_path", "thumbnail_path", "cover_time"}}
+        """
+        windows = self._candidate_windows(reels)
+        if not windows:
+            return {}
+
+        output_dir.mkdir(parents=True, exist_ok=True)
+        extension = self.image_format
+
+        with tempfile.TemporaryDirectory(dir=output_dir, prefix='.covers_') as work_dir:
+            blur_log = Path(work_dir) / 'blur.txt'
+            select = '+'.join(f"between(t,{start:.3f},{end:.3f})" for _, start, end in windows)
+            graph = (
+                f"[0:v]select='({select})*(isnan(prev_selected_t)+gte(t-prev_selected_t,{COVER_SAMPLE_STEP - 0.01}))',"
+                f"split=2[score][render];"
+                f"[score]blurdetect,metadata=mode=print:key=lavfi.blur:file={escape_filter_path(blur_log)},nullsink;"
+                f"[render]{vertical_filter},setsar=1,split=2[cover][thumb_full];"
+                f"[thumb_full]scale={self.thumbnail_width}:-2[thumb]"
+            )
+            cmd = [
+                self.ffmpeg_path,
+                '-nostats',
+                '-i', source_path,
+                '-filter_complex', graph,
+                '-map', '[cover]', '-fps_mode', 'passthrough', *IMAGE_CODECS[extension],
+                '-start_number', '0', str(Path(work_dir) / f"cover_%06d.{extension}"),
+                '-map', '[thumb]', '-fps_mode', 'passthrough', *IMAGE_CODECS[extension],
+                '-start_number', '0', str(Path(work_dir) / f"thumb_%06d.{extension}"),
+                '-y'
+            ]
+
+            logger.info(f"Extracting covers for {len(windows)} reels from {source_path}")
+            result = await run_process(cmd, timeout=settings.job_timeout)
+            if not result.ok:
+                logger.error(f"FFmpeg cover extraction error: {result.stderr}")
+                return {}
+
+            candidates = self._parse_blur_log(blur_log)
+            covers = {}
+            for reel_number, start, end in windows:
+                in_window = [candidate for candidate in candidates if start - 0.001 <= candidate[1] <= end + 0.001]
+                if not in_window:
+                    logger.warning(f"No cover candidate for reel {reel_number}")
+                    continue
+
+                # Lowest blurdetect score is the sharpest frame
+                frame, time, _ = min(in_window, key=lambda candidate: candidate[2])
+                reel = next(reel for reel in reels if reel['reel_number'] == reel_number)
+                cover_path = output_dir / f"reel_{reel_number:03d}_cover.{extension}"
+                thumbnail_path = output_dir / f"reel_{reel_number:03d}_thumb.{extension}"
+                (Path(work_dir) / f"cover_{frame:06d}.{extension}").replace(cover_path)
+                (Path(work_dir) / f"thumb_{frame:06d}.{extension}").replace(thumbnail_path)
+
+                covers[reel_number] = {
+                    'cover_path': str(cover_path),
+                    'thumbnail_path': str(thumbnail_path),
+                    'cover_time': round(time - reel['start_time'], 3),
+                }
+
+        logger.info(f"Wrote covers for {len(covers)}/{len(windows)} reels")
+        return covers
+
+    def _candidate_windows(self, reels: List[Dict]) -> List[Tuple[int, float, float]]:
+        """(reel_number, start, end) in source seconds of the frames to consider per reel"""
+        windows = []
+        for reel in reels:
+            if reel.get('start_time') is None or reel.get('end_time') is None:
+                logger.warning(f"Reel {reel.get('reel_number')} has no source range, skipping its cover")
+                continue
+
+            start_time, end_time = reel['start_time'], reel['end_time']
+            if reel.get('cover_time') is not None:
+                # A chosen timestamp: the first frame at or after it
+                time = min(start_time + reel['cover_time'], end_time - COVER_SAMPLE_STEP)
+                windows.append((reel['reel_number'], time, time + COVER_SAMPLE_STEP - 0.01))
+            else:
+                middle = (start_time + end_time) / 2
+                windows.append((
+                    reel['reel_number'],
+                    max(start_time, middle - COVER_SEARCH_SECONDS),
+                    min(end_time, middle + COVER_SEARCH_SECONDS),
+                ))
+        return sorted(windows, key=lambda window: window[1])
+
+    def _parse_blur_log(self, blur_log: Path) -> List[Tuple[int, float, float]]:
+        """(output frame index, source time, blur score) per candidate from the metadata filter log"""
+        try:
+            text = blur_log.read_text()
+        except OSError:
+            return []
+        return [
+            (int(match.group(1)), float(match.group(2)), float(match.group(3)))
+            for match in METADATA_FRAME.finditer(text)
+        ]
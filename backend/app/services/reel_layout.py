@@ -0,0 +1,88 @@
+"""ffmpeg filter graphs that place a landscape frame on the vertical reel canvas"""
+
+from typing import Optional, Tuple
+from app.utils.helpers import get_logger
+
+logger = get_logger(__name__)
+
+LAYOUTS = ('pad', 'blur', 'crop')
+
+# The background is blurred at 1/BLUR_DOWNSCALE of the canvas size, so the blur
+# touches ~1/64 of the pixels of a full-resolution boxblur
+BLUR_DOWNSCALE = 8
+BLUR_RADIUS = 6  # at the downscaled size, roughly a 48px blur on the full canvas
+
+
+def layout_filter(layout: str, foreground_scale: str, width: int, height: int, tag: str = "",
+                  source_size: Optional[Tuple[int, int]] = None, crop_x: Optional[str] = None) -> str:
+    """
+    Filter graph that fits the frame into a width x height canvas
+
+    foreground_scale: scale filter for the foreground, e.g. "scale=1080:607"
+    layout: "pad" (black bars), "blur" (blurred, zoomed copy of the frame behind it)
+    or "crop" (fill the canvas with a crop of the frame; needs source_size)
+    tag: prefix for internal pad labels, so several graphs can share one -filter_complex
+    crop_x: for "crop", ffmpeg expression of the crop's left edge (see smart_crop); default centered
+
+    All graphs take one unlabeled input and produce one unlabeled output, so they
+    work with -vf as well as inside a larger graph.
+    """
+    if layout == 'blur':
+        return blur_fill_filter(foreground_scale, width, height, tag)
+    if layout == 'crop':
+        if source_size:
+            return crop_fill_filter(source_size, width, height, crop_x)
+        logger.warning("Crop layout needs the source size, using pad")
+        return letterbox_filter(foreground_scale, width, height)
+    if layout != 'pad':
+        logger.warning(f"Unknown reel layout {layout}, using pad")
+    return letterbox_filter(foreground_scale, width, height)
+
+
+def letterbox_filter(foreground_scale: str, width: int, height: int) -> str:
+    """Scale and pad with black bars"""
+    return f"{foreground_scale},pad={width}:{height}:(ow-iw)/2:(oh-ih)/2:black"
+
+
+def blur_fill_filter(foreground_scale: str, width: int, height: int, tag: str = "") -> str:
+    """
+    Scale the frame on top of a blurred copy of itself that fills the canvas
+
+    The background copy is cropped to the canvas aspect at 1/8 size, box blurred
+    there and upscaled with a cheap bilinear scaler, all in the same encode pass.
+    """
+    small_width = _even(width // BLUR_DOWNSCALE)
+    small_height = _even(height // BLUR_DOWNSCALE)
+    return (
+        f"split=2[{tag}fg][{tag}bg];"
+        f"[{tag}bg]scale={small_width}:{small_height}:force_original_aspect_ratio=increase:flags=fast_bilinear,"
+        f"crop={small_width}:{small_height},"
+        f"boxblur={BLUR_RADIUS}:2,"
+        f"scale={width}:{height}:flags=fast_bilinear,setsar=1[{tag}blurred];"
+        f"[{tag}fg]{foreground_scale}[{tag}front];"
+        f"[{tag}blurred][{tag}front]overlay=(W-w)/2:(H-h)/2"
+    )
+
+
+def crop_size(source_size: Tuple[int, int], width: int, height: int) -> Tuple[int, int]:
+    """Largest region of the source frame with the canvas aspect ratio"""
+    source_width, source_height = source_size
+    if source_width * height > width * source_height:
+        return min(_even(round(source_height * width / height)), source_width), source_height
+    return source_width, min(_even(round(source_width * height / width)), source_height)
+
+
+def crop_fill_filter(source_size: Tuple[int, int], width: int, height: int, crop_x: Optional[str] = None) -> str:
+    """
+    Crop the frame to the canvas aspect and scale the crop to fill the canvas
+
+    crop_x is evaluated per frame (t is seconds into the input); ffmpeg keeps the
+    crop inside the frame, so the expression may overshoot the edges.
+    """
+    crop_width, crop_height = crop_size(source_size, width, height)
+    x = f"'{crop_x}'" if crop_x else "(iw-ow)/2"
+    return f"crop={crop_width}:{crop_height}:{x}:(ih-oh)/2,scale={width}:{height},setsar=1"
+
+
+def _even(value: int) -> int:
+    return max(2, value - value % 2)
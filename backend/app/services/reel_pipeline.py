@@ -0,0 +1,146 @@
+"""Streaming reel pipeline: render and annotate reels as soon as each is ready"""
+
+import asyncio
+import time
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional
+from app.core.config import get_settings
+from app.services.encode_pool import EncodePool
+from app.services.gemini_service import GeminiAIService
+from app.services.video_service import VideoProcessingService
+from app.utils.helpers import get_logger
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+MetadataFactory = Callable[[Dict], Awaitable[Dict]]
+
+
+class StreamingReelPipeline:
+    """
+    Overlap reel encoding with AI metadata generation
+    
+    Stage 1 renders planned time ranges straight from the source in the encode
+    pool and pushes each finished reel into a bounded asyncio.Queue. Stage 2 runs
+    a few concurrent Gemini calls off that queue. When the queue is full, encode
+    slots wait on it, so rendering never runs more than pipeline_queue_size reels
+    ahead of annotation. Reels reach on_reel_ready in completion order, not chunk
+    order; reel_number identifies them.
+    """
+    
+    def __init__(self, video_service: Optional[VideoProcessingService] = None,
+                 ai_service: Optional[GeminiAIService] = None):
+        self.video_service = video_service or VideoProcessingService()
+        self.ai_service = ai_service or GeminiAIService()
+        self.queue_size = max(1, settings.pipeline_queue_size)
+        self.ai_concurrency = max(1, settings.pipeline_ai_concurrency)
+    
+    async def run(self, video_path: str, video_id: str, total_duration: float,
+                  transcript: Optional[str] = None,
+                  metadata_factory: Optional[MetadataFactory] = None,
+                  on_reel_rendered: Optional[Callable[[Dict], None]] = None,
+                  on_reel_ready: Optional[Callable[[Dict], None]] = None,
+                  completed: Optional[Dict[str, Dict]] = None,
+                  time_ranges: Optional[List[Dict]] = None,
+                  max_reels: Optional[int] = None) -> List[Dict]:
+        """
+        Render and annotate every planned reel, streaming between stages
+        
+        metadata_factory: async reel -> metadata; defaults to Gemini with the transcript
+        on_reel_rendered: called after each new encode (e.g. to checkpoint it)
+        on_reel_ready: called with each reel once its metadata is attached
+        completed: checkpointed reels to reuse instead of re-rendering; those marked
+            'saved' (annotated and passed to on_reel_ready by an earlier attempt)
+            skip annotation and on_reel_ready too
+        time_ranges / max_reels: only the planned ranges select_chunks keeps
+        
+        Returns: reels with 'metadata' (and cover paths when settings.reel_covers), ordered by reel_number
+        Raises: EncodeError or the first stage error; the other stage is cancelled
+        """
+        started = time.monotonic()
+        reels_dir = Path(self.video_service.storage_base) / video_id / "reels"
+        reels_dir.mkdir(parents=True, exist_ok=True)
+        
+        spec = await self.video_service.prepare_render(video_path)
+        if not spec:
+            raise ValueError(f"Cannot prepare render for {video_path}")
+        
+        plan = await self.video_service.plan_source_chunks(video_path, total_duration)
+        if time_ranges or max_reels:
+            plan = self.video_service.select_chunks(plan, time_ranges, max_reels)
+        restored = await self.video_service.restore_checkpoints(completed, plan)
+        # Checkpointed reels are kept; new ranges that repeat an existing reel are never rendered
+        missing = await self.video_service.skip_duplicate_ranges(
+            video_path, video_id, [planned for planned in plan if planned['chunk_number'] not in restored],
+        )
+        plan = sorted([*(planned for planned in plan if planned['chunk_number'] in restored), *missing],
+                      key=lambda planned: planned['chunk_number'])
+        
+        if metadata_factory is None:
+            async def metadata_factory(reel: Dict) -> Dict:
+                return await self.ai_service.generate_reel_metadata(
+                    transcript=transcript,
+                    duration=reel.get('duration'),
+                )
+        
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        results: List[Dict] = []
+        first_reel_at: List[float] = []
+        
+        async def render(planned: Dict, threads: int) -> None:
+            reel = restored.get(planned['chunk_number'])
+            if reel is not None and reel.get('saved'):
+                results.append(reel)
+                return
+            if reel is None:
+                reel = await self.video_service.render_reel_range(video_path, reels_dir, planned, spec, threads)
+                if on_reel_rendered:
+                    on_reel_rendered(reel)
+            # Holding the encode slot while the queue is full is the backpressure
+            await queue.put(reel)
+        
+        async def produce() -> None:
+            try:
+                await EncodePool().map(render, plan)
+            finally:
+                for _ in range(self.ai_concurrency):
+                    await queue.put(None)
+        
+        async def annotate() -> None:
+            while True:
+                reel = await queue.get()
+                if reel is None:
+                    return
+                reel = {**reel, 'metadata': await metadata_factory(reel)}
+                if not first_reel_at:
+                    first_reel_at.append(time.monotonic() - started)
+                    logger.info(f"First reel ready after {first_reel_at[0]:.1f}s (reel {reel['reel_number']})")
+                if on_reel_ready:
+                    on_reel_ready(reel)
+                results.append(reel)
+        
+        logger.info(
+            f"Streaming pipeline: {len(plan)} reels ({len(restored)} from checkpoint), "
+            f"queue {self.queue_size}, {self.ai_concurrency} AI workers"
+        )
+        
+        tasks = [asyncio.ensure_future(produce())]
+        tasks += [asyncio.ensure_future(annotate()) for _ in range(self.ai_concurrency)]
+        try:
+            done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+            for task in done:
+                if task.exception() is not None:
+                    raise task.exception()
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        
+        logger.info(f"Streaming pipeline complete: {len(results)} reels in {time.monotonic() - started:.1f}s")
+        results = sorted(results, key=lambda reel: reel['reel_number'])
+        
+        if settings.reel_covers:
+            # After the last reel, so the cover pass never competes with the encode pool
+            _, results = await self.video_service.extract_reel_covers(video_path, video_id, results, spec)
+        return results
@@ -0,0 +1,94 @@
+"""Low-resolution preview proxies and scrub sprite sheets, branched off the reel's own filter graph"""
+
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from app.core.config import get_settings
+
+settings = get_settings()
+
+# Review copies only: small, fast to encode, cheap to stream
+PREVIEW_VIDEO_ARGS = [
+    '-c:v', 'libx264',
+    '-preset', 'veryfast',
+    '-crf', '30',
+    '-maxrate', '500k',
+    '-bufsize', '1000k',
+    '-pix_fmt', 'yuv420p',
+    '-g', '60',  # keyframe every ~2s so the player can seek while scrubbing
+]
+PREVIEW_AUDIO_ARGS = ['-c:a', 'aac', '-b:a', '64k']
+SPRITE_IMAGE_ARGS = ['-frames:v', '1', '-c:v', 'mjpeg', '-q:v', '5']
+
+
+@dataclass(frozen=True)
+class SpriteLayout:
+    """Grid of evenly spaced frames; tile k shows the reel at k * interval seconds"""
+    columns: int
+    rows: int
+    interval: float
+    tile_width: int
+    tile_height: int
+
+    @classmethod
+    def for_reel(cls, duration: float, reel_size: Tuple[int, int]) -> "SpriteLayout":
+        columns, rows = settings.sprite_columns, settings.sprite_rows
+        tile_width = settings.sprite_tile_width
+        return cls(
+            columns=columns,
+            rows=rows,
+            interval=round(max(duration, 0.1) / (columns * rows), 3),
+            tile_width=tile_width,
+            tile_height=round(tile_width * reel_size[1] / reel_size[0] / 2) * 2,
+        )
+
+
+@dataclass(frozen=True)
+class PreviewSpec:
+    """Where to write a reel's preview proxy and sprite sheet, and how to lay out the sheet"""
+    preview_path: str
+    sprite_path: str
+    reel_size: Tuple[int, int]
+    sprite: SpriteLayout
+
+    @classmethod
+    def for_reel(cls, previews_dir: Path, reel_number: int, duration: float,
+                 reel_size: Tuple[int, int]) -> "PreviewSpec":
+        return cls(
+            preview_path=str(previews_dir / f"reel_{reel_number:03d}_preview.mp4"),
+            sprite_path=str(previews_dir / f"reel_{reel_number:03d}_sprite.jpg"),
+            reel_size=reel_size,
+            sprite=SpriteLayout.for_reel(duration, reel_size),
+        )
+
+    def preview_size(self) -> Tuple[int, int]:
+        width = min(settings.preview_width, self.reel_size[0])
+        return width, round(width * self.reel_size[1] / self.reel_size[0] / 2) * 2
+
+    def graph(self, input_label: str, preview_label: str, sprite_label: str) -> List[str]:
+        """Filter chains turning the finished reel frames at input_label into the two outputs"""
+        width, height = self.preview_size()
+        sprite = self.sprite
+        return [
+            f"[{input_label}]split=2[{preview_label}in][{sprite_label}in]",
+            f"[{preview_label}in]scale={width}:{height}[{preview_label}]",
+            f"[{sprite_label}in]fps=1/{sprite.interval},scale={sprite.tile_width}:{sprite.tile_height},"
+            f"tile={sprite.columns}x{sprite.rows}[{sprite_label}]",
+        ]
+
+    def preview_args(self, threads: Optional[int] = None) -> List[str]:
+        """
+        Encoder options of the proxy output
+
+        threads caps only this output's encoder (-threads is per output); the
+        global -filter_threads of EncodePool.thread_args would also throttle the
+        reel's own filter graph, which the proxy shares.
+        """
+        args = [*PREVIEW_VIDEO_ARGS, *PREVIEW_AUDIO_ARGS]
+        if threads:
+            args += ['-threads', str(threads)]
+        return args
+
+    def sprite_sheet(self) -> Dict:
+        """The sheet's path and grid, as stored on the reel for the scrubber"""
+        return {'path': self.sprite_path, **asdict(self.sprite)}
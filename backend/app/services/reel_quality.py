@@ -0,0 +1,176 @@
+"""Technical quality score of a rendered reel, measured from its decoded frames and audio"""
+
+import tempfile
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Optional
+import numpy as np
+from app.core.config import get_settings
+from app.utils.helpers import get_logger
+from app.utils.process_runner import run_process
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+# Sampled frames are enough for sharpness, black frames and activity; the audio
+# only needs loudness per window, so narrowband mono floats will do
+SAMPLE_FPS = 2
+SAMPLE_WIDTH = 270
+AUDIO_SAMPLE_RATE = 8000
+AUDIO_WINDOW_SECONDS = 0.1
+
+BLACK_LUMA = 20  # a frame this dark on average (0-255) is black; also the threshold for letterbox bars
+SILENT_DB = -45.0  # audio windows quieter than this (dBFS RMS) count as silence
+TARGET_LOUDNESS_DB = -16.0  # mean level of the non-silent windows that scores best
+LOUDNESS_RANGE_DB = 20.0  # dB away from the target at which the loudness score reaches 0
+SHARP_LAPLACIAN = (20.0, 400.0)  # Laplacian variance scoring 0 and 1 (log scale between)
+ACTIVE_DIFFERENCE = 6.0  # mean luma change between samples that counts as fully active
+
+SCORE_WEIGHTS = {'sharpness': 0.3, 'audio': 0.3, 'picture': 0.2, 'activity': 0.2}
+
+
+@dataclass
+class QualityReport:
+    """Measurements of one reel and the 0-1 score derived from them"""
+    sharpness: float  # median Laplacian variance of the sampled frames (picture area only)
+    black_ratio: float  # fraction of sampled frames that are black
+    activity: float  # mean luma change between consecutive samples
+    silence_ratio: float  # fraction of audio windows below SILENT_DB (1.0 without audio)
+    loudness: Optional[float]  # mean level of the non-silent audio, dBFS
+    score: float
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+def picture_area(frames: np.ndarray) -> np.ndarray:
+    """Frames cropped to the rows and columns that are ever brighter than letterbox black"""
+    peak = frames.max(axis=0)
+    rows = np.flatnonzero(peak.max(axis=1) > BLACK_LUMA)
+    columns = np.flatnonzero(peak.max(axis=0) > BLACK_LUMA)
+    if not len(rows) or not len(columns):
+        return frames
+    return frames[:, rows[0]:rows[-1] + 1, columns[0]:columns[-1] + 1]
+
+
+def laplacian_variance(frames: np.ndarray) -> np.ndarray:
+    """Variance of the 4-neighbour Laplacian of every frame, computed for the whole batch at once"""
+    gray = frames.astype(np.float32)
+    laplacian = (gray[:, :-2, 1:-1] + gray[:, 2:, 1:-1] + gray[:, 1:-1, :-2] + gray[:, 1:-1, 2:]
+                 - 4 * gray[:, 1:-1, 1:-1])
+    return laplacian.reshape(len(frames), -1).var(axis=1)
+
+
+def window_levels(samples: np.ndarray, sample_rate: int) -> np.ndarray:
+    """RMS level in dBFS of each AUDIO_WINDOW_SECONDS window of mono float samples"""
+    size = max(1, int(sample_rate * AUDIO_WINDOW_SECONDS))
+    count = len(samples) // size
+    if not count:
+        return np.array([])
+    windows = samples[:count * size].reshape(count, size).astype(np.float64)
+    rms = np.sqrt((windows ** 2).mean(axis=1))
+    return 20 * np.log10(np.maximum(rms, 1e-9))
+
+
+def quality_report(frames: np.ndarray, levels: np.ndarray) -> QualityReport:
+    """
+    Measure sampled gray frames (n, height, width) and audio window levels, and score them
+
+    Each part scores 0-1: sharpness on a log scale between SHARP_LAPLACIAN,
+    audio as the non-silent fraction times closeness to TARGET_LOUDNESS_DB,
+    picture as the non-black fraction, activity as sample-to-sample change up
+    to ACTIVE_DIFFERENCE. The score is their SCORE_WEIGHTS-weighted mean, so
+    the same reel always gets the same score.
+    """
+    frames = picture_area(frames)
+    black = frames.reshape(len(frames), -1).mean(axis=1) < BLACK_LUMA
+    black_ratio = float(black.mean())
+
+    lit = frames[~black]
+    sharpness = float(np.median(laplacian_variance(lit))) if len(lit) else 0.0
+    if len(frames) > 1:
+        changes = np.abs(frames[1:].astype(np.int16) - frames[:-1].astype(np.int16))
+        activity = float(changes.reshape(len(changes), -1).mean(axis=1).mean())
+    else:
+        activity = 0.0
+
+    if len(levels):
+        silent = levels < SILENT_DB
+        silence_ratio = float(silent.mean())
+        # Mean of the power, not of the dB values, so loud passages weigh like a meter shows them
+        loudness = float(10 * np.log10(np.mean(10 ** (levels[~silent] / 10)))) if (~silent).any() else None
+    else:
+        silence_ratio, loudness = 1.0, None
+
+    low, high = np.log10(SHARP_LAPLACIAN[0]), np.log10(SHARP_LAPLACIAN[1])
+    parts = {
+        'sharpness': float(np.clip((np.log10(max(sharpness, 1e-6)) - low) / (high - low), 0, 1)),
+        'audio': (1 - silence_ratio) * (
+            float(np.clip(1 - abs(loudness - TARGET_LOUDNESS_DB) / LOUDNESS_RANGE_DB, 0, 1)) if loudness is not None else 0.0
+        ),
+        'picture': 1 - black_ratio,
+        'activity': float(np.clip(activity / ACTIVE_DIFFERENCE, 0, 1)),
+    }
+    score = sum(SCORE_WEIGHTS[name] * value for name, value in parts.items()) / sum(SCORE_WEIGHTS.values())
+
+    return QualityReport(
+        sharpness=round(sharpness, 2),
+        black_ratio=round(black_ratio, 4),
+        activity=round(activity, 3),
+        silence_ratio=round(silence_ratio, 4),
+        loudness=round(loudness, 2) if loudness is not None else None,
+        score=round(score, 4),
+    )
+
+
+class ReelQualityScorer:
+    """
+    Score rendered reels locally, with no API call
+
+    One ffmpeg run decodes the reel and writes SAMPLE_FPS gray frames at
+    SAMPLE_WIDTH and 8 kHz mono float audio to raw files; everything else is
+    vectorized NumPy over those arrays (see quality_report).
+    """
+
+    def __init__(self, ffmpeg_path: Optional[str] = None):
+        self.ffmpeg_path = ffmpeg_path or settings.ffmpeg_path
+
+    async def score(self, reel_path: str, width: int, height: int, has_audio: bool = True) -> Optional[QualityReport]:
+        """
+        Quality report of a reel of width x height
+
+        Returns: None if the reel can't be decoded
+        """
+        sample_height = max(2, round(SAMPLE_WIDTH * height / width / 2) * 2)
+
+        with tempfile.TemporaryDirectory(prefix='quality_') as work_dir:
+            frames_path = Path(work_dir) / 'frames.gray'
+            audio_path = Path(work_dir) / 'audio.f32'
+            cmd = [
+                self.ffmpeg_path,
+                '-nostats',
+                '-i', reel_path,
+                '-map', '0:v:0',
+                '-vf', f"fps={SAMPLE_FPS},scale={SAMPLE_WIDTH}:{sample_height}:flags=fast_bilinear,format=gray",
+                '-f', 'rawvideo', str(frames_path),
+            ]
+            if has_audio:
+                cmd += ['-map', '0:a:0', '-ac', '1', '-ar', str(AUDIO_SAMPLE_RATE), '-f', 'f32le', str(audio_path)]
+            cmd.append('-y')
+
+            result = await run_process(cmd, timeout=settings.job_timeout)
+            if not result.ok:
+                logger.error(f"FFmpeg quality scoring error for {reel_path}: {result.stderr[-500:]}")
+                return None
+
+            frames = np.fromfile(frames_path, dtype=np.uint8)
+            frame_count = len(frames) // (SAMPLE_WIDTH * sample_height)
+            if not frame_count:
+                logger.warning(f"No frames decoded for quality scoring: {reel_path}")
+                return None
+            frames = frames[:frame_count * SAMPLE_WIDTH * sample_height].reshape(frame_count, sample_height, SAMPLE_WIDTH)
+            samples = np.fromfile(audio_path, dtype=np.float32) if audio_path.exists() else np.array([], dtype=np.float32)
+
+        report = quality_report(frames, window_levels(samples, AUDIO_SAMPLE_RATE))
+        logger.info(f"Quality of {reel_path}: {report.score} ({report})")
+        return report
@@ -0,0 +1,247 @@
+"""Smart crop: a vertical crop window that follows the action in a landscape frame"""
+
+import tempfile
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional, Tuple
+import numpy as np
+from app.core.config import get_settings
+from app.services.reel_layout import crop_size
+from app.utils.helpers import get_logger, read_sidecar, write_sidecar
+from app.utils.process_runner import run_process
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+# Where the action is only needs a coarse answer: a thumbnail-sized gray picture
+# a few times a second keeps the pass a small fraction of the reel encode
+ANALYSIS_WIDTH = 160
+ANALYSIS_FPS = 5
+BATCH_FRAMES = 64  # frames scored per NumPy batch
+
+MOTION_WEIGHT = 0.65  # frame difference vs. edge detail in the saliency map
+CENTER_SIGMA = 0.35  # width of the center prior, as a fraction of the frame width
+CUT_THRESHOLD = 30.0  # mean luma difference (0-255) between analysis frames that counts as a shot change
+
+MEDIAN_SECONDS = 1.0  # median filter first, so one busy frame can't yank the crop
+SMOOTH_SECONDS = 0.5  # then a gaussian of this sigma
+MAX_PAN_SPEED = 0.2  # crop center speed limit within a shot, in frame widths per second
+KEYFRAME_STEP = 1.0  # seconds between points of the piecewise-linear crop path
+
+
+@dataclass
+class CropTrajectory:
+    """
+    Horizontal crop center over time, as a fraction of the frame width
+
+    segments: (start, end, center at start, center at end) in seconds into the
+    range, linear in between; a shot change starts a new segment, so the crop
+    jumps with the cut instead of panning across it.
+    """
+    segments: List[Tuple[float, float, float, float]] = field(default_factory=list)
+
+    def expression(self) -> str:
+        """ffmpeg expression for the crop's left edge (crop x), evaluated per frame"""
+        if not self.segments:
+            return "(iw-ow)/2"
+        center = f"{self.segments[-1][3]:.4f}"
+        for start, end, center_start, center_end in reversed(self.segments):
+            if abs(center_end - center_start) < 1e-4:
+                value = f"{center_start:.4f}"
+            else:
+                value = f"{center_start:.4f}{center_end - center_start:+.4f}*(t-{start:.3f})/{end - start:.3f}"
+            center = f"if(lt(t,{end:.3f}),{value},{center})"
+        return f"iw*({center})-ow/2"
+
+    def center_at(self, time: float) -> float:
+        """Crop center at `time` seconds into the range, as expression() evaluates it"""
+        if not self.segments:
+            return 0.5
+        for start, end, center_start, center_end in self.segments:
+            if time < end:
+                return center_start + (center_end - center_start) * (time - start) / (end - start)
+        return self.segments[-1][3]
+
+    def to_list(self) -> List[List[float]]:
+        return [list(segment) for segment in self.segments]
+
+    @classmethod
+    def from_list(cls, segments: List[List[float]]) -> "CropTrajectory":
+        return cls(segments=[tuple(segment) for segment in segments])
+
+
+def saliency_columns(frames: np.ndarray, previous: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Column saliency profile and mean frame difference of a batch of gray frames
+
+    frames: (n, height, width) uint8; previous: the frame before the batch, if any.
+    Saliency is frame difference (what moves) plus gradient magnitude (detail),
+    each normalized per frame; on a shot change only detail counts.
+    Returns: (n, width) column sums, (n,) mean absolute difference to the previous frame
+    """
+    gray = frames.astype(np.float32)
+    before = np.concatenate(((gray[:1] if previous is None else previous.astype(np.float32)[None]), gray[:-1]))
+    motion = np.abs(gray - before)
+    change = motion.mean(axis=(1, 2))
+    gradient_y, gradient_x = np.gradient(gray, axis=(1, 2))
+    detail = np.hypot(gradient_x, gradient_y)
+
+    motion /= motion.max(axis=(1, 2), keepdims=True) + 1e-6
+    detail /= detail.max(axis=(1, 2), keepdims=True) + 1e-6
+    motion[change >= CUT_THRESHOLD] = 0.0
+    saliency = MOTION_WEIGHT * motion + (1 - MOTION_WEIGHT) * detail
+    return saliency.sum(axis=1), change
+
+
+def window_centers(columns: np.ndarray, window: int) -> np.ndarray:
+    """Center (fraction of width) of the `window`-column span with the most saliency, per frame"""
+    width = columns.shape[1]
+    positions = (np.arange(width) + 0.5) / width
+    prior = np.exp(-0.5 * ((positions - 0.5) / CENTER_SIGMA) ** 2)
+    cumulative = np.concatenate((np.zeros((len(columns), 1)), np.cumsum(columns * prior, axis=1)), axis=1)
+    sums = cumulative[:, window:] - cumulative[:, :-window]
+    return (np.argmax(sums, axis=1) + window / 2) / width
+
+
+def smooth_path(centers: np.ndarray, fps: float, half_width: float) -> np.ndarray:
+    """Median, then gaussian smoothing of one shot's crop centers, speed limited and kept inside the frame"""
+    if len(centers) > 2:
+        radius = max(1, int(MEDIAN_SECONDS * fps / 2))
+        padded = np.pad(centers, radius, mode='edge')
+        centers = np.median(np.lib.stride_tricks.sliding_window_view(padded, 2 * radius + 1), axis=1)
+
+        sigma = SMOOTH_SECONDS * fps
+        radius = max(1, int(3 * sigma))
+        kernel = np.exp(-0.5 * (np.arange(-radius, radius + 1) / sigma) ** 2)
+        centers = np.convolve(np.pad(centers, radius, mode='edge'), kernel / kernel.sum(), mode='valid')
+
+    # Limited in both directions, so a fast move is spread around it instead of only trailing it
+    step = MAX_PAN_SPEED / fps
+    limited = centers.copy()
+    for index in range(1, len(limited)):
+        limited[index] = np.clip(limited[index], limited[index - 1] - step, limited[index - 1] + step)
+    for index in range(len(limited) - 2, -1, -1):
+        limited[index] = np.clip(limited[index], limited[index + 1] - step, limited[index + 1] + step)
+    return np.clip(limited, half_width, 1 - half_width)
+
+
+def crop_trajectory(centers: np.ndarray, cuts: List[int], fps: float, crop_fraction: float,
+                    duration: float) -> CropTrajectory:
+    """Smoothed, piecewise-linear crop path from per-frame centers; frame k is at k / fps seconds"""
+    segments = []
+    bounds = [0, *[cut for cut in cuts if 0 < cut < len(centers)], len(centers)]
+    for shot_start, shot_end in zip(bounds, bounds[1:]):
+        path = smooth_path(centers[shot_start:shot_end], fps, crop_fraction / 2)
+        end_time = duration if shot_end == len(centers) else shot_end / fps
+        step = max(1, int(round(KEYFRAME_STEP * fps)))
+        points = list(range(0, len(path), step))
+        times = [(shot_start + point) / fps for point in points] + [end_time]
+        values = [float(path[point]) for point in points] + [float(path[-1])]
+        for index in range(len(points)):
+            start, end = times[index], times[index + 1]
+            if end - start < 1e-3:
+                continue
+            segment = (round(start, 3), round(end, 3), round(values[index], 4), round(values[index + 1], 4))
+            # Merge steady stretches into one segment
+            if segments and segments[-1][2] == segments[-1][3] == segment[2] == segment[3]:
+                segments[-1] = (segments[-1][0], segment[1], segment[2], segment[3])
+            else:
+                segments.append(segment)
+    return CropTrajectory(segments=segments)
+
+
+class SmartCropper:
+    """
+    Compute crop trajectories that keep the salient part of the frame in a vertical reel
+
+    One low-resolution gray decode of the range (ANALYSIS_FPS frames a second,
+    ANALYSIS_WIDTH wide) is scored in NumPy batches: frame difference plus edge
+    detail with a center prior, summed per column. Each frame's best crop window
+    comes from a cumulative sum over the columns; the centers are smoothed per
+    shot and speed limited. Trajectories for every requested canvas come from
+    the same decode and are kept in a sidecar per range.
+    """
+
+    def __init__(self, ffmpeg_path: Optional[str] = None):
+        self.ffmpeg_path = ffmpeg_path or settings.ffmpeg_path
+
+    async def track(self, media_path: str, start_time: float, duration: float, source_size: Tuple[int, int],
+                    canvas_sizes: List[Tuple[int, int]], use_stored: bool = True) -> List[Optional[CropTrajectory]]:
+        """
+        Crop trajectory of the range for each canvas size, in seconds into the range
+
+        use_stored: reuse the range's sidecar when it has every canvas (False: always analyse)
+
+        Returns: one entry per canvas; None where the crop can't move sideways
+        (source not wider than the canvas) or the analysis failed (centered crop)
+        """
+        fractions = [crop_size(source_size, *canvas)[0] / source_size[0] for canvas in canvas_sizes]
+        keys = [f"{fraction:.4f}" for fraction in fractions if fraction < 1]
+        if not keys:
+            return [None] * len(canvas_sizes)
+
+        kind = f"smartcrop_{start_time:.3f}_{duration:.3f}"
+        stored = (read_sidecar(media_path, kind) if use_stored else None) or {}
+        if not all(key in stored for key in keys):
+            analysis = await self._analyze(media_path, start_time, duration, source_size)
+            if analysis is None:
+                return [None] * len(canvas_sizes)
+            columns, cuts = analysis
+            width = columns.shape[1]
+            stored = {
+                key: crop_trajectory(
+                    window_centers(columns, max(1, min(width, round(float(key) * width)))),
+                    cuts, ANALYSIS_FPS, float(key), duration,
+                ).to_list()
+                for key in set(keys)
+            }
+            write_sidecar(media_path, kind, stored)
+
+        return [
+            CropTrajectory.from_list(stored[f"{fraction:.4f}"]) if fraction < 1 else None
+            for fraction in fractions
+        ]
+
+    async def _analyze(self, media_path: str, start_time: float, duration: float,
+                       source_size: Tuple[int, int]) -> Optional[Tuple[np.ndarray, List[int]]]:
+        """Column saliency of every analysis frame of the range, and the frame indices of shot changes"""
+        width = ANALYSIS_WIDTH
+        height = max(2, round(width * source_size[1] / source_size[0] / 2) * 2)
+
+        with tempfile.TemporaryDirectory(prefix='smartcrop_') as work_dir:
+            frames_path = Path(work_dir) / 'frames.gray'
+            cmd = [
+                self.ffmpeg_path,
+                '-nostats',
+                '-ss', str(start_time),
+                '-t', str(duration),
+                '-i', media_path,
+                '-map', '0:v:0',
+                '-vf', f"fps={ANALYSIS_FPS},scale={width}:{height}:flags=fast_bilinear,format=gray",
+                '-f', 'rawvideo', str(frames_path),
+                '-y'
+            ]
+            logger.info(f"Tracking smart crop for {media_path} {start_time}s + {duration}s")
+            result = await run_process(cmd, timeout=settings.job_timeout)
+            if not result.ok:
+                logger.error(f"FFmpeg smart crop analysis error: {result.stderr[-500:]}")
+                return None
+
+            frame_count = frames_path.stat().st_size // (width * height)
+            if not frame_count:
+                logger.warning(f"No frames decoded for smart crop: {media_path}")
+                return None
+            frames = np.memmap(frames_path, dtype=np.uint8, mode='r', shape=(frame_count, height, width))
+
+            columns, changes = [], []
+            previous = None
+            for batch_start in range(0, frame_count, BATCH_FRAMES):
+                batch = np.asarray(frames[batch_start:batch_start + BATCH_FRAMES])
+                batch_columns, batch_changes = saliency_columns(batch, previous)
+                columns.append(batch_columns)
+                changes.append(batch_changes)
+                previous = batch[-1]
+            del frames
+
+        cuts = [int(index) for index in np.flatnonzero(np.concatenate(changes) >= CUT_THRESHOLD)]
+        return np.concatenate(columns), cuts
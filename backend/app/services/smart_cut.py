@@ -0,0 +1,174 @@
+"""Frame-accurate cuts that re-encode only the partial GOPs at each boundary"""
+
+import tempfile
+from pathlib import Path
+from typing import List, Optional
+from app.core.config import get_settings
+from app.services.encode_pool import EncodePool
+from app.services.media_probe import MediaInfo, get_media_probe
+from app.utils.helpers import get_logger
+from app.utils.process_runner import run_process
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+# Codecs whose packets can be joined with re-encoded pieces by the concat demuxer
+COPYABLE_VIDEO_CODECS = {'h264'}
+COPYABLE_AUDIO_CODECS = {'aac'}
+
+# Below this much copyable interior, a plain re-encode is simpler and about as fast
+MIN_COPY_SECONDS = 1.0
+
+# Encoder of the boundary pieces; they are short, so keep them close to the copied interior.
+# Smart-cut chunks are labelled and cached by these settings, not by an encoder profile.
+BOUNDARY_ENCODE_ARGS = ['-c:v', 'libx264', '-preset', 'fast', '-crf', '18']
+SMART_CUT_LABEL = 'smart_cut'
+
+
+class SmartCutter:
+    """
+    Cut [start, start + duration) with stream copy wherever possible
+
+    The source keyframes come from one memoized ffprobe pass per file. Between the
+    first keyframe at/after start (k1) and the last keyframe at/before the end (k2)
+    packets are stream copied. Only [start, k1) and [k2, end) are decoded and
+    re-encoded with matching stream parameters. The concat demuxer joins the
+    pieces (it converts every file to Annex B, so each piece keeps its own
+    SPS/PPS). Sources that can't be joined this way get a full re-encode.
+    """
+
+    def __init__(self, ffmpeg_path: Optional[str] = None, ffprobe_path: Optional[str] = None):
+        self.ffmpeg_path = ffmpeg_path or settings.ffmpeg_path
+        self.media_probe = get_media_probe(ffprobe_path or settings.ffprobe_path)
+
+    async def cut(self, input_path: str, output_path: str, start_time: float, duration: float,
+                  threads: Optional[int] = None) -> bool:
+        """
+        Cut one frame-accurate chunk
+
+        Returns: True when output_path was written
+        """
+        try:
+            info = await self.media_probe.probe(input_path, with_keyframes=True)
+            if not info:
+                return False
+
+            end_time = min(start_time + duration, info.duration or start_time + duration)
+            bounds = self._copy_bounds(info, start_time, end_time)
+
+            if bounds is None:
+                logger.info(f"Smart cut not possible for {start_time}s - {end_time}s, re-encoding the whole range")
+                return await self._encode_piece(info, input_path, output_path, start_time, end_time - start_time, threads)
+
+            copy_start, copy_end = bounds
+            logger.info(
+                f"Smart cut {start_time}s - {end_time}s: re-encode {copy_start - start_time:.3f}s head, "
+                f"copy {copy_end - copy_start:.3f}s, re-encode {end_time - copy_end:.3f}s tail"
+            )
+
+            with tempfile.TemporaryDirectory(dir=Path(output_path).parent, prefix='.smartcut_') as work_dir:
+                entries = []
+                eps = self._half_frame(info)
+
+                if copy_start - start_time > eps:
+                    head_path = str(Path(work_dir) / 'head.mp4')
+                    if not await self._encode_piece(info, input_path, head_path, start_time, copy_start - start_time, threads):
+                        return False
+                    entries.append([f"file '{head_path}'"])
+
+                entries.append([
+                    f"file '{Path(input_path).resolve()}'",
+                    f"inpoint {copy_start:.6f}",
+                    f"outpoint {copy_end:.6f}",
+                ])
+
+                if end_time - copy_end > eps:
+                    tail_path = str(Path(work_dir) / 'tail.mp4')
+                    if not await self._encode_piece(info, input_path, tail_path, copy_end, end_time - copy_end, threads):
+                        return False
+                    entries.append([f"file '{tail_path}'"])
+
+                list_path = Path(work_dir) / 'pieces.txt'
+                list_path.write_text('\n'.join(line for entry in entries for line in entry) + '\n')
+
+                cmd = [
+                    self.ffmpeg_path,
+                    '-f', 'concat',
+                    '-safe', '0',
+                    '-i', str(list_path),
+                    '-map', '0:v:0',
+                    '-map', '0:a:0?',
+                    '-c', 'copy',
+                    str(output_path),
+                    '-y'
+                ]
+                result = await run_process(cmd, timeout=600)
+
+                if not result.ok:
+                    logger.error(f"FFmpeg smart cut concat error: {result.stderr}")
+                    return False
+
+            return True
+
+        except Exception as e:
+            logger.error(f"Error in smart cut: {str(e)}")
+            return False
+
+    def _copy_bounds(self, info: MediaInfo, start_time: float, end_time: float) -> Optional[List[float]]:
+        """
+        Keyframe-aligned interior [k1, k2) that can be stream copied
+
+        Returns: [k1, k2], or None when the source needs a full re-encode
+        """
+        if info.video_codec not in COPYABLE_VIDEO_CODECS:
+            return None
+        if info.has_audio and info.audio_codec not in COPYABLE_AUDIO_CODECS:
+            return None
+        if not info.keyframes:
+            return None
+
+        eps = self._half_frame(info)
+        inside = [keyframe for keyframe in info.keyframes if start_time - eps <= keyframe <= end_time + eps]
+        if len(inside) < 2 and not (inside and end_time >= info.duration - eps):
+            return None
+
+        copy_start = inside[0]
+        # The source end works as a copy boundary too, the tail is then copied as well
+        copy_end = end_time if end_time >= info.duration - eps else inside[-1]
+
+        if copy_end - copy_start < MIN_COPY_SECONDS:
+            return None
+        return [copy_start, copy_end]
+
+    async def _encode_piece(self, info: MediaInfo, input_path: str, output_path: str, start_time: float,
+                            duration: float, threads: Optional[int] = None) -> bool:
+        """Re-encode a range with the source's stream parameters so it can be joined to copied packets"""
+        cmd = [
+            self.ffmpeg_path,
+            '-ss', f"{start_time:.6f}",
+            '-i', input_path,
+            '-t', f"{duration:.6f}",
+            '-map', '0:v:0',
+            '-map', '0:a:0?',
+            *BOUNDARY_ENCODE_ARGS,
+        ]
+        if info.pix_fmt:
+            cmd += ['-pix_fmt', info.pix_fmt]
+        if info.has_audio:
+            cmd += ['-c:a', 'aac']
+            if info.audio_sample_rate:
+                cmd += ['-ar', str(info.audio_sample_rate)]
+            if info.audio_channels:
+                cmd += ['-ac', str(info.audio_channels)]
+        if threads:
+            cmd += EncodePool.thread_args(threads)
+        cmd += [str(output_path), '-y']
+
+        result = await run_process(cmd, timeout=600)
+        if not result.ok:
+            logger.error(f"FFmpeg smart cut encode error: {result.stderr}")
+            return False
+        return True
+
+    def _half_frame(self, info: MediaInfo) -> float:
+        return 0.5 / (info.fps or 30)
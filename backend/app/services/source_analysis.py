@@ -0,0 +1,229 @@
+"""One cheap analysis decode per source: scene cuts, pauses, per-second activity and fingerprints"""
+
+import re
+import tempfile
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from app.core.config import get_settings
+from app.services.fingerprints import HASH_HEIGHT, HASH_WIDTH, ReelPrint, audio_codes, frame_hashes
+from app.services.media_probe import get_media_probe
+from app.utils.helpers import escape_filter_path, get_logger, read_sidecar, write_sidecar
+from app.utils.process_runner import run_process
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+# The analysis only needs shot changes, pauses and rough activity: a thumbnail-sized
+# picture and narrowband mono audio are enough, and keep the pass far cheaper than a render
+ANALYSIS_WIDTH = 160
+ANALYSIS_SAMPLE_RATE = 8000
+SCENE_THRESHOLD = 0.2  # lowest scene score kept as a cut candidate; strong cuts score 0.4+
+SILENCE_NOISE = "-35dB"
+SILENCE_MIN_SECONDS = 0.3
+SILENT_DB = -90.0  # RMS reported for a second with no signal
+
+SIDECAR_KIND = 'analysis'
+
+SCENE_FRAME = re.compile(r"pts_time:([\d.]+)\s*\n\s*lavfi\.scene_score=([\d.]+)")
+RMS_FRAME = re.compile(r"pts_time:([\d.]+)\s*\n\s*lavfi\.astats\.Overall\.RMS_level=(-?[\d.]+|-inf)")
+SILENCE_START = re.compile(r"silence_start:\s*(-?[\d.]+)")
+SILENCE_END = re.compile(r"silence_end:\s*(-?[\d.]+)")
+
+
+@dataclass
+class SourceAnalysis:
+    """Shot changes, pauses and per-second activity of a source; independent of how it is chunked"""
+    duration: float
+    scene_cuts: List[Tuple[float, float]] = field(default_factory=list)  # (time, scene score)
+    silences: List[Tuple[float, float]] = field(default_factory=list)  # (start, end)
+    audio_rms: List[float] = field(default_factory=list)  # index k: RMS level (dBFS) of second k
+    motion: List[float] = field(default_factory=list)  # index k: mean scene score of second k's frames
+    frame_hashes: List[Optional[int]] = field(default_factory=list)  # index k: dHash of the frame at second k
+    audio_codes: List[Optional[int]] = field(default_factory=list)  # index k: audio code of second k
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "SourceAnalysis":
+        return cls(
+            duration=data['duration'],
+            scene_cuts=[tuple(cut) for cut in data.get('scene_cuts', [])],
+            silences=[tuple(silence) for silence in data.get('silences', [])],
+            audio_rms=data.get('audio_rms', []),
+            motion=data.get('motion', []),
+            frame_hashes=data.get('frame_hashes', []),
+            audio_codes=data.get('audio_codes', []),
+        )
+
+    def fingerprint(self, start_time: float, end_time: float) -> ReelPrint:
+        """Fingerprint of a range: the hashes and codes of the whole seconds inside it"""
+        first, last = int(np.ceil(start_time)), int(end_time)
+        return ReelPrint(frames=self.frame_hashes[first:last], audio=self.audio_codes[first:last])
+
+    def snap(self, target: float, tolerance: float, low: float, high: float) -> float:
+        """
+        Best cut point within tolerance of target, strictly between low and high
+
+        A pause scores 1 plus up to 0.5 for its length; a scene cut scores its
+        scene score, plus 1 when it falls inside a pause (a shot change nobody is
+        talking over). Candidates lose up to 0.5 with distance from target.
+        Returns: target when nothing usable is in reach
+        """
+        start, end = max(target - tolerance, low), min(target + tolerance, high)
+        if start >= end:
+            return target
+
+        candidates = []
+        for silence_start, silence_end in self.silences:
+            if silence_end <= start or silence_start >= end:
+                continue
+            middle = min(max((silence_start + silence_end) / 2, start), end)
+            candidates.append((middle, 1.0 + min(silence_end - silence_start, 1.0) * 0.5))
+        for time, score in self.scene_cuts:
+            if start <= time <= end:
+                in_pause = any(silence_start <= time <= silence_end for silence_start, silence_end in self.silences)
+                candidates.append((time, score + (1.0 if in_pause else 0.0)))
+
+        if not candidates:
+            return target
+        best_time, _ = max(
+            candidates, key=lambda candidate: candidate[1] - 0.5 * abs(candidate[0] - target) / tolerance,
+        )
+        return round(best_time, 3)
+
+
+class SourceAnalyzer:
+    """
+    Run the analysis pass once per source and keep it in a <name>.analysis.json sidecar
+
+    One decode: every frame of a 160px-wide picture gets a scene score (cuts
+    above SCENE_THRESHOLD, per-second means as motion), and 8 kHz mono audio
+    goes through silencedetect and a per-second RMS meter. The same decode
+    writes one 9x8 frame and the raw audio per second for reel fingerprints.
+    Chunk planning, highlight ranking and duplicate detection all read the
+    stored result, so none of them decodes again.
+    """
+
+    def __init__(self, ffmpeg_path: Optional[str] = None, ffprobe_path: Optional[str] = None):
+        self.ffmpeg_path = ffmpeg_path or settings.ffmpeg_path
+        self.media_probe = get_media_probe(ffprobe_path or settings.ffprobe_path)
+
+    async def analyze(self, media_path: str) -> Optional[SourceAnalysis]:
+        """Stored analysis, or a fresh one when there is none"""
+        data = read_sidecar(media_path, SIDECAR_KIND)
+        # Analyses stored before fingerprints were added are redone once
+        if data and 'frame_hashes' in data:
+            return SourceAnalysis.from_dict(data)
+
+        info = await self.media_probe.probe(media_path)
+        if not info or not info.duration:
+            logger.error(f"Cannot analyse a source without a duration: {media_path}")
+            return None
+
+        with tempfile.TemporaryDirectory(prefix='analysis_') as work_dir:
+            scene_log = Path(work_dir) / 'scenes.txt'
+            rms_log = Path(work_dir) / 'rms.txt'
+            hash_frames = Path(work_dir) / 'hashes.gray'
+            samples = Path(work_dir) / 'audio.f32'
+            graph = [
+                f"[0:v:0]scale={ANALYSIS_WIDTH}:-2:flags=fast_bilinear,split=2[scan][thumbs]",
+                f"[scan]select='gte(scene,0)',"
+                f"metadata=mode=print:key=lavfi.scene_score:file={escape_filter_path(scene_log)}[scenes]",
+                f"[thumbs]fps=1,scale={HASH_WIDTH}:{HASH_HEIGHT}:flags=area,format=gray[hashes]",
+            ]
+            maps = ['-map', '[scenes]']
+            extra_outputs = ['-map', '[hashes]', '-f', 'rawvideo', str(hash_frames)]
+            if info.has_audio:
+                graph.append(
+                    f"[0:a:0]aresample={ANALYSIS_SAMPLE_RATE},aformat=channel_layouts=mono,asplit=2[meter][samples]"
+                )
+                extra_outputs += ['-map', '[samples]', '-f', 'f32le', str(samples)]
+                graph.append(
+                    f"[meter]silencedetect=noise={SILENCE_NOISE}:d={SILENCE_MIN_SECONDS},"
+                    f"asetnsamples=n={ANALYSIS_SAMPLE_RATE}:p=0,"
+                    f"astats=metadata=1:reset=1:measure_perchannel=none:measure_overall=RMS_level,"
+                    f"ametadata=mode=print:key=lavfi.astats.Overall.RMS_level:file={escape_filter_path(rms_log)}[audio]"
+                )
+                maps += ['-map', '[audio]']
+
+            cmd = [
+                self.ffmpeg_path,
+                '-nostats',
+                '-i', media_path,
+                '-filter_complex', ';'.join(graph),
+                *maps,
+                '-f', 'null', '-',
+                *extra_outputs,
+                '-y'
+            ]
+            logger.info(f"Analysing scene cuts, pauses and activity: {media_path}")
+            # silencedetect logs to stderr, and run_process only keeps its tail
+            silence_log: List[str] = []
+            result = await run_process(
+                cmd, timeout=settings.job_timeout,
+                on_stderr_line=lambda line: silence_log.append(line) if 'silence_' in line else None,
+            )
+            if not result.ok:
+                logger.error(f"FFmpeg source analysis error: {result.stderr[-500:]}")
+                return None
+
+            scene_text = self._read_log(scene_log)
+            rms_text = self._read_log(rms_log)
+            thumbnails = np.fromfile(hash_frames, dtype=np.uint8) if hash_frames.exists() else np.array([], dtype=np.uint8)
+            thumbnails = thumbnails[:len(thumbnails) // (HASH_WIDTH * HASH_HEIGHT) * HASH_WIDTH * HASH_HEIGHT]
+            audio = np.fromfile(samples, dtype=np.float32) if samples.exists() else np.array([], dtype=np.float32)
+
+        frames = [(float(time), float(score)) for time, score in SCENE_FRAME.findall(scene_text)]
+        analysis = SourceAnalysis(
+            duration=info.duration,
+            scene_cuts=[(time, score) for time, score in frames if score >= SCENE_THRESHOLD],
+            silences=self._parse_silences(silence_log, info.duration),
+            audio_rms=self._per_second(
+                [(float(time), SILENT_DB if level == '-inf' else max(float(level), SILENT_DB))
+                 for time, level in RMS_FRAME.findall(rms_text)],
+                info.duration, SILENT_DB,
+            ),
+            motion=self._per_second(frames, info.duration, 0.0),
+            frame_hashes=frame_hashes(thumbnails.reshape(-1, HASH_HEIGHT, HASH_WIDTH)),
+            audio_codes=audio_codes(audio, ANALYSIS_SAMPLE_RATE),
+        )
+        logger.info(f"{len(analysis.scene_cuts)} scene cuts, {len(analysis.silences)} pauses in {media_path}")
+        write_sidecar(media_path, SIDECAR_KIND, analysis.to_dict())
+        return analysis
+
+    def _read_log(self, path: Path) -> str:
+        try:
+            return path.read_text()
+        except OSError:
+            return ''
+
+    def _per_second(self, samples: List[Tuple[float, float]], duration: float, empty: float) -> List[float]:
+        """Mean of (time, value) samples per whole second of the source"""
+        seconds = max(1, int(duration + 0.999))
+        sums = [0.0] * seconds
+        counts = [0] * seconds
+        for time, value in samples:
+            index = min(int(time), seconds - 1)
+            sums[index] += value
+            counts[index] += 1
+        return [round(total / count, 4) if count else empty for total, count in zip(sums, counts)]
+
+    def _parse_silences(self, lines: List[str], duration: float) -> List[Tuple[float, float]]:
+        """(start, end) pairs from silencedetect's log lines; a pause running into EOF ends at duration"""
+        silences = []
+        start = None
+        for line in lines:
+            match = SILENCE_START.search(line)
+            if match:
+                start = max(0.0, float(match.group(1)))
+                continue
+            match = SILENCE_END.search(line)
+            if match and start is not None:
+                silences.append((start, float(match.group(1))))
+                start = None
+        if start is not None:
+            silences.append((start, duration))
+        return silences
@@ -1,10 +1,14 @@
 import os
-import subprocess
 import logging
 from typing import List, Tuple
 from pathlib import Path
+from app.core.config import get_settings
+from app.services.boundary_planner import BoundaryPlanner
+from app.services.media_probe import get_media_probe
+from app.services.smart_cut import SmartCutter
 
 logger = logging.getLogger(__name__)
+settings = get_settings()
 
 
 class VideoProcessor:
@@ -15,47 +19,51 @@ class VideoProcessor:
         self.ffprobe_path = ffprobe_path
         self.chunk_duration = chunk_duration
     
-    def get_video_duration(self, video_path: str) -> float:
+    async def get_video_duration(self, video_path: str) -> float:
         """Get total video duration in seconds"""
         try:
-            cmd = [
-                self.ffprobe_path,
-                "-v", "error",
-                "-show_entries", "format=duration",
-                "-of", "default=noprint_wrappers=1:nokey=1:noprint_wrappers=1",
-                video_path
-            ]
+            info = await get_media_probe(self.ffprobe_path).probe(video_path)
             
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-            
-            if result.returncode == 0:
-                return float(result.stdout.strip())
+            if info:
+                return info.duration
             else:
-                raise Exception(f"ffprobe error: {result.stderr}")
+                raise Exception(f"ffprobe could not read {video_path}")
         
         except Exception as e:
             logger.error(f"Duration extraction error: {str(e)}")
             raise
     
-    def cut_video_into_chunks(self, video_path: str, chunk_dir: str) -> List[Tuple[str, int, int, int]]:
+    async def cut_video_into_chunks(self, video_path: str, chunk_dir: str) -> List[Tuple[str, int, int, int]]:
         """
         Cut video into sequential 35-second chunks ONLY (no random cutting)
+        
+        Chunks are frame accurate: only the partial GOPs at each boundary are
+        re-encoded, everything in between is stream copied. With
+        settings.boundary_snapping, boundaries move onto nearby scene cuts and pauses
+        (the video's shared plan, see BoundaryPlanner.video_boundaries).
+        
         Returns: List of (chunk_path, chunk_index, start_time, end_time)
         """
         try:
             os.makedirs(chunk_dir, exist_ok=True)
             
             # Get total duration
-            total_duration = self.get_video_duration(video_path)
+            total_duration = await self.get_video_duration(video_path)
             logger.info(f"Video duration: {total_duration}s")
             
+            cutter = SmartCutter(self.ffmpeg_path, self.ffprobe_path)
             chunks = []
             chunk_index = 0
             start_time = 0
             
+            # The video's shared plan, as every other cutting mode uses
+            ends = await BoundaryPlanner(self.ffmpeg_path, self.ffprobe_path).video_boundaries(
+                Path(video_path).parent, total_duration, self.chunk_duration, video_path,
+            )
+            
             # Cut into sequential chunks
             while start_time < total_duration:
-                end_time = min(start_time + self.chunk_duration, total_duration)
+                end_time = ends[chunk_index] if chunk_index < len(ends) else total_duration
                 duration = end_time - start_time
                 
                 # Only create chunk if it's at least 10 seconds
@@ -65,22 +73,8 @@ class VideoProcessor:
                 
                 chunk_path = os.path.join(chunk_dir, f"chunk_{chunk_index:03d}.mp4")
                 
-                # FFmpeg command to cut chunk
-                cmd = [
-                    self.ffmpeg_path,
-                    "-i", video_path,
-                    "-ss", str(start_time),
-                    "-to", str(end_time),
-                    "-c", "copy",  # Copy codec, no re-encoding
-                    "-y",  # Overwrite output
-                    chunk_path
-                ]
-                
-                result = subprocess.run(cmd, capture_output=True, text=True, timeout=600)
-                
-                if result.returncode != 0:
-                    logger.error(f"Chunk cutting error: {result.stderr}")
-                    raise Exception(f"Failed to cut chunk {chunk_index}: {result.stderr}")
+                if not await cutter.cut(video_path, chunk_path, start_time, duration):
+                    raise Exception(f"Failed to cut chunk {chunk_index}")
                 
                 chunks.append((chunk_path, chunk_index, int(start_time), int(end_time)))
                 logger.info(f"Created chunk {chunk_index}: {start_time}s - {end_time}s")
@@ -1,16 +1,51 @@
 """Video cutting and vertical reel conversion service"""
 
-import subprocess
+import asyncio
 import os
+from dataclasses import asdict, dataclass, field
 from pathlib import Path
-from typing import List, Dict, Optional, Tuple
+from typing import Callable, List, Dict, Optional, Tuple
 import logging
 from app.core.config import get_settings
+from app.services.artifact_cache import get_artifact_cache
+from app.services.boundary_planner import DURATION_SLACK, BoundaryPlanner
+from app.services.bumpers import BumperLibrary, ReelFormat
+from app.services.captions import CaptionSegment, ass_filter, write_ass
+from app.services.encode_pool import EncodePool, EncodeError
+from app.services.encoder_profiles import EncoderProfile, default_profile, get_profile, select_profile
+from app.services.fingerprints import load_fingerprint_index, other_owned_reels
+from app.services.highlights import HighlightRanker
+from app.services.loudness import LoudnessAnalyzer, LoudnessProfile, loudnorm_filter
+from app.services.media_probe import MediaInfo, get_media_probe
+from app.services.reel_covers import CoverExtractor
+from app.services.reel_layout import layout_filter
+from app.services.reel_previews import SPRITE_IMAGE_ARGS, PreviewSpec
+from app.services.reel_quality import ReelQualityScorer
+from app.services.smart_crop import SmartCropper
+from app.services.source_analysis import SourceAnalyzer
+from app.services.smart_cut import BOUNDARY_ENCODE_ARGS, SMART_CUT_LABEL, SmartCutter
+from app.services.youtube_downloader import TranscriptExtractor
 from app.utils.helpers import get_logger
+from app.utils.process_runner import run_process
 
 logger = get_logger(__name__)
 settings = get_settings()
 
+SEGMENT_NO_SPLIT = 24 * 3600  # seconds; a segment length no source reaches, for an uncapped one-chunk plan
+
+
+@dataclass
+class RenderSpec:
+    """Per-source settings shared by every reel rendered from that source"""
+    vertical_filter: str
+    copy_audio: bool
+    profile: EncoderProfile
+    aspect: str = "9:16"
+    variants: List[Dict] = field(default_factory=list)  # extra aspects: {"aspect", "width", "height", "filter"}
+    captions: List[CaptionSegment] = field(default_factory=list)  # burned in when settings.burn_captions
+    source: Optional[MediaInfo] = None  # probed source, for matching bumpers to the reel format
+    loudness: Optional[LoudnessProfile] = None  # measured once per source, when loudness_normalization is on
+
 
 class VideoProcessingService:
     """Service for cutting videos into chunks and converting to vertical format"""
@@ -22,13 +57,243 @@ class VideoProcessingService:
         self.chunk_duration = settings.chunk_duration  # 35 seconds
         self.reel_width = settings.reel_width  # 1080
         self.reel_height = settings.reel_height  # 1920
+        self.media_probe = get_media_probe(self.ffprobe_path)
+        self.artifact_cache = get_artifact_cache() if settings.artifact_cache_enabled else None
+        self.bumpers = BumperLibrary(self.ffmpeg_path, self.ffprobe_path)
+    
+    def plan_chunks(self, total_duration: float, ends: Optional[List[float]] = None) -> List[Dict]:
+        """
+        Plan sequential chunk boundaries for a video
+        
+        Example: 0-35s, 35-70s, 70-105s
+        
+        ends: chunk end times to use instead of the uniform grid (see plan_source_chunks)
+        
+        Returns: [{"chunk_number": 1, "start_time": 0, "end_time": 35, "duration": 35}, ...]
+        """
+        plan = []
+        chunk_number = 1
+        current_time = 0
+        
+        while current_time < total_duration:
+            start_time = current_time
+            if ends:
+                end_time = ends[chunk_number - 1] if chunk_number <= len(ends) else total_duration
+            else:
+                end_time = min(current_time + self.chunk_duration, total_duration)
+            plan.append({
+                'chunk_number': chunk_number,
+                'start_time': start_time,
+                'end_time': end_time,
+                'duration': end_time - start_time,
+            })
+            current_time = end_time
+            chunk_number += 1
+        
+        return plan
+    
+    async def plan_source_chunks(self, video_path: str, total_duration: float) -> List[Dict]:
+        """
+        Plan chunks of a downloaded source, with boundaries snapped to scene cuts and pauses
+        
+        Each boundary moves at most settings.boundary_tolerance from the uniform
+        grid, so chunk numbers match plan_chunks(total_duration). The plan is the
+        video's stored one when it has been planned before (see plan_video_chunks).
+        
+        With settings.highlight_top_k, only the best-scoring windows are planned
+        (numbered 1..K in source order, with their "highlight_score").
+        """
+        if self._ranks_highlights(total_duration):
+            highlights = await HighlightRanker(self.ffmpeg_path, self.ffprobe_path).rank(
+                video_path, total_duration, self.chunk_duration, settings.highlight_top_k,
+                captions=TranscriptExtractor().get_caption_segments(str(Path(video_path).parent)),
+            )
+            if highlights:
+                return [
+                    {
+                        'chunk_number': index,
+                        'start_time': highlight.start_time,
+                        'end_time': highlight.end_time,
+                        'duration': round(highlight.end_time - highlight.start_time, 3),
+                        'highlight_score': highlight.score,
+                    }
+                    for index, highlight in enumerate(highlights, start=1)
+                ]
+            logger.warning(f"Highlight ranking failed for {video_path}, planning every chunk")
+        
+        return await self.plan_video_chunks(Path(video_path).parent, total_duration, video_path)
+    
+    async def plan_video_chunks(self, video_dir: Path, total_duration: float,
+                                video_path: Optional[str] = None, cutting: bool = False) -> List[Dict]:
+        """
+        The full chunk plan of the video stored in video_dir, shared by every mode
+        
+        Batch cutting, direct reels, progressive cutting, section downloads and
+        the API selection preview all plan through here, so one video always
+        gets the same boundaries and numbering. Snapped when video_path is on
+        disk to analyse, else the uniform grid (see BoundaryPlanner.video_boundaries).
+        cutting: chunks are cut from the plan before the source can be analysed,
+        so it is stored even when uniform.
+        """
+        ends = await BoundaryPlanner(self.ffmpeg_path, self.ffprobe_path).video_boundaries(
+            video_dir, total_duration, self.chunk_duration, video_path, cutting=cutting,
+        )
+        return self.plan_chunks(total_duration, ends)
+    
+    async def skip_duplicate_ranges(self, video_path: str, video_id: str, plan: List[Dict]) -> List[Dict]:
+        """
+        Fingerprint planned ranges and leave out those that repeat an existing reel
+        
+        Fingerprints come from the source analysis pass, so this costs no decode
+        when chunk planning already ran it. Kept ranges carry their "fingerprint"
+        (stored with the reel). A range is dropped before any encode is spent on
+        it only when it matches a reel that still exists and belongs to another
+        video of the same owner (other_owned_reels); reels of this video, e.g.
+        from an earlier run, never make it a repeat.
+        """
+        if not settings.reel_fingerprints or not plan:
+            return plan
+        analysis = await SourceAnalyzer(self.ffmpeg_path, self.ffprobe_path).analyze(video_path)
+        if not analysis:
+            return plan
+        
+        index = await asyncio.to_thread(load_fingerprint_index)
+        fingerprints = [analysis.fingerprint(planned['start_time'], planned['end_time']) for planned in plan]
+        matches = [index.duplicates(fingerprint) if index else [] for fingerprint in fingerprints]
+        # The index is process-wide and keeps deleted reels: one query narrows every match to live, same-owner reels
+        candidates = {reel_id for found in matches for reel_id, _ in found}
+        owned = await asyncio.to_thread(other_owned_reels, candidates, video_id) if candidates else set()
+        
+        kept = []
+        for planned, fingerprint, found in zip(plan, fingerprints, matches):
+            duplicates = [match for match in found if match[0] in owned]
+            if duplicates:
+                logger.info(
+                    f"Skipping chunk {planned['chunk_number']} ({planned['start_time']}s - {planned['end_time']}s): "
+                    f"repeats reel {duplicates[0][0]} ({duplicates[0][1]:.0%} of frames match)"
+                )
+                continue
+            kept.append({**planned, 'fingerprint': fingerprint.to_dict()})
+        return kept
+    
+    def planned_count(self, total_duration: float, time_ranges: Optional[List[Dict]] = None,
+                      max_reels: Optional[int] = None) -> int:
+        """Number of chunks plan_source_chunks will plan (within the selection), without analysing the source"""
+        count = settings.highlight_top_k if self._ranks_highlights(total_duration) else len(self.plan_chunks(total_duration))
+        if time_ranges or max_reels:
+            count = min(count, len(self.select_chunks(self.plan_chunks(total_duration), time_ranges, max_reels)))
+        return count
+    
+    def _ranks_highlights(self, total_duration: float) -> bool:
+        """Whether highlight ranking applies: only when it leaves chunks out"""
+        return 0 < settings.highlight_top_k < len(self.plan_chunks(total_duration))
+    
+    def select_chunks(self, plan: List[Dict], time_ranges: Optional[List[Dict]] = None,
+                      max_reels: Optional[int] = None) -> List[Dict]:
+        """
+        Pick the planned chunks a partial run should produce
+        
+        Chunks keep their numbers and boundaries from the full plan, so a later
+        full run can fill in the rest.
+        
+        time_ranges: [{"start": 60, "end": 120}, ...] in seconds; a chunk is kept when it overlaps any range
+        max_reels: keep at most this many (earliest) chunks
+        """
+        selected = plan
+        if time_ranges:
+            selected = [
+                planned for planned in plan
+                if any(planned['start_time'] < time_range['end'] and planned['end_time'] > time_range['start']
+                       for time_range in time_ranges)
+            ]
+        if max_reels:
+            selected = selected[:max_reels]
+        return selected
+    
+    def group_sections(self, chunks: List[Dict]) -> List[Dict]:
+        """
+        Merge consecutive planned chunks into contiguous sections to download
+        
+        Returns: [{"start_time": 0, "end_time": 70, "chunks": [...]}, ...]
+        """
+        sections = []
+        for planned in chunks:
+            if sections and sections[-1]['end_time'] == planned['start_time']:
+                sections[-1]['end_time'] = planned['end_time']
+                sections[-1]['chunks'].append(planned)
+            else:
+                sections.append({
+                    'start_time': planned['start_time'],
+                    'end_time': planned['end_time'],
+                    'chunks': [planned],
+                })
+        return sections
     
-    async def cut_into_sequential_chunks(self, video_path: str, video_id: str, total_duration: float) -> Tuple[bool, List[Dict]]:
+    async def cut_sections(self, sections: List[Dict], video_id: str) -> Tuple[bool, List[Dict]]:
+        """
+        Cut chunks from separately downloaded sections of a video
+        
+        sections: group_sections() output with "file_path" set to each section's file.
+        Boundaries are shifted by the section start for cutting, and chunks are
+        reported with their full-video times and numbers.
+        
+        Returns: (success, chunks_list)
+        """
+        try:
+            chunks_dir = Path(self.storage_base) / video_id / "chunks"
+            chunks_dir.mkdir(parents=True, exist_ok=True)
+            
+            pool = EncodePool()
+            chunks_list = []
+            
+            for section in sections:
+                offset = section['start_time']
+                relative_plan = [
+                    {**planned, 'start_time': planned['start_time'] - offset, 'end_time': planned['end_time'] - offset}
+                    for planned in section['chunks']
+                ]
+                
+                logger.info(f"Cutting section {section['start_time']}s - {section['end_time']}s ({len(relative_plan)} chunks)")
+                success, section_chunks = await self._cut_single_pass(section['file_path'], chunks_dir, relative_plan,
+                                                                      threads=pool.cpu_budget)
+                if not success:
+                    return False, []
+                
+                for chunk in section_chunks:
+                    chunk['start_time'] += offset
+                    chunk['end_time'] += offset
+                chunks_list.extend(section_chunks)
+            
+            return True, chunks_list
+        
+        except Exception as e:
+            logger.error(f"Error cutting video sections: {str(e)}", exc_info=True)
+            return False, []
+    
+    async def cut_into_sequential_chunks(self, video_path: str, video_id: str, total_duration: float,
+                                         time_ranges: Optional[List[Dict]] = None,
+                                         max_reels: Optional[int] = None,
+                                         completed: Optional[Dict[str, Dict]] = None,
+                                         on_chunk_done: Optional[Callable[[Dict], None]] = None) -> Tuple[bool, List[Dict]]:
         """
         Cut video into 35-second sequential chunks
         
         Example: 0-35s, 35-70s, 70-105s
         
+        Uses a single ffmpeg segmenting pass by default (settings.chunking_mode = "segment"),
+        or one ffmpeg process per chunk when chunking_mode = "per_chunk" or "smart"
+        (smart re-encodes only the partial GOPs at each boundary and copies the rest).
+        
+        time_ranges / max_reels: cut only the planned chunks select_chunks keeps, with
+        their full-plan numbers and boundaries.
+        
+        completed: checkpointed chunks from an earlier attempt, keyed by chunk number.
+        Those that pass the integrity check are reused; only the rest are cut, one
+        process per missing chunk. on_chunk_done is called for every new chunk.
+        
+        New chunks go through skip_duplicate_ranges: repeats of an existing reel
+        are left out, and the rest carry the "fingerprint" their reel stores.
+        
         Returns: (success, chunks_list)
         chunks_list: [{"chunk_number": 1, "start": 0, "end": 35, "file_path": "..."},  ...]
         """
@@ -36,68 +301,356 @@ class VideoProcessingService:
             chunks_dir = Path(self.storage_base) / video_id / "chunks"
             chunks_dir.mkdir(parents=True, exist_ok=True)
             
-            chunks_list = []
-            chunk_number = 1
-            current_time = 0
+            plan = await self.plan_source_chunks(video_path, total_duration)
+            if time_ranges or max_reels:
+                plan = self.select_chunks(plan, time_ranges, max_reels)
+                logger.info(f"Cutting the selected chunks only: {[planned['chunk_number'] for planned in plan]}")
             
-            logger.info(f"Starting video cutting. Total duration: {total_duration}s, Chunk size: {self.chunk_duration}s")
+            logger.info(f"Starting video cutting ({settings.chunking_mode}). Total duration: {total_duration}s, Chunk size: {self.chunk_duration}s")
             
-            while current_time < total_duration:
-                start_time = current_time
-                end_time = min(current_time + self.chunk_duration, total_duration)
-                duration = end_time - start_time
-                
+            pool = EncodePool()
+            restored = await self.restore_checkpoints(completed, plan)
+            # As in direct mode: ranges that repeat an existing reel are never cut, the rest carry their fingerprint
+            missing = await self.skip_duplicate_ranges(
+                video_path, video_id, [planned for planned in plan if planned['chunk_number'] not in restored],
+            )
+            plan = sorted([*(planned for planned in plan if planned['chunk_number'] in restored), *missing],
+                          key=lambda planned: planned['chunk_number'])
+            
+            if settings.chunking_mode == "segment" and not restored:
+                # The segment muxer needs contiguous chunks, so it runs once per section,
+                # seeked to its start and capped at its end: once over the whole source for
+                # a full plan, once per run of chunks for highlight and selection plans.
+                # Passes run one at a time, so each gets the whole CPU budget
+                chunks_list = []
+                for section in self.group_sections(plan):
+                    success, section_chunks = await self._cut_single_pass(
+                        video_path, chunks_dir, section['chunks'], threads=pool.cpu_budget,
+                    )
+                    if not success:
+                        return False, []
+                    chunks_list.extend(section_chunks)
+                    if on_chunk_done:
+                        for chunk in section_chunks:
+                            on_chunk_done(chunk)
+                return True, chunks_list
+            
+            profile = await self.select_encoder_profile(video_path)
+            smart = settings.chunking_mode == "smart"
+            
+            async def cut_chunk(planned: Dict, threads: int) -> Dict:
+                chunk_number = planned['chunk_number']
                 chunk_path = chunks_dir / f"chunk_{chunk_number:03d}.mp4"
                 
-                logger.info(f"Cutting chunk {chunk_number}: {start_time}s - {end_time}s")
+                logger.info(f"Cutting chunk {chunk_number}: {planned['start_time']}s - {planned['end_time']}s")
                 
                 # Cut video using FFmpeg
-                success = await self._cut_video(video_path, str(chunk_path), start_time, duration)
+                success = await self._cut_video(video_path, str(chunk_path), planned['start_time'], planned['duration'],
+                                                threads, profile)
                 
-                if success:
-                    file_size = os.path.getsize(chunk_path)
-                    chunks_list.append({
-                        'chunk_number': chunk_number,
-                        'start_time': start_time,
-                        'end_time': end_time,
-                        'duration': duration,
-                        'file_path': str(chunk_path),
-                        'file_size': file_size,
-                    })
-                    logger.info(f"Chunk {chunk_number} created: {duration}s, {file_size} bytes")
-                else:
-                    logger.error(f"Failed to cut chunk {chunk_number}")
-                    return False, []
+                if not success:
+                    raise EncodeError(f"Failed to cut chunk {chunk_number}")
                 
-                current_time = end_time
-                chunk_number += 1
+                file_size = os.path.getsize(chunk_path)
+                logger.info(f"Chunk {chunk_number} created: {planned['duration']}s, {file_size} bytes")
+                chunk = {
+                    **planned,
+                    'file_path': str(chunk_path),
+                    'file_size': file_size,
+                    # Smart cuts copy the source's streams; only their boundaries are re-encoded
+                    **({'cut': SMART_CUT_LABEL} if smart else {'encoder_profile': profile.name}),
+                }
+                if on_chunk_done:
+                    on_chunk_done(chunk)
+                return chunk
+            
+            new_chunks = await pool.map(cut_chunk, missing)
+            chunks_list = sorted([*restored.values(), *new_chunks], key=lambda chunk: chunk['chunk_number'])
             
             logger.info(f"Video cutting complete. Created {len(chunks_list)} chunks")
             return True, chunks_list
         
+        except EncodeError as e:
+            logger.error(str(e))
+            return False, []
+        
         except Exception as e:
             logger.error(f"Error cutting video into chunks: {str(e)}", exc_info=True)
             return False, []
     
-    async def _cut_video(self, input_path: str, output_path: str, start_time: float, duration: float) -> bool:
+    async def _cut_single_pass(self, video_path: str, chunks_dir: Path, plan: List[Dict],
+                               threads: Optional[int] = None) -> Tuple[bool, List[Dict]]:
+        """
+        Cut every planned chunk in one demux/decode/encode pass using ffmpeg's segment muxer
+        
+        Keyframes are forced at each boundary so the segment muxer splits exactly on
+        the planned times instead of the next natural keyframe. plan must be
+        contiguous; it may start and end anywhere in the source (a selection).
+        """
+        if not plan:
+            return True, []
+        
+        profile = await self.select_encoder_profile(video_path)
+        chunk_paths = [chunks_dir / f"chunk_{planned['chunk_number']:03d}.mp4" for planned in plan]
+        cache_keys = [
+            await self._artifact_key('segment_chunk', video_path, profile,
+                                     start=planned['start_time'], duration=planned['duration'])
+            for planned in plan
+        ]
+        
+        cache_hits = [self._fetch_cached(key, str(path)) for key, path in zip(cache_keys, chunk_paths)]
+        if all(cache_hits):
+            logger.info(f"All {len(plan)} chunks served from the artifact cache")
+            return True, self._collect_chunks(plan, chunk_paths, profile)
+        
+        # A partial hit still needs the full pass; make sure no output is a hard link into the cache
+        for path in chunk_paths:
+            path.unlink(missing_ok=True)
+        
+        # A partial plan (a selection) starts later in the source: seek there instead of decoding up to it
+        offset = plan[0]['start_time']
+        cmd = [
+            self.ffmpeg_path,
+            *(['-ss', f"{offset:.3f}"] if offset else []),
+            '-i', video_path,
+            *self._segment_output_args(chunks_dir, plan, threads, profile, offset=offset),
+        ]
+        
+        logger.info(f"Segmenting {len(plan)} chunks in a single pass")
+        result = await run_process(cmd, timeout=settings.job_timeout)
+        
+        if not result.ok:
+            logger.error(f"FFmpeg segment error: {result.stderr}")
+            return False, []
+        
+        for planned, chunk_path, key in zip(plan, chunk_paths, cache_keys):
+            if not chunk_path.exists():
+                logger.error(f"Segment missing for chunk {planned['chunk_number']}: {chunk_path}")
+                return False, []
+            self._store_cached(key, str(chunk_path))
+        
+        return True, self._collect_chunks(plan, chunk_paths, profile)
+    
+    async def cut_from_stream(self, stdin_fd: int, source_path: str, video_id: str, total_duration: float,
+                              on_chunk_done: Optional[Callable[[Dict], None]] = None) -> Tuple[bool, List[Dict]]:
+        """
+        Cut chunks from a source that is still arriving on a pipe (progressive ingest)
+        
+        ffmpeg reads the stream from stdin_fd, remuxes it unchanged to source_path and
+        segments it with the same boundaries and encode settings as _cut_single_pass.
+        on_chunk_done fires as soon as each chunk is closed, while later bytes are
+        still downloading. stdin_fd is closed by this call.
+        
+        total_duration (from the video metadata) may be off by up to
+        DURATION_SLACK, so chunks ending that close to it are held back. Once
+        the stream has ended, the plan is fitted to the probed duration of
+        source_path and stored as the video's plan, so batch mode plans the
+        same chunks; the held-back chunks are then reported with their measured end.
+        
+        Returns: (success, chunks_list)
+        """
+        try:
+            chunks_dir = Path(self.storage_base) / video_id / "chunks"
+            chunks_dir.mkdir(parents=True, exist_ok=True)
+            
+            # The source is still arriving: the video's stored plan, or the uniform grid
+            plan = await self.plan_video_chunks(Path(source_path).parent, total_duration, cutting=True)
+            segment_list = chunks_dir / "segments.csv"
+            segment_list.unlink(missing_ok=True)
+            chunk_paths = [chunks_dir / f"chunk_{planned['chunk_number']:03d}.mp4" for planned in plan]
+            for path in chunk_paths:
+                path.unlink(missing_ok=True)
+            
+            # The source can't be probed until it has arrived, so the ladder can't be consulted
+            profile = default_profile()
+            
+            cmd = [
+                self.ffmpeg_path,
+                '-i', 'pipe:0',
+                # Output 1: the full source, stream copied, for later stages
+                '-map', '0',
+                '-c', 'copy',
+                str(source_path),
+                # Output 2: the chunks
+                *self._segment_output_args(chunks_dir, plan, EncodePool().cpu_budget, profile, capped=False),
+            ]
+            
+            logger.info(f"Progressive cutting of {len(plan)} chunks while the source downloads")
+            
+            reported = set()
+            
+            def report_closed_segments(final: bool = False):
+                for chunk_number in self._closed_segments(segment_list):
+                    if chunk_number in reported or not 1 <= chunk_number <= len(plan):
+                        continue
+                    # The tail depends on the real duration, known once the stream ends
+                    if not final and plan[chunk_number - 1]['end_time'] > total_duration - DURATION_SLACK:
+                        continue
+                    reported.add(chunk_number)
+                    chunk_path = chunk_paths[chunk_number - 1]
+                    logger.info(f"Chunk {chunk_number} ready while downloading")
+                    if on_chunk_done:
+                        on_chunk_done({
+                            **plan[chunk_number - 1],
+                            'file_path': str(chunk_path),
+                            'file_size': os.path.getsize(chunk_path),
+                            'encoder_profile': profile.name,
+                        })
+            
+            cutting = asyncio.create_task(run_process(cmd, timeout=settings.job_timeout, stdin_fd=stdin_fd))
+            stdin_fd = None
+            while not cutting.done():
+                await asyncio.wait({cutting}, timeout=1.0)
+                report_closed_segments()
+            result = cutting.result()
+            
+            if not result.ok:
+                logger.error(f"FFmpeg progressive segment error: {result.stderr}")
+                return False, []
+            
+            measured = await self.media_probe.get_duration(str(source_path))
+            if measured and measured != total_duration:
+                logger.info(f"Source is {measured}s, metadata said {total_duration}s: fitting the last chunks")
+                ends = BoundaryPlanner(self.ffmpeg_path, self.ffprobe_path).fit_video_boundaries(
+                    Path(source_path).parent, [planned['end_time'] for planned in plan], measured, self.chunk_duration,
+                )
+                plan = self.plan_chunks(measured, ends)
+                for path in chunk_paths[len(plan):]:
+                    path.unlink(missing_ok=True)
+                chunk_paths = chunk_paths[:len(plan)]
+            report_closed_segments(final=True)
+            
+            for planned, chunk_path in zip(plan, chunk_paths):
+                if not chunk_path.exists():
+                    logger.error(f"Segment missing for chunk {planned['chunk_number']}: {chunk_path}")
+                    return False, []
+                # Source is complete now, so the chunks can be keyed exactly like batch segment cuts
+                key = await self._artifact_key('segment_chunk', str(source_path), profile,
+                                               start=planned['start_time'], duration=planned['duration'])
+                self._store_cached(key, str(chunk_path))
+            
+            return True, self._collect_chunks(plan, chunk_paths, profile)
+        
+        except Exception as e:
+            logger.error(f"Error cutting streamed video into chunks: {str(e)}", exc_info=True)
+            return False, []
+        
+        finally:
+            if stdin_fd is not None:
+                os.close(stdin_fd)
+    
+    def _segment_output_args(self, chunks_dir: Path, plan: List[Dict], threads: Optional[int] = None,
+                             profile: Optional[EncoderProfile] = None, capped: bool = True,
+                             offset: float = 0.0) -> List[str]:
+        """
+        Output arguments that encode the input and split it into the planned chunks
+        
+        Shared by batch and progressive cutting so both produce identical boundaries.
+        capped: end the output at the plan's end. Progressive cutting plans from the
+        metadata duration, so its last chunk instead runs to the end of the stream.
+        offset: source time the input was seeked to (-ss before -i); boundaries shift by it.
+        """
+        boundaries = ','.join(f"{chunk['start_time'] - offset:.3f}" for chunk in plan[1:])
+        end_time = f"{plan[-1]['end_time'] - offset:.3f}"
+        args = [
+            '-map', '0:v:0',
+            '-map', '0:a:0?',
+            *self._encode_args(threads, profile),
+        ]
+        if boundaries:
+            args += ['-force_key_frames', boundaries]
+            # Forced keyframes can round to just before the boundary; without a delta the
+            # segmenter skips them and splits at the next natural keyframe instead
+            args += ['-segment_time_delta', '0.05']
+        # Without split times the segmenter falls back to 2s segments, so one chunk needs them too
+        if capped:
+            args += ['-segment_times', f"{boundaries},{end_time}" if boundaries else end_time, '-t', end_time]
+        else:
+            args += ['-segment_times', boundaries] if boundaries else ['-segment_time', str(SEGMENT_NO_SPLIT)]
+        args += [
+            '-f', 'segment',
+            '-segment_format', 'mp4',
+            '-segment_start_number', str(plan[0]['chunk_number']),
+            '-segment_list', str(chunks_dir / "segments.csv"),
+            '-segment_list_type', 'csv',
+            '-reset_timestamps', '1',
+            str(chunks_dir / 'chunk_%03d.mp4'),
+            '-y'
+        ]
+        return args
+    
+    def _closed_segments(self, segment_list: Path) -> List[int]:
+        """Chunk numbers the segment muxer has finished writing (it lists a segment once it is closed)"""
+        if not segment_list.exists():
+            return []
+        
+        chunk_numbers = []
+        for line in segment_list.read_text().splitlines():
+            name = line.split(',', 1)[0]
+            try:
+                chunk_numbers.append(int(Path(name).stem.rsplit('_', 1)[-1]))
+            except ValueError:
+                continue
+        return chunk_numbers
+    
+    def _collect_chunks(self, plan: List[Dict], chunk_paths: List[Path], profile: EncoderProfile) -> List[Dict]:
+        """Build chunks_list entries from the planned chunks and their files"""
+        chunks_list = []
+        for planned, chunk_path in zip(plan, chunk_paths):
+            file_size = os.path.getsize(chunk_path)
+            chunks_list.append({
+                **planned,
+                'file_path': str(chunk_path),
+                'file_size': file_size,
+                'encoder_profile': profile.name,
+            })
+            logger.info(f"Chunk {planned['chunk_number']} created: {planned['duration']}s, {file_size} bytes")
+        
+        logger.info(f"Video cutting complete. Created {len(chunks_list)} chunks")
+        return chunks_list
+    
+    async def select_encoder_profile(self, video_path: str) -> EncoderProfile:
+        """Encoder profile for everything encoded from this source (resolution/bitrate ladder)"""
+        return select_profile(await self.media_probe.probe(video_path))
+    
+    def _encode_args(self, threads: Optional[int] = None, profile: Optional[EncoderProfile] = None) -> List[str]:
+        """Codec arguments of the encoder profile (default profile when none given), capped to `threads`"""
+        return (profile or default_profile()).encode_args(threads)
+    
+    async def _cut_video(self, input_path: str, output_path: str, start_time: float, duration: float,
+                         threads: Optional[int] = None, profile: Optional[EncoderProfile] = None) -> bool:
         """Cut video segment using FFmpeg"""
         try:
+            smart = settings.chunking_mode == "smart"
+            # SmartCutter ignores the profile: key its chunks by the boundary encoder instead
+            cache_key = await self._artifact_key('smart_chunk' if smart else 'chunk', input_path, profile,
+                                                 encode=BOUNDARY_ENCODE_ARGS if smart else None,
+                                                 start=start_time, duration=duration)
+            if self._fetch_cached(cache_key, output_path):
+                logger.info(f"Artifact cache hit: {output_path}")
+                return True
+            
+            if smart:
+                success = await SmartCutter(self.ffmpeg_path, self.ffprobe_path).cut(input_path, output_path, start_time, duration, threads)
+                if success:
+                    self._store_cached(cache_key, output_path)
+                return success
+            
+            # Input seek: jump to the nearest keyframe instead of decoding everything before start_time
             cmd = [
                 self.ffmpeg_path,
-                '-i', input_path,
                 '-ss', str(start_time),
+                '-i', input_path,
                 '-t', str(duration),
-                '-c:v', 'libx264',  # Video codec
-                '-c:a', 'aac',      # Audio codec
-                '-q:v', '6',        # Quality (1-51, lower is better)
-                '-preset', 'fast',  # Speed (ultrafast, fast, medium, slow)
+                *self._encode_args(threads, profile),
                 str(output_path),
                 '-y'  # Overwrite output
             ]
             
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=600)
+            result = await run_process(cmd, timeout=600)
             
-            if result.returncode == 0:
+            if result.ok:
+                self._store_cached(cache_key, output_path)
                 return True
             else:
                 logger.error(f"FFmpeg cut error: {result.stderr}")
@@ -107,12 +660,18 @@ class VideoProcessingService:
             logger.error(f"Error in _cut_video: {str(e)}")
             return False
     
-    async def convert_to_vertical_reels(self, chunks_list: List[Dict], video_id: str) -> Tuple[bool, List[Dict]]:
+    async def convert_to_vertical_reels(self, chunks_list: List[Dict], video_id: str,
+                                        completed: Optional[Dict[str, Dict]] = None,
+                                        on_reel_done: Optional[Callable[[Dict], None]] = None) -> Tuple[bool, List[Dict]]:
         """
         Convert chunks to vertical format (1080x1920)
         
         Creates canvas with black bars on top/bottom to center original video
         
+        completed: checkpointed reels from an earlier attempt, keyed by chunk number.
+        Reels that pass the integrity check are reused instead of re-encoded.
+        on_reel_done is called for every newly encoded reel.
+        
         Returns: (success, reels_list)
         reels_list: [{"reel_number": 1, "file_path": "...", ...}, ...]
         """
@@ -120,45 +679,590 @@ class VideoProcessingService:
             reels_dir = Path(self.storage_base) / video_id / "reels"
             reels_dir.mkdir(parents=True, exist_ok=True)
             
-            reels_list = []
+            restored = await self.restore_checkpoints(completed, chunks_list)
+            missing = [chunk for chunk in chunks_list if chunk['chunk_number'] not in restored]
+            captions = self.load_captions(Path(self.storage_base) / video_id)
             
-            logger.info(f"Starting vertical reel conversion for {len(chunks_list)} chunks")
+            logger.info(f"Starting vertical reel conversion for {len(missing)} chunks ({len(restored)} restored from checkpoint)")
             
-            for chunk in chunks_list:
+            async def convert_chunk(chunk: Dict, threads: int) -> Dict:
                 chunk_number = chunk['chunk_number']
-                chunk_path = chunk['file_path']
                 reel_number = chunk_number
                 reel_path = reels_dir / f"reel_{reel_number:03d}.mp4"
                 
                 logger.info(f"Converting chunk {chunk_number} to vertical reel {reel_number}")
                 
-                # Convert to vertical format
-                success = await self._convert_to_vertical(chunk_path, str(reel_path))
-                
-                if success:
-                    file_size = os.path.getsize(reel_path)
-                    reels_list.append({
-                        'reel_number': reel_number,
-                        'chunk_number': chunk_number,
-                        'file_path': str(reel_path),
-                        'file_size': file_size,
-                        'duration': chunk['duration'],
-                        'width': self.reel_width,
-                        'height': self.reel_height,
-                    })
-                    logger.info(f"Reel {reel_number} created: {file_size} bytes")
+                # Re-encoded chunks carry the profile chosen for their source, so every reel of a
+                # video matches; smart-cut chunks keep the source's streams and are probed instead
+                if chunk.get('encoder_profile'):
+                    profile = get_profile(chunk['encoder_profile'])
                 else:
-                    logger.error(f"Failed to convert chunk {chunk_number} to vertical reel")
-                    return False, []
+                    profile = await self.select_encoder_profile(chunk['file_path'])
+                width, height = profile.reel_size()
+                
+                # Convert to vertical format, burning in the captions of the chunk's source range
+                caption_window = (chunk['start_time'], chunk['end_time']) if 'start_time' in chunk else None
+                success = await self._convert_to_vertical(chunk['file_path'], str(reel_path), threads, profile,
+                                                          captions if caption_window else None, caption_window)
+                
+                if not success:
+                    raise EncodeError(f"Failed to convert chunk {chunk_number} to vertical reel")
+                
+                chunk_info = await self.media_probe.probe(chunk['file_path'])
+                quality = await self.score_reel(str(reel_path), (width, height), bool(chunk_info and chunk_info.has_audio))
+                reel_format = ReelFormat.for_source(chunk_info, (width, height))
+                bumper_duration = await self.attach_bumpers(str(reel_path), profile, reel_format, threads)
+                
+                file_size = os.path.getsize(reel_path)
+                logger.info(f"Reel {reel_number} created: {file_size} bytes")
+                reel = {
+                    'reel_number': reel_number,
+                    'chunk_number': chunk_number,
+                    'file_path': str(reel_path),
+                    'file_size': file_size,
+                    'duration': chunk['duration'] + bumper_duration,
+                    'bumper_duration': bumper_duration,
+                    'width': width,
+                    'height': height,
+                    'encoder_profile': profile.name,
+                    'fingerprint': chunk.get('fingerprint'),
+                    **quality,
+                }
+                if on_reel_done:
+                    on_reel_done(reel)
+                return reel
+            
+            new_reels = await EncodePool().map(convert_chunk, missing)
+            reels_list = sorted([*restored.values(), *new_reels], key=lambda reel: reel['chunk_number'])
             
             logger.info(f"Vertical reel conversion complete. Created {len(reels_list)} reels")
             return True, reels_list
         
+        except EncodeError as e:
+            logger.error(str(e))
+            return False, []
+        
         except Exception as e:
             logger.error(f"Error converting to vertical reels: {str(e)}", exc_info=True)
             return False, []
     
-    async def _convert_to_vertical(self, input_path: str, output_path: str) -> bool:
+    async def render_reels_from_source(self, video_path: str, video_id: str, total_duration: float,
+                                       keep_chunks: bool = False,
+                                       time_ranges: Optional[List[Dict]] = None,
+                                       max_reels: Optional[int] = None,
+                                       completed: Optional[Dict[str, Dict]] = None,
+                                       on_reel_done: Optional[Callable[[Dict], None]] = None) -> Tuple[bool, List[Dict]]:
+        """
+        Render vertical reels straight from the source video ("direct reel" mode)
+        
+        Each planned time range is seeked, scaled+padded to 1080x1920 and encoded
+        exactly once. Audio is stream-copied when the source codec is already AAC.
+        Intermediate chunk files are only written when keep_chunks=True.
+        
+        time_ranges / max_reels: render only the planned ranges select_chunks keeps.
+        completed / on_reel_done: checkpoint reuse and reporting, as in convert_to_vertical_reels.
+        
+        Returns: (success, reels_list)
+        reels_list: same dicts as convert_to_vertical_reels, plus start_time/end_time
+        """
+        try:
+            reels_dir = Path(self.storage_base) / video_id / "reels"
+            reels_dir.mkdir(parents=True, exist_ok=True)
+            
+            if keep_chunks:
+                success, chunks_list = await self.cut_into_sequential_chunks(
+                    video_path, video_id, total_duration, time_ranges=time_ranges, max_reels=max_reels,
+                )
+                if not success:
+                    return False, []
+                chunk_paths = {chunk['chunk_number']: chunk['file_path'] for chunk in chunks_list}
+            else:
+                chunk_paths = {}
+            
+            spec = await self.prepare_render(video_path)
+            if not spec:
+                return False, []
+            
+            plan = await self.plan_source_chunks(video_path, total_duration)
+            if time_ranges or max_reels:
+                plan = self.select_chunks(plan, time_ranges, max_reels)
+            restored = await self.restore_checkpoints(completed, plan)
+            missing = await self.skip_duplicate_ranges(
+                video_path, video_id, [planned for planned in plan if planned['chunk_number'] not in restored],
+            )
+            
+            logger.info(
+                f"Starting direct reel rendering for {len(missing)} time ranges "
+                f"({len(restored)} restored from checkpoint, audio copy: {spec.copy_audio}, "
+                f"loudness normalization: {spec.loudness is not None})"
+            )
+            
+            async def render_range(planned: Dict, threads: int) -> Dict:
+                reel = await self.render_reel_range(
+                    video_path, reels_dir, planned, spec, threads,
+                    chunk_path=chunk_paths.get(planned['chunk_number']),
+                )
+                if on_reel_done:
+                    on_reel_done(reel)
+                return reel
+            
+            new_reels = await EncodePool().map(render_range, missing)
+            reels_list = sorted([*restored.values(), *new_reels], key=lambda reel: reel['chunk_number'])
+            
+            logger.info(f"Direct reel rendering complete. Created {len(reels_list)} reels")
+            
+            if settings.reel_covers:
+                _, reels_list = await self.extract_reel_covers(video_path, video_id, reels_list, spec)
+            return True, reels_list
+        
+        except EncodeError as e:
+            logger.error(str(e))
+            return False, []
+        
+        except Exception as e:
+            logger.error(f"Error rendering reels from source: {str(e)}", exc_info=True)
+            return False, []
+    
+    async def extract_reel_covers(self, video_path: str, video_id: str, reels: List[Dict],
+                                  spec: Optional[RenderSpec] = None) -> Tuple[bool, List[Dict]]:
+        """
+        Write a cover and thumbnail for every reel from one decode of the source
+        
+        Uses reel['cover_time'] (seconds into the reel) when set, otherwise the
+        sharpest frame near the reel midpoint. Covers go to <video_id>/reels/covers.
+        
+        Returns: (success, reels_list) with cover_path, thumbnail_path and cover_time
+        merged into each reel that got a cover
+        """
+        try:
+            spec = spec or await self.prepare_render(video_path)
+            if not spec:
+                return False, reels
+            
+            covers_dir = Path(self.storage_base) / video_id / "reels" / "covers"
+            cover_filter = await self._cover_layout_filter(video_path, spec, reels)
+            covers = await CoverExtractor(self.ffmpeg_path).extract(video_path, reels, cover_filter, covers_dir)
+            return bool(covers), [{**reel, **covers.get(reel['reel_number'], {})} for reel in reels]
+        
+        except Exception as e:
+            logger.error(f"Error extracting reel covers: {str(e)}", exc_info=True)
+            return False, reels
+    
+    async def prepare_render(self, video_path: str, aspects: Optional[List[str]] = None) -> Optional[RenderSpec]:
+        """
+        Probe the source once and build the settings shared by all of its reels
+        
+        aspects: output aspect ratios such as ["9:16", "4:5", "1:1"] (default settings.reel_aspects).
+        The first is the reel itself; the others are rendered from the same decode as variants.
+        """
+        dimensions = await self._get_video_dimensions(video_path)
+        if not dimensions:
+            logger.error(f"Could not get video dimensions: {video_path}")
+            return None
+        
+        aspects = aspects or [aspect.strip() for aspect in settings.reel_aspects.split(',') if aspect.strip()]
+        profile = await self.select_encoder_profile(video_path)
+        source = await self.media_probe.probe(video_path)
+        
+        outputs = []
+        for index, aspect in enumerate(aspects):
+            size = self._aspect_size(aspect, profile)
+            outputs.append({
+                'aspect': aspect,
+                'width': size[0],
+                'height': size[1],
+                'filter': self._vertical_filter(*dimensions, reel_size=size, tag=f"a{index}"),
+            })
+        
+        return RenderSpec(
+            vertical_filter=outputs[0]['filter'],
+            copy_audio=await self._get_audio_codec(video_path) == 'aac',
+            profile=profile,
+            aspect=outputs[0]['aspect'],
+            variants=outputs[1:],
+            captions=self.load_captions(Path(video_path).parent),
+            source=source,
+            loudness=await self.load_loudness(video_path, source),
+        )
+    
+    async def load_loudness(self, video_path: str, source: Optional[MediaInfo] = None) -> Optional[LoudnessProfile]:
+        """
+        Loudness profile of the source, when loudness_normalization is on
+        
+        Normally recorded while the audio was extracted after download; otherwise
+        measured here with one audio-only pass and stored for the next render.
+        """
+        if not settings.loudness_normalization or (source and not source.has_audio):
+            return None
+        return await LoudnessAnalyzer(self.ffmpeg_path).profile(video_path)
+    
+    def _audio_filter(self, spec: RenderSpec, start_time: float, end_time: float) -> Optional[str]:
+        """Linear loudnorm for the reel's window, from the stored measurements (None: leave audio as is)"""
+        if not spec.loudness:
+            return None
+        stats = spec.loudness.window(start_time, end_time)
+        if not stats:
+            return None
+        return loudnorm_filter(stats, spec.source.audio_sample_rate if spec.source else None)
+    
+    def load_captions(self, video_dir: Path) -> List[CaptionSegment]:
+        """Caption segments from the yt-dlp VTT next to the source, when burn_captions is on"""
+        if not settings.burn_captions:
+            return []
+        captions = TranscriptExtractor().get_caption_segments(str(video_dir))
+        if not captions:
+            logger.warning(f"burn_captions is on but no subtitles were found in {video_dir}")
+        return captions
+    
+    def _caption_filter(self, vertical_filter: str, captions: List[CaptionSegment], start_time: float,
+                        end_time: float, size: Tuple[int, int], captions_dir: Path) -> str:
+        """Append an ass filter burning the window's captions; unchanged when nothing is said in it"""
+        if not captions:
+            return vertical_filter
+        ass_path = write_ass(captions, start_time, end_time, settings.caption_style, *size, captions_dir)
+        if not ass_path:
+            return vertical_filter
+        return f"{vertical_filter},{ass_filter(ass_path)}"
+    
+    def _aspect_size(self, aspect: str, profile: EncoderProfile) -> Tuple[int, int]:
+        """Output size for an aspect ratio at the profile's reel width ("9:16" -> 1080x1920)"""
+        aspect_width, aspect_height = (float(part) for part in aspect.split(':'))
+        width = profile.reel_size()[0]
+        return width, round(width * aspect_height / aspect_width / 2) * 2
+    
+    async def render_reel_range(self, video_path: str, reels_dir: Path, planned: Dict, spec: RenderSpec,
+                                threads: Optional[int] = None, chunk_path: Optional[str] = None) -> Dict:
+        """
+        Render one planned time range of the source to a vertical reel
+        
+        Returns: reel dict (reel_number, chunk_number, start/end, file_path, ...)
+        Raises: EncodeError if ffmpeg fails
+        """
+        reel_number = planned['chunk_number']
+        reel_path = reels_dir / f"reel_{reel_number:03d}.mp4"
+        
+        logger.info(f"Rendering reel {reel_number}: {planned['start_time']}s - {planned['end_time']}s")
+        
+        variants = [
+            {**variant, 'file_path': str(reels_dir / f"reel_{reel_number:03d}_{variant['aspect'].replace(':', 'x')}.mp4")}
+            for variant in spec.variants
+        ]
+        
+        # Captions are burned in by the same encode, one ASS file per canvas size
+        def output_filter(vertical_filter: str, size: Tuple[int, int]) -> str:
+            return self._caption_filter(vertical_filter, spec.captions, planned['start_time'], planned['end_time'],
+                                        size, reels_dir / "captions")
+        
+        layouts = await self._range_layout_filters(video_path, spec, planned['start_time'], planned['duration'])
+        reel_filter = output_filter(layouts[0], self._aspect_size(spec.aspect, spec.profile))
+        
+        # Normalized audio is re-encoded; otherwise AAC sources are still stream copied
+        audio_filter = self._audio_filter(spec, planned['start_time'], planned['end_time'])
+        copy_audio = spec.copy_audio and not audio_filter
+        
+        reel_size = self._aspect_size(spec.aspect, spec.profile)
+        preview = None
+        if settings.reel_previews:
+            preview = PreviewSpec.for_reel(reels_dir / "previews", reel_number, planned['duration'], reel_size)
+        
+        if variants or preview:
+            outputs = [(str(reel_path), reel_filter)] + [
+                (variant['file_path'], output_filter(layout, (variant['width'], variant['height'])))
+                for variant, layout in zip(variants, layouts[1:])
+            ]
+            success = await self._render_reel_outputs(
+                video_path, outputs, planned['start_time'], planned['duration'],
+                copy_audio, threads, spec.profile, audio_filter, preview,
+            )
+        else:
+            success = await self._render_reel(
+                video_path, str(reel_path), planned['start_time'], planned['duration'],
+                reel_filter, copy_audio, threads, spec.profile, audio_filter,
+            )
+        
+        if not success:
+            raise EncodeError(f"Failed to render reel {reel_number}")
+        
+        # Scored before the bumpers are joined, so brand clips don't count towards the reel
+        quality = await self.score_reel(str(reel_path), reel_size, bool(spec.source and spec.source.has_audio))
+        
+        bumper_duration = await self.attach_bumpers(
+            str(reel_path), spec.profile, ReelFormat.for_source(spec.source, reel_size), threads,
+        )
+        for variant in variants:
+            await self.attach_bumpers(
+                variant['file_path'], spec.profile,
+                ReelFormat.for_source(spec.source, (variant['width'], variant['height'])), threads,
+            )
+        
+        file_size = os.path.getsize(reel_path)
+        logger.info(f"Reel {reel_number} created: {file_size} bytes ({len(variants)} extra aspects)")
+        return {
+            'reel_number': reel_number,
+            'chunk_number': planned['chunk_number'],
+            'chunk_path': chunk_path,
+            'start_time': planned['start_time'],
+            'end_time': planned['end_time'],
+            'file_path': str(reel_path),
+            'file_size': file_size,
+            'duration': planned['duration'] + bumper_duration,
+            'bumper_duration': bumper_duration,
+            'width': reel_size[0],
+            'height': reel_size[1],
+            'encoder_profile': spec.profile.name,
+            'aspect': spec.aspect,
+            'preview_path': preview.preview_path if preview else None,
+            'sprite_sheet': preview.sprite_sheet() if preview else None,
+            'fingerprint': planned.get('fingerprint'),
+            **quality,
+            'variants': [
+                {
+                    'aspect': variant['aspect'],
+                    'width': variant['width'],
+                    'height': variant['height'],
+                    'file_path': variant['file_path'],
+                    'file_size': os.path.getsize(variant['file_path']),
+                }
+                for variant in variants
+            ],
+        }
+    
+    async def _range_layout_filters(self, video_path: str, spec: RenderSpec, start_time: float,
+                                    duration: float) -> List[str]:
+        """
+        Layout filters of the reel and its variants for one time range
+        
+        The spec's filters, except with the "crop" layout: then each canvas gets
+        a crop that follows the action in this range (see SmartCropper).
+        """
+        filters = [spec.vertical_filter] + [variant['filter'] for variant in spec.variants]
+        if settings.reel_layout != 'crop' or not spec.source or not spec.source.dimensions:
+            return filters
+        
+        sizes = [self._aspect_size(spec.aspect, spec.profile)] + [
+            (variant['width'], variant['height']) for variant in spec.variants
+        ]
+        trajectories = await SmartCropper(self.ffmpeg_path).track(
+            video_path, start_time, duration, spec.source.dimensions, sizes,
+        )
+        return [
+            self._vertical_filter(*spec.source.dimensions, reel_size=size, crop_x=trajectory.expression())
+            if trajectory else static
+            for size, trajectory, static in zip(sizes, trajectories, filters)
+        ]
+    
+    async def _cover_layout_filter(self, video_path: str, spec: RenderSpec, reels: List[Dict]) -> str:
+        """
+        Layout filter for the covers of reels, which are taken from one decode of the whole source
+        
+        The spec's filter, except with the "crop" layout: then each reel's covers
+        are cropped at one position, where that reel's trajectory is at the middle
+        of its cover window. The crop x is a flat sum with one constant term per
+        reel, evaluated only on the few candidate frames the cover graph selects.
+        """
+        if settings.reel_layout != 'crop' or not spec.source or not spec.source.dimensions:
+            return spec.vertical_filter
+        
+        size = self._aspect_size(spec.aspect, spec.profile)
+        cropper = SmartCropper(self.ffmpeg_path)
+        terms = []
+        for reel in reels:
+            start_time, end_time = reel.get('start_time'), reel.get('end_time')
+            if start_time is None or end_time is None:
+                continue
+            trajectory, = await cropper.track(video_path, start_time, end_time - start_time, spec.source.dimensions, [size])
+            # Same frame the cover search centres on (see CoverExtractor)
+            cover_time = reel['cover_time'] if reel.get('cover_time') is not None else (end_time - start_time) / 2
+            center = trajectory.center_at(cover_time) if trajectory else 0.5
+            terms.append(f"gte(t,{start_time:.3f})*lt(t,{end_time:.3f})*{center:.4f}")
+        if not terms:
+            return spec.vertical_filter
+        return self._vertical_filter(*spec.source.dimensions, reel_size=size, crop_x=f"iw*({'+'.join(terms)})-ow/2")
+    
+    async def score_reel(self, reel_path: str, reel_size: Tuple[int, int], has_audio: bool) -> Dict:
+        """
+        Technical quality of a rendered reel, measured locally when quality_scoring is on
+        
+        Returns: {"quality_score", "quality_metrics"}, or {} when scoring is off or fails
+        """
+        if not settings.quality_scoring:
+            return {}
+        report = await ReelQualityScorer(self.ffmpeg_path).score(reel_path, *reel_size, has_audio=has_audio)
+        if not report:
+            return {}
+        return {'quality_score': report.score, 'quality_metrics': report.to_dict()}
+    
+    async def attach_bumpers(self, reel_path: str, profile: EncoderProfile, reel_format: ReelFormat,
+                             threads: Optional[int] = None) -> float:
+        """
+        Join the configured brand intro/outro to a rendered reel without re-encoding it
+        
+        Bumpers are pre-encoded once per encoder profile and reel format (see
+        BumperLibrary), so this is a stream-copy concat per reel.
+        
+        Returns: seconds added to the reel (0 when no bumpers are configured)
+        Raises: EncodeError if a bumper can't be prepared or joined
+        """
+        if not settings.bumper_intro_path and not settings.bumper_outro_path:
+            return 0.0
+        
+        prepared = []
+        for bumper_path in (settings.bumper_intro_path, settings.bumper_outro_path):
+            if not bumper_path:
+                prepared.append(None)
+                continue
+            bumper = await self.bumpers.prepare(bumper_path, profile, reel_format, threads)
+            if not bumper:
+                raise EncodeError(f"Failed to prepare bumper {bumper_path}")
+            prepared.append(bumper)
+        
+        if not await self.bumpers.attach(reel_path, *prepared):
+            raise EncodeError(f"Failed to attach bumpers to {reel_path}")
+        
+        return sum([await self.bumpers.duration(bumper) for bumper in prepared])
+    
+    async def _render_reel(self, input_path: str, output_path: str, start_time: float, duration: float,
+                           vertical_filter: str, copy_audio: bool, threads: Optional[int] = None,
+                           profile: Optional[EncoderProfile] = None, audio_filter: Optional[str] = None) -> bool:
+        """Cut and convert one time range to a vertical reel in a single encode"""
+        try:
+            cache_key = await self._artifact_key(
+                'reel', input_path, profile, start=start_time, duration=duration,
+                filter=vertical_filter, copy_audio=copy_audio, audio_filter=audio_filter,
+            )
+            if self._fetch_cached(cache_key, output_path):
+                logger.info(f"Artifact cache hit: {output_path}")
+                return True
+            
+            cmd = [
+                self.ffmpeg_path,
+                '-ss', str(start_time),  # Input-side seek: jump to the nearest keyframe, decode only this range
+                '-i', input_path,
+                '-t', str(duration),
+                '-map', '0:v:0',
+                '-map', '0:a:0?',
+                '-vf', vertical_filter,
+                *self._encode_args(threads, profile),
+            ]
+            if copy_audio:
+                cmd += ['-c:a', 'copy']
+            elif audio_filter:
+                cmd += ['-af', audio_filter]
+            cmd += ['-movflags', '+faststart', str(output_path), '-y']
+            
+            result = await run_process(cmd, timeout=600)
+            
+            if result.ok:
+                self._store_cached(cache_key, output_path)
+                return True
+            else:
+                logger.error(f"FFmpeg direct reel error: {result.stderr}")
+                return False
+        
+        except Exception as e:
+            logger.error(f"Error in _render_reel: {str(e)}")
+            return False
+    
+    async def _render_reel_outputs(self, input_path: str, outputs: List[Tuple[str, str]], start_time: float,
+                                   duration: float, copy_audio: bool, threads: Optional[int] = None,
+                                   profile: Optional[EncoderProfile] = None, audio_filter: Optional[str] = None,
+                                   preview: Optional[PreviewSpec] = None) -> bool:
+        """
+        Render one time range to several outputs (path, scale+pad filter) from a single decode
+        
+        A split filter graph fans the decoded frames out to one scale/pad chain and
+        encoder per output, so extra aspect ratios cost an encode but no extra decode.
+        Each output is cached as its own artifact with the same key a single render would use.
+        
+        preview: also write a low-resolution proxy and a sprite sheet, branched off
+        the first output's finished frames (so captions and layout match the reel).
+        """
+        try:
+            cache_keys = [
+                await self._artifact_key(
+                    'reel', input_path, profile, start=start_time, duration=duration,
+                    filter=output_filter, copy_audio=copy_audio, audio_filter=audio_filter,
+                )
+                for _, output_filter in outputs
+            ]
+            artifacts = [(key, output_path) for key, (output_path, _) in zip(cache_keys, outputs)]
+            if preview:
+                preview_key = await self._artifact_key(
+                    'preview', input_path, profile, start=start_time, duration=duration, filter=outputs[0][1],
+                    audio_filter=audio_filter, preview=preview.preview_args(), size=preview.preview_size(),
+                )
+                sprite_key = await self._artifact_key(
+                    'sprite', input_path, profile, start=start_time, duration=duration, filter=outputs[0][1],
+                    sprite=asdict(preview.sprite), image=SPRITE_IMAGE_ARGS,
+                )
+                artifacts += [(preview_key, preview.preview_path), (sprite_key, preview.sprite_path)]
+                Path(preview.preview_path).parent.mkdir(parents=True, exist_ok=True)
+            
+            cache_hits = [self._fetch_cached(key, output_path) for key, output_path in artifacts]
+            if all(cache_hits):
+                logger.info(f"Artifact cache hit for all {len(artifacts)} outputs of {start_time}s - {start_time + duration}s")
+                return True
+            
+            for _, output_path in artifacts:
+                Path(output_path).unlink(missing_ok=True)
+            
+            # The encoders run side by side, so they share the job's thread budget
+            # (the preview encode is small enough to ride along without a share)
+            output_threads = max(1, threads // len(outputs)) if threads else None
+            labels = [f"v{index}" for index in range(len(outputs))]
+            audio_labels = labels + (['preview'] if preview else [])
+            sinks = {label: f"[{label}out]" for label in labels}
+            if preview:
+                # The reel's finished frames also feed the proxy and the sprite sheet
+                sinks['v0'] = ",split=2[v0out][v0preview]"
+            graph = [f"[0:v]split={len(outputs)}" + ''.join(f"[{label}]" for label in labels)]
+            graph += [f"[{label}]{output_filter}{sinks[label]}" for label, (_, output_filter) in zip(labels, outputs)]
+            if preview:
+                graph += preview.graph('v0preview', 'previewout', 'spriteout')
+            if audio_filter:
+                # Normalize once, then fan the audio out like the video
+                graph.append(
+                    f"[0:a:0]{audio_filter},asplit={len(audio_labels)}" + ''.join(f"[{label}aout]" for label in audio_labels)
+                )
+            
+            cmd = [
+                self.ffmpeg_path,
+                '-ss', str(start_time),  # Input-side seek, decoded once for every output
+                '-t', str(duration),  # input option: an output -t would only limit the first output
+                '-i', input_path,
+                '-filter_complex', ';'.join(graph),
+            ]
+            for label, (output_path, _) in zip(labels, outputs):
+                audio_map = f"[{label}aout]" if audio_filter else '0:a:0?'
+                cmd += ['-map', f"[{label}out]", '-map', audio_map, *self._encode_args(output_threads, profile)]
+                if copy_audio:
+                    cmd += ['-c:a', 'copy']
+                cmd += ['-movflags', '+faststart', output_path]
+            if preview:
+                audio_map = '[previewaout]' if audio_filter else '0:a:0?'
+                cmd += ['-map', '[previewout]', '-map', audio_map, *preview.preview_args(1)]
+                cmd += ['-movflags', '+faststart', preview.preview_path]
+                cmd += ['-map', '[spriteout]', *SPRITE_IMAGE_ARGS, preview.sprite_path]
+            cmd.append('-y')
+            
+            result = await run_process(cmd, timeout=600)
+            
+            if not result.ok:
+                logger.error(f"FFmpeg multi-output reel error: {result.stderr}")
+                return False
+            
+            for key, output_path in artifacts:
+                self._store_cached(key, output_path)
+            return True
+        
+        except Exception as e:
+            logger.error(f"Error in _render_reel_outputs: {str(e)}")
+            return False
+    
+    async def _convert_to_vertical(self, input_path: str, output_path: str, threads: Optional[int] = None,
+                                   profile: Optional[EncoderProfile] = None,
+                                   captions: Optional[List[CaptionSegment]] = None,
+                                   caption_window: Optional[Tuple[float, float]] = None) -> bool:
         """
         Convert video to 1080x1920 vertical format
         
@@ -167,6 +1271,9 @@ class VideoProcessingService:
         2. Scale to fit within 1080 width while maintaining aspect ratio
         3. Create 1080x1920 canvas with black bars
         4. Overlay scaled video centered
+        5. Burn in captions for caption_window (the chunk's range in the source), if given
+        
+        With the "crop" layout, steps 2-4 become a crop that follows the action in the chunk.
         """
         try:
             # Get input video dimensions
@@ -178,43 +1285,40 @@ class VideoProcessingService:
             width, height = dimensions
             logger.info(f"Input video dimensions: {width}x{height}")
             
-            # Calculate scaling to fit 1080x1920
-            # If video is wider, scale to 1080 width
-            if width / height > self.reel_width / self.reel_height:
-                # Video is too wide, scale by width
-                scale_width = self.reel_width
-                scale_height = int(self.reel_width * height / width)
-            else:
-                # Video is too tall, scale by height
-                scale_height = self.reel_height
-                scale_width = int(self.reel_height * width / height)
-            
-            logger.info(f"Scaling to: {scale_width}x{scale_height}")
-            
-            # FFmpeg filter to scale and add black bars
-            # Create canvas, scale input, and overlay centered
-            filter_complex = (
-                f"scale={scale_width}:{scale_height},"
-                f"pad={self.reel_width}:{self.reel_height}:"
-                f"(ow-iw)/2:(oh-ih)/2:black"
-            )
+            profile = profile or await self.select_encoder_profile(input_path)
+            crop_x = None
+            if settings.reel_layout == 'crop':
+                duration = await self.media_probe.get_duration(input_path)
+                if duration:
+                    trajectory, = await SmartCropper(self.ffmpeg_path).track(
+                        input_path, 0.0, duration, dimensions, [profile.reel_size()],
+                    )
+                    crop_x = trajectory.expression() if trajectory else None
+            filter_complex = self._vertical_filter(width, height, reel_size=profile.reel_size(), crop_x=crop_x)
+            if captions and caption_window:
+                filter_complex = self._caption_filter(filter_complex, captions, *caption_window, profile.reel_size(),
+                                                      Path(output_path).parent / "captions")
+            
+            cache_key = await self._artifact_key('vertical', input_path, profile, filter=filter_complex)
+            if self._fetch_cached(cache_key, output_path):
+                logger.info(f"Artifact cache hit: {output_path}")
+                return True
             
             cmd = [
                 self.ffmpeg_path,
                 '-i', input_path,
                 '-vf', filter_complex,
-                '-c:v', 'libx264',
-                '-c:a', 'aac',
-                '-q:v', '6',
-                '-preset', 'fast',
+                *self._encode_args(threads, profile),
+                '-movflags', '+faststart',
                 str(output_path),
                 '-y'
             ]
             
             logger.info(f"FFmpeg command: {' '.join(cmd)}")
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=600)
+            result = await run_process(cmd, timeout=600)
             
-            if result.returncode == 0:
+            if result.ok:
+                self._store_cached(cache_key, output_path)
                 logger.info(f"Vertical reel created: {output_path}")
                 return True
             else:
@@ -225,27 +1329,110 @@ class VideoProcessingService:
             logger.error(f"Error in _convert_to_vertical: {str(e)}")
             return False
     
+    async def verify_output(self, file_path: Optional[str], expected_duration: float) -> bool:
+        """
+        Cheap integrity check for a previously written chunk or reel
+        
+        The file must exist, be non-empty, be readable by ffprobe (a truncated MP4
+        has no moov atom and fails here) and match the expected duration within
+        checkpoint_duration_tolerance. No frames are decoded.
+        """
+        if not file_path or not os.path.isfile(file_path) or os.path.getsize(file_path) == 0:
+            return False
+        
+        info = await self.media_probe.probe(file_path)
+        if not info or not info.has_video:
+            return False
+        
+        return abs(info.duration - expected_duration) <= settings.checkpoint_duration_tolerance
+    
+    async def restore_checkpoints(self, completed: Optional[Dict[str, Dict]], items: List[Dict]) -> Dict[int, Dict]:
+        """Checkpointed outputs for the given chunks that still pass verify_output, keyed by chunk number"""
+        restored = {}
+        for item in items:
+            saved = (completed or {}).get(str(item['chunk_number']))
+            if not saved:
+                continue
+            # Reels with bumpers are longer than their planned range by the bumper length
+            if await self.verify_output(saved.get('file_path'), item['duration'] + saved.get('bumper_duration', 0)):
+                restored[item['chunk_number']] = saved
+            else:
+                logger.warning(f"Checkpoint for chunk {item['chunk_number']} failed integrity check, redoing it")
+        return restored
+    
+    async def _artifact_key(self, kind: str, input_path: str, profile: Optional[EncoderProfile] = None,
+                            encode: Optional[List[str]] = None, **params) -> Optional[str]:
+        """
+        Cache key for encoding input_path with the given stage parameters
+        
+        Covers the source digest, the parameters and the encoder arguments (the
+        profile's unless `encode` is given; thread caps excluded). Returns None when
+        the artifact cache is disabled.
+        """
+        if not self.artifact_cache:
+            return None
+        digest = await self.artifact_cache.file_digest(input_path)
+        encode = encode if encode is not None else self._encode_args(profile=profile)
+        return self.artifact_cache.make_key(kind, source=digest, encode=encode, **params)
+    
+    def _fetch_cached(self, cache_key: Optional[str], output_path: str) -> bool:
+        """Place a cached artifact at output_path; on a miss, clear the path for a fresh encode"""
+        if cache_key and self.artifact_cache.fetch(cache_key, output_path):
+            return True
+        # Never let ffmpeg overwrite a file that may be hard-linked into the cache
+        Path(output_path).unlink(missing_ok=True)
+        return False
+    
+    def _store_cached(self, cache_key: Optional[str], output_path: str) -> None:
+        if cache_key:
+            self.artifact_cache.store(cache_key, output_path)
+    
+    def _vertical_filter(self, width: int, height: int, reel_size: Optional[Tuple[int, int]] = None,
+                         layout: Optional[str] = None, tag: str = "", crop_x: Optional[str] = None) -> str:
+        """
+        Build the filter that fits a width x height frame into the reel canvas
+        
+        Scales to fit within 1080x1920 (or the encoder profile's reel_size) while
+        maintaining aspect ratio, then fills the rest with black bars (layout "pad",
+        the default settings.reel_layout) or, with layout "blur", a blurred copy of
+        the frame. Layout "crop" instead fills the canvas with a crop of the frame, centered
+        or following crop_x (a SmartCropper trajectory).
+        """
+        reel_width, reel_height = reel_size or (self.reel_width, self.reel_height)
+        
+        # Calculate scaling to fit 1080x1920
+        # If video is wider, scale to 1080 width
+        if width / height > reel_width / reel_height:
+            # Video is too wide, scale by width
+            scale_width = reel_width
+            scale_height = int(reel_width * height / width)
+        else:
+            # Video is too tall, scale by height
+            scale_height = reel_height
+            scale_width = int(reel_height * width / height)
+        
+        logger.info(f"Scaling to: {scale_width}x{scale_height}")
+        
+        # FFmpeg filter to scale and center on the canvas
+        return layout_filter(layout or settings.reel_layout, f"scale={scale_width}:{scale_height}",
+                             reel_width, reel_height, tag, source_size=(width, height), crop_x=crop_x)
+    
     async def _get_video_dimensions(self, video_path: str) -> Optional[Tuple[int, int]]:
-        """Get video dimensions (width, height) using ffprobe"""
+        """Get video dimensions (width, height) from the memoized media probe"""
         try:
-            cmd = [
-                self.ffprobe_path,
-                '-v', 'error',
-                '-select_streams', 'v:0',
-                '-show_entries', 'stream=width,height',
-                '-of', 'csv=p=0',
-                video_path
-            ]
-            
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-            
-            if result.returncode == 0:
-                width, height = map(int, result.stdout.strip().split(','))
-                return (width, height)
-            else:
-                logger.error(f"ffprobe error: {result.stderr}")
-                return None
+            info = await self.media_probe.probe(video_path)
+            return info.dimensions if info else None
         
         except Exception as e:
             logger.error(f"Error getting video dimensions: {str(e)}")
             return None
+    
+    async def _get_audio_codec(self, video_path: str) -> Optional[str]:
+        """Get the codec name of the first audio stream from the memoized media probe"""
+        try:
+            info = await self.media_probe.probe(video_path)
+            return info.audio_codec if info else None
+        
+        except Exception as e:
+            logger.error(f"Error getting audio codec: {str(e)}")
+            return None
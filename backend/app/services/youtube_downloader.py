@@ -1,10 +1,14 @@
 import os
-import subprocess
 import json
 import logging
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 from pathlib import Path
+from app.core.config import get_settings
+from app.services.captions import CaptionSegment, parse_vtt
+from app.services.encoder_profiles import default_profile
+from app.services.format_selector import DEFAULT_FORMAT, FormatSelector
+from app.utils.process_runner import run_process
 
 logger = logging.getLogger(__name__)
 
@@ -25,7 +29,7 @@ class YouTubeDownloader:
             return url.split("youtu.be/")[1].split("?")[0]
         return ""
     
-    def download_video(self, url: str) -> Tuple[str, Dict]:
+    async def download_video(self, url: str) -> Tuple[str, Dict]:
         """Download video and metadata"""
         video_id = self.extract_video_id(url)
         if not video_id:
@@ -35,32 +39,45 @@ class YouTubeDownloader:
         os.makedirs(video_dir, exist_ok=True)
         
         try:
-            # Download video with metadata
+            # Fetch metadata first so the format can be sized to the reel
+            info_file = os.path.join(video_dir, "video.info.json")
+            result = await run_process([self.yt_dlp_path, "-J", url], timeout=600)
+            
+            if not result.ok:
+                logger.error(f"yt-dlp error: {result.stderr}")
+                raise Exception(f"Metadata fetch failed: {result.stderr}")
+            
+            metadata = json.loads(result.stdout)
+            with open(info_file, 'w') as f:
+                json.dump(metadata, f)
+            
+            source_format = None
+            format_selector = DEFAULT_FORMAT
+            if get_settings().download_format_mode == "auto":
+                choice = FormatSelector(*default_profile().reel_size(), layout=get_settings().reel_layout).select(metadata)
+                if choice:
+                    format_selector = choice.format_selector
+                    source_format = choice.to_dict()
+            
+            # Download video from the saved metadata
             cmd = [
                 self.yt_dlp_path,
-                "-f", "bestvideo[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]/best",
+                "--load-info-json", info_file,
+                "-f", format_selector,
+                "--merge-output-format", "mp4",
                 "-o", os.path.join(video_dir, "video.mp4"),
-                "--write-info-json",
                 "--write-auto-sub",
                 "--sub-lang", "en",
                 "--skip-download" if os.path.exists(os.path.join(video_dir, "video.mp4")) else "",
-                url
             ]
             cmd = [c for c in cmd if c]  # Remove empty strings
             
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=600)
+            result = await run_process(cmd, timeout=600)
             
-            if result.returncode != 0:
+            if not result.ok:
                 logger.error(f"yt-dlp error: {result.stderr}")
                 raise Exception(f"Download failed: {result.stderr}")
             
-            # Read metadata
-            info_file = os.path.join(video_dir, "video.info.json")
-            metadata = {}
-            if os.path.exists(info_file):
-                with open(info_file, 'r') as f:
-                    metadata = json.load(f)
-            
             video_path = os.path.join(video_dir, "video.mp4")
             
             return video_path, {
@@ -69,14 +86,15 @@ class YouTubeDownloader:
                 "thumbnail_url": metadata.get("thumbnail", ""),
                 "duration": metadata.get("duration", 0),
                 "video_id": video_id,
-                "video_dir": video_dir
+                "video_dir": video_dir,
+                "source_format": source_format,
             }
         
         except Exception as e:
             logger.error(f"Download error: {str(e)}")
             raise
     
-    def download_audio(self, url: str, video_dir: str) -> str:
+    async def download_audio(self, url: str, video_dir: str) -> str:
         """Download audio for speech-to-text"""
         try:
             audio_path = os.path.join(video_dir, "audio.m4a")
@@ -88,9 +106,9 @@ class YouTubeDownloader:
                 url
             ]
             
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=600)
+            result = await run_process(cmd, timeout=600)
             
-            if result.returncode != 0:
+            if not result.ok:
                 raise Exception(f"Audio download failed: {result.stderr}")
             
             return audio_path
@@ -109,15 +127,9 @@ class TranscriptExtractor:
     def get_auto_transcript(self, video_dir: str) -> str:
         """Get auto-generated transcript from yt-dlp"""
         try:
-            # Look for .vtt subtitle file
-            vtt_files = []
-            for root, dirs, files in os.walk(video_dir):
-                for f in files:
-                    if f.endswith('.vtt'):
-                        vtt_files.append(os.path.join(root, f))
-            
-            if vtt_files:
-                transcript = self._parse_vtt(vtt_files[0])
+            vtt_file = self._find_vtt(video_dir)
+            if vtt_file:
+                transcript = self._parse_vtt(vtt_file)
                 if transcript.strip():
                     return transcript
             
@@ -127,6 +139,24 @@ class TranscriptExtractor:
             logger.error(f"Transcript extraction error: {str(e)}")
             return ""
     
+    def get_caption_segments(self, video_dir: str) -> List[CaptionSegment]:
+        """Timed caption lines from the yt-dlp subtitle file, for burning into reels"""
+        try:
+            vtt_file = self._find_vtt(video_dir)
+            return parse_vtt(vtt_file) if vtt_file else []
+        
+        except Exception as e:
+            logger.error(f"Caption extraction error: {str(e)}")
+            return []
+    
+    def _find_vtt(self, video_dir: str) -> Optional[str]:
+        """First .vtt subtitle file written by yt-dlp under video_dir"""
+        for root, dirs, files in os.walk(video_dir):
+            for f in sorted(files):
+                if f.endswith('.vtt'):
+                    return os.path.join(root, f)
+        return None
+    
     def _parse_vtt(self, vtt_file: str) -> str:
         """Parse WebVTT subtitle file"""
         try:
@@ -2,16 +2,21 @@
 
 import asyncio
 import os
-import subprocess
 import json
-from typing import Optional, Dict, Any, Tuple
+from typing import Callable, List, Optional, Dict, Any, Tuple
 from pathlib import Path
 import logging
 from datetime import datetime
 import yt_dlp
+from yt_dlp.utils import download_range_func
 from google.cloud import speech_v1
 from app.core.config import get_settings
+from app.services.encoder_profiles import default_profile
+from app.services.format_selector import DEFAULT_FORMAT, FormatSelector
+from app.services.loudness import MEASURE_FILTER, parse_ebur128, save_profile
+from app.services.media_probe import get_media_probe
 from app.utils.helpers import get_logger
+from app.utils.process_runner import run_process, process_slot
 
 logger = get_logger(__name__)
 settings = get_settings()
@@ -56,18 +61,30 @@ class YouTubeService:
             
             logger.info(f"Starting YouTube download: {youtube_url}")
             
+            # Fetch formats first so the download can be sized to the reel
+            info = await self._extract_info(youtube_url, {'quiet': True, 'socket_timeout': 30}, download=False)
+            format_selector, source_format = self._choose_format(info)
+            
             # Configure yt-dlp options
             ydl_opts = {
-                'format': 'bestvideo[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]/best',
+                'format': format_selector,
+                'merge_output_format': 'mp4',
                 'outtmpl': str(video_dir / '%(id)s.%(ext)s'),
                 'quiet': False,
                 'no_warnings': False,
                 'socket_timeout': 30,
             }
+            if settings.burn_captions or settings.highlight_top_k:
+                # Timed subtitles next to the video, burned into the reels and/or used for highlight ranking
+                ydl_opts.update({
+                    'writesubtitles': True,
+                    'writeautomaticsub': True,
+                    'subtitleslangs': ['en'],
+                    'subtitlesformat': 'vtt',
+                })
             
-            # Download video
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(youtube_url, download=True)
+            # Download video (yt-dlp library is blocking, so run it off the event loop)
+            info = await self._process_info(info, ydl_opts)
             
             video_path = video_dir / f"{video_id}.mp4"
             
@@ -99,6 +116,7 @@ class YouTubeService:
                 'thumbnail_url': thumbnail_url,
                 'youtube_video_id': video_id,
                 'file_size': os.path.getsize(video_path),
+                'source_format': source_format,
             }
             
             logger.info(f"YouTube download complete. Duration: {duration}s, Size: {result['file_size']} bytes")
@@ -108,26 +126,241 @@ class YouTubeService:
             logger.error(f"Error downloading YouTube video: {str(e)}", exc_info=True)
             return False, None
     
+    async def download_video_progressive(self, youtube_url: str, video_id: str,
+                                         on_chunk_ready: Optional[Callable[[Dict], None]] = None) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """
+        Download a YouTube video and cut it into chunks while it is still downloading
+        
+        yt-dlp writes the stream to stdout, which ffmpeg remuxes to the usual
+        source path and segments on the fly. Chunks are planned from the video's
+        shared plan over the metadata duration; once the stream ends, the last
+        chunks are fitted to the probed duration, so they match batch mode
+        exactly. on_chunk_ready is called for each chunk as soon as it is cut.
+        
+        Returns: (success, result_dict) - same as download_video, plus "chunks"
+        """
+        try:
+            from app.services.video_service import VideoProcessingService
+            
+            video_dir = Path(self.storage_base) / video_id
+            video_dir.mkdir(parents=True, exist_ok=True)
+            
+            info = await self._extract_info(youtube_url, {'quiet': True, 'socket_timeout': 30}, download=False)
+            duration = info.get('duration')
+            
+            if not duration or info.get('is_live'):
+                # Boundaries can't be planned up front, so take the batch path
+                logger.info("Duration unknown before download, falling back to batch download")
+                return await self.download_video(youtube_url, video_id)
+            
+            logger.info(f"Starting progressive YouTube download: {youtube_url} ({duration}s)")
+            
+            video_path = video_dir / f"{video_id}.mp4"
+            read_fd, write_fd = os.pipe()
+            
+            format_selector, source_format = self._choose_format(info)
+            download_cmd = [
+                settings.yt_dlp_path,
+                '-f', format_selector,
+                '-o', '-',
+                '--quiet',
+                '--no-part',
+                '--socket-timeout', '30',
+                youtube_url,
+            ]
+            
+            # Both processes own one end of the pipe; whichever exits first makes the other see EOF/EPIPE
+            download_result, (cut_ok, chunks) = await asyncio.gather(
+                run_process(download_cmd, timeout=settings.job_timeout, stdout_fd=write_fd),
+                VideoProcessingService().cut_from_stream(read_fd, str(video_path), video_id, duration, on_chunk_ready),
+            )
+            
+            if not download_result.ok:
+                logger.error(f"yt-dlp error: {download_result.stderr}")
+                return False, None
+            
+            if not cut_ok or not video_path.exists():
+                logger.error(f"Progressive cutting failed for {video_path}")
+                return False, None
+            
+            logger.info(f"Video downloaded and cut progressively: {video_path}")
+            # Later stages plan with the probed duration, as after a batch download
+            duration = chunks[-1]['end_time'] if chunks else duration
+            
+            audio_path = await self._extract_audio(str(video_path), video_id)
+            transcript = await self._get_transcript(youtube_url, video_id)
+            
+            result = {
+                'video_path': str(video_path),
+                'audio_path': audio_path,
+                'transcript': transcript,
+                'duration': duration,
+                'title': info.get('title'),
+                'description': info.get('description', ''),
+                'thumbnail_url': info.get('thumbnail'),
+                'youtube_video_id': video_id,
+                'file_size': os.path.getsize(video_path),
+                'source_format': source_format,
+                'chunks': chunks,
+            }
+            
+            logger.info(f"Progressive download complete. Duration: {duration}s, Chunks: {len(chunks)}")
+            return True, result
+        
+        except Exception as e:
+            logger.error(f"Error in progressive YouTube download: {str(e)}", exc_info=True)
+            return False, None
+    
+    async def _extract_info(self, youtube_url: str, ydl_opts: Dict[str, Any], download: bool) -> Dict[str, Any]:
+        """Run yt-dlp in a worker thread, within the yt-dlp concurrency cap"""
+        def extract() -> Dict[str, Any]:
+            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                return ydl.extract_info(youtube_url, download=download)
+        
+        async with process_slot(settings.yt_dlp_path):
+            return await asyncio.to_thread(extract)
+    
+    async def download_video_sections(self, youtube_url: str, video_id: str,
+                                      time_ranges: Optional[List[Dict]] = None,
+                                      max_reels: Optional[int] = None) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """
+        Download only the parts of a video needed for the selected reels
+        
+        Chunks come from the video's shared full plan and are then filtered by
+        time_ranges and max_reels, so numbers and boundaries match a full run
+        (VideoProcessingService.plan_video_chunks). Consecutive chunks are
+        merged into sections, and each section is downloaded with yt-dlp
+        download_ranges, with keyframes forced at the cuts.
+        
+        Returns: (success, result_dict)
+        result_dict: same metadata as download_video, with "sections" instead of a single
+        video_path: [{"start_time", "end_time", "file_path", "chunks": [...]}, ...]
+        """
+        try:
+            from app.services.video_service import VideoProcessingService
+            video_service = VideoProcessingService()
+            
+            video_dir = Path(self.storage_base) / video_id
+            video_dir.mkdir(parents=True, exist_ok=True)
+            
+            info = await self._extract_info(youtube_url, {'quiet': True, 'socket_timeout': 30}, download=False)
+            duration = info.get('duration')
+            if not duration:
+                logger.error(f"Cannot plan sections without a duration: {youtube_url}")
+                return False, None
+            
+            plan = await video_service.plan_video_chunks(video_dir, duration, cutting=True)
+            selected = video_service.select_chunks(plan, time_ranges, max_reels)
+            if not selected:
+                logger.error(f"No chunks match the requested ranges for {youtube_url}")
+                return False, None
+            
+            sections = video_service.group_sections(selected)
+            format_selector, source_format = self._choose_format(info)
+            
+            logger.info(f"Downloading {len(sections)} sections ({len(selected)}/{len(plan)} chunks): {youtube_url}")
+            
+            ydl_opts = {
+                'format': format_selector,
+                'merge_output_format': 'mp4',
+                'outtmpl': str(video_dir / f'{video_id}.section_%(section_start)d.%(ext)s'),
+                'download_ranges': download_range_func(None, [(section['start_time'], section['end_time']) for section in sections]),
+                'force_keyframes_at_cuts': True,
+                'quiet': False,
+                'no_warnings': False,
+                'socket_timeout': 30,
+            }
+            await self._process_info(info, ydl_opts)
+            
+            for section in sections:
+                section_path = video_dir / f"{video_id}.section_{int(section['start_time'])}.mp4"
+                if not section_path.exists():
+                    logger.error(f"Section file not found after download: {section_path}")
+                    return False, None
+                section['file_path'] = str(section_path)
+            
+            transcript = await self._get_transcript(youtube_url, video_id)
+            
+            result = {
+                'video_path': None,
+                'audio_path': None,
+                'transcript': transcript,
+                'duration': duration,
+                'title': info.get('title'),
+                'description': info.get('description', ''),
+                'thumbnail_url': info.get('thumbnail'),
+                'youtube_video_id': video_id,
+                'file_size': sum(os.path.getsize(section['file_path']) for section in sections),
+                'source_format': source_format,
+                'sections': sections,
+            }
+            
+            logger.info(f"Section download complete. Chunks: {[chunk['chunk_number'] for chunk in selected]}")
+            return True, result
+        
+        except Exception as e:
+            logger.error(f"Error downloading YouTube sections: {str(e)}", exc_info=True)
+            return False, None
+    
+    async def _process_info(self, info: Dict[str, Any], ydl_opts: Dict[str, Any]) -> Dict[str, Any]:
+        """Download from an already extracted info dict, so the page is not fetched twice"""
+        def process() -> Dict[str, Any]:
+            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                return ydl.process_ie_result(info, download=True)
+        
+        async with process_slot(settings.yt_dlp_path):
+            return await asyncio.to_thread(process)
+    
+    def _choose_format(self, info: Dict[str, Any]) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """
+        Format selector for the download, sized to the reel and its layout unless download_format_mode is "best"
+        
+        Returns: (format_selector, source_format) - source_format is reported in the job result
+        """
+        if settings.download_format_mode != "auto":
+            return DEFAULT_FORMAT, None
+        
+        choice = FormatSelector(*default_profile().reel_size(), layout=settings.reel_layout).select(info)
+        if not choice:
+            return DEFAULT_FORMAT, None
+        return choice.format_selector, choice.to_dict()
+    
     async def _extract_audio(self, video_path: str, video_id: str) -> Optional[str]:
-        """Extract audio from video using FFmpeg"""
+        """
+        Extract audio from video using FFmpeg
+        
+        The same decode also measures EBU R128 loudness (ebur128 on an asplit
+        branch). The profile is stored next to the video for per-reel loudnorm.
+        """
         try:
             audio_path = Path(self.storage_base) / video_id / f"{video_id}_audio.m4a"
             
             cmd = [
                 self.ffmpeg_path,
+                '-nostats',
                 '-i', video_path,
+                '-filter_complex', f"[0:a:0]asplit=2[audio][measure];[measure]{MEASURE_FILTER},anullsink",
+                '-map', '[audio]',
                 '-q:a', '0',  # highest quality audio
-                '-map', 'a',
                 '-c:a', 'aac',
                 str(audio_path),
                 '-y'  # overwrite
             ]
             
             logger.info(f"Extracting audio from video: {video_path}")
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=600)
+            # The loudness frame log is longer than the stderr tail run_process keeps
+            log = []
+            result = await run_process(cmd, timeout=600, on_stderr_line=log.append)
             
-            if result.returncode == 0 and audio_path.exists():
+            if result.ok and audio_path.exists():
                 logger.info(f"Audio extracted: {audio_path}")
+                loudness = parse_ebur128('\n'.join(log))
+                if loudness:
+                    save_profile(video_path, loudness)
+                    logger.info(
+                        f"Source loudness: {loudness.source.integrated} LUFS, "
+                        f"true peak {loudness.source.true_peak} dBTP, LRA {loudness.source.lra} LU"
+                    )
                 return str(audio_path)
             else:
                 logger.error(f"FFmpeg error: {result.stderr}")
@@ -217,25 +450,10 @@ class YouTubeService:
             logger.error(f"Error in speech-to-text: {str(e)}")
             return None
     
-    def get_video_duration(self, video_path: str) -> Optional[float]:
-        """Get video duration using ffprobe"""
+    async def get_video_duration(self, video_path: str) -> Optional[float]:
+        """Get video duration from the memoized media probe"""
         try:
-            cmd = [
-                self.ffprobe_path,
-                '-v', 'error',
-                '-show_entries', 'format=duration',
-                '-of', 'default=noprint_wrappers=1:nokey=1:noesc=1',
-                video_path
-            ]
-            
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-            
-            if result.returncode == 0:
-                duration = float(result.stdout.strip())
-                return duration
-            else:
-                logger.error(f"ffprobe error: {result.stderr}")
-                return None
+            return await get_media_probe(self.ffprobe_path).get_duration(video_path)
         
         except Exception as e:
             logger.error(f"Error getting video duration: {str(e)}")
@@ -2,7 +2,10 @@
 
 import logging
 import json
+import os
+import re
 from pathlib import Path
+from typing import Optional
 from app.core.config import get_settings
 
 settings = get_settings()
@@ -19,6 +22,12 @@ def get_logger(name: str) -> logging.Logger:
     return logging.getLogger(name)
 
 
+def escape_filter_path(path) -> str:
+    """Escape a file path for use as an option value inside an ffmpeg filter graph"""
+    value = str(path).replace('\\', '/').replace(':', r'\:').replace("'", r"\'")
+    return re.sub(r"([\\',;\[\]])", r"\\\1", value)
+
+
 def validate_youtube_url(url: str) -> bool:
     """Validate if URL is a valid YouTube URL"""
     try:
@@ -59,3 +68,36 @@ def load_json(filepath: str) -> dict:
     except Exception as e:
         get_logger(__name__).error(f"Error loading JSON: {str(e)}")
         return {}
+
+
+def sidecar_path(media_path: str, kind: str) -> Path:
+    """Where analysis results of a media file are stored: <name>.<kind>.json next to it"""
+    path = Path(media_path)
+    return path.with_name(f"{path.stem}.{kind}.json")
+
+
+def write_sidecar(media_path: str, kind: str, data: dict) -> bool:
+    """Store analysis results next to the media file, tagged with its size and mtime"""
+    try:
+        stat = os.stat(media_path)
+        sidecar_path(media_path, kind).write_text(json.dumps({
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'data': data,
+        }))
+        return True
+    except Exception as e:
+        get_logger(__name__).warning(f"Could not save {kind} sidecar for {media_path}: {str(e)}")
+        return False
+
+
+def read_sidecar(media_path: str, kind: str) -> Optional[dict]:
+    """Stored analysis results of a media file, or None if missing or the file changed since"""
+    try:
+        stat = os.stat(media_path)
+        saved = json.loads(sidecar_path(media_path, kind).read_text())
+        if saved.get('size') != stat.st_size or saved.get('mtime_ns') != stat.st_mtime_ns:
+            return None
+        return saved['data']
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
@@ -0,0 +1,172 @@
+"""Non-blocking subprocess runner for ffmpeg, ffprobe and yt-dlp"""
+
+import asyncio
+import os
+import signal
+import time
+import weakref
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+from app.core.config import get_settings
+from app.utils.helpers import get_logger
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+# Keep only the tail of stderr; ffmpeg can print megabytes of progress on long jobs
+STDERR_TAIL_LINES = 200
+
+# Semaphores are bound to an event loop, and RQ jobs may each run in their own loop
+_loop_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]" = weakref.WeakKeyDictionary()
+
+
+@dataclass
+class ProcessResult:
+    """Outcome of a finished subprocess"""
+    cmd: List[str]
+    returncode: int
+    stdout: str = ""
+    stderr: str = ""
+    elapsed: float = 0.0
+    timed_out: bool = False
+    stderr_lines: List[str] = field(default_factory=list)
+    
+    @property
+    def ok(self) -> bool:
+        return self.returncode == 0 and not self.timed_out
+
+
+def _binary_limit(binary: str) -> int:
+    """Concurrency cap for a binary, matched on its configured path"""
+    limits = {
+        os.path.basename(settings.ffmpeg_path): settings.ffmpeg_max_concurrency,
+        os.path.basename(settings.ffprobe_path): settings.ffprobe_max_concurrency,
+        os.path.basename(settings.yt_dlp_path): settings.yt_dlp_max_concurrency,
+    }
+    return limits.get(binary) or os.cpu_count() or 1
+
+
+def _get_semaphore(binary: str) -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    semaphores = _loop_semaphores.setdefault(loop, {})
+    if binary not in semaphores:
+        semaphores[binary] = asyncio.Semaphore(_binary_limit(binary))
+    return semaphores[binary]
+
+
+def process_slot(binary: str) -> asyncio.Semaphore:
+    """
+    Concurrency slot for a binary, for work that does not go through run_process
+    
+    Usage: async with process_slot("yt-dlp"): await asyncio.to_thread(...)
+    """
+    return _get_semaphore(os.path.basename(binary))
+
+
+def _kill_process_group(process: asyncio.subprocess.Process) -> None:
+    """Kill the process and anything it spawned (yt-dlp runs ffmpeg as a child)"""
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+async def _read_stderr(stream: asyncio.StreamReader, tail: deque,
+                       on_line: Optional[Callable[[str], None]]) -> None:
+    """Read stderr incrementally, splitting on both \\n and ffmpeg's \\r progress updates"""
+    buffer = b""
+    while True:
+        chunk = await stream.read(4096)
+        if not chunk:
+            break
+        buffer += chunk.replace(b"\r", b"\n")
+        *lines, buffer = buffer.split(b"\n")
+        for raw in lines:
+            line = raw.decode(errors="replace").rstrip()
+            if not line:
+                continue
+            tail.append(line)
+            if on_line:
+                on_line(line)
+    if buffer.strip():
+        line = buffer.decode(errors="replace").rstrip()
+        tail.append(line)
+        if on_line:
+            on_line(line)
+
+
+async def run_process(
+    cmd: List[str],
+    timeout: Optional[float] = None,
+    capture_stdout: bool = True,
+    on_stderr_line: Optional[Callable[[str], None]] = None,
+    stdin_fd: Optional[int] = None,
+    stdout_fd: Optional[int] = None,
+) -> ProcessResult:
+    """
+    Run a command with asyncio.create_subprocess_exec
+    
+    - Waits for a free slot in the per-binary concurrency cap
+    - Streams stderr line by line to on_stderr_line while keeping a bounded tail
+    - Kills the whole process group on timeout or when the awaiting task is cancelled
+    - stdin_fd / stdout_fd connect the process to a pipe (e.g. yt-dlp -o - into ffmpeg -i pipe:0);
+      run_process takes ownership and closes them in this process once the child has started
+    
+    Returns: ProcessResult (returncode -1 and timed_out=True on timeout)
+    """
+    binary = os.path.basename(cmd[0])
+    if stdout_fd is not None:
+        capture_stdout = False
+    
+    async with process_slot(binary):
+        started = time.monotonic()
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdin=stdin_fd if stdin_fd is not None else asyncio.subprocess.DEVNULL,
+                stdout=stdout_fd if stdout_fd is not None else (
+                    asyncio.subprocess.PIPE if capture_stdout else asyncio.subprocess.DEVNULL
+                ),
+                stderr=asyncio.subprocess.PIPE,
+                start_new_session=True,  # Own process group so children die with it
+            )
+        finally:
+            # The child holds its own copies; ours must close so the pipe can reach EOF
+            for fd in (stdin_fd, stdout_fd):
+                if fd is not None:
+                    os.close(fd)
+        
+        tail: deque = deque(maxlen=STDERR_TAIL_LINES)
+        stderr_task = asyncio.ensure_future(_read_stderr(process.stderr, tail, on_stderr_line))
+        stdout_task = asyncio.ensure_future(process.stdout.read()) if capture_stdout else None
+        
+        timed_out = False
+        try:
+            await asyncio.wait_for(process.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            timed_out = True
+            logger.error(f"{binary} timed out after {timeout}s, killing process group {process.pid}")
+            _kill_process_group(process)
+            await process.wait()
+        except asyncio.CancelledError:
+            _kill_process_group(process)
+            await process.wait()
+            stderr_task.cancel()
+            if stdout_task:
+                stdout_task.cancel()
+            raise
+        
+        await stderr_task
+        stdout = (await stdout_task).decode(errors="replace") if stdout_task else ""
+        
+        lines = list(tail)
+        return ProcessResult(
+            cmd=cmd,
+            returncode=-1 if timed_out else process.returncode,
+            stdout=stdout,
+            stderr="\n".join(lines),
+            elapsed=time.monotonic() - started,
+            timed_out=timed_out,
+            stderr_lines=lines,
+        )
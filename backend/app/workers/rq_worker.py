@@ -14,7 +14,7 @@ logger = get_logger(__name__)
 settings = get_settings()
 
 # Connect to Redis
-redis_conn = Redis.from_url(settings.rq_redis_url)
+redis_conn = Redis.from_url(settings.redis_url)
 job_queue = Queue(connection=redis_conn)
 
 
@@ -67,17 +67,130 @@ def update_job_status(job_id: int, status: JobStatus, progress: float = None, re
         logger.error(f"Error updating job status: {str(e)}")
 
 
+def load_job_checkpoint(job_id: int, stage: str) -> dict:
+    """
+    Load completed per-chunk outputs recorded for a pipeline stage
+    
+    Falls back to the latest earlier job of the same type for the same video,
+    so a re-enqueued job resumes where the crashed one stopped. The inherited
+    outputs are copied to this job, so a later retry still finds all of them.
+    
+    Returns: {"<chunk_number>": {...chunk or reel dict...}}
+    """
+    try:
+        db = SessionLocal()
+        job = db.query(Job).filter(Job.id == job_id).first()
+        checkpoint = {}
+        
+        if job:
+            checkpoint = (job.checkpoint or {}).get(stage) or {}
+            
+            if not checkpoint and job.video_id is not None:
+                previous = db.query(Job).filter(
+                    Job.video_id == job.video_id,
+                    Job.job_type == job.job_type,
+                    Job.id != job.id,
+                    Job.checkpoint.isnot(None),
+                ).order_by(Job.id.desc()).first()
+                if previous:
+                    checkpoint = (previous.checkpoint or {}).get(stage) or {}
+                    logger.info(f"Job {job_id} resuming from checkpoint of job {previous.id}")
+                    if checkpoint:
+                        job.checkpoint = {**(job.checkpoint or {}), stage: checkpoint}
+                        db.commit()
+        
+        db.close()
+        
+        if checkpoint:
+            logger.info(f"Job {job_id} has {len(checkpoint)} checkpointed {stage} outputs")
+        return dict(checkpoint)
+    
+    except Exception as e:
+        logger.error(f"Error loading job checkpoint: {str(e)}")
+        return {}
+
+
+def save_job_checkpoint(job_id: int, stage: str, item: dict, total: int = None):
+    """Record one completed chunk/reel output for a stage"""
+    try:
+        db = SessionLocal()
+        _record_checkpoint(db, job_id, stage, item, total)
+        db.commit()
+        db.close()
+    
+    except Exception as e:
+        logger.error(f"Error saving job checkpoint: {str(e)}")
+
+
+def _record_checkpoint(db: Session, job_id: int, stage: str, item: dict, total: int = None):
+    """Add one output to the job's stage checkpoint in the given session, without committing"""
+    job = db.query(Job).filter(Job.id == job_id).first()
+    if not job:
+        return
+    
+    checkpoint = dict(job.checkpoint or {})
+    stage_items = dict(checkpoint.get(stage) or {})
+    stage_items[str(item['chunk_number'])] = item
+    checkpoint[stage] = stage_items
+    
+    # Reassign so SQLAlchemy detects the JSON change
+    job.checkpoint = checkpoint
+    job.completed_steps = len(stage_items)
+    if total is not None:
+        job.total_steps = total
+    job.updated_at = datetime.utcnow()
+
+
+def load_video_selection(video_id: str) -> tuple:
+    """
+    Selection stored for a video by the API (POST /api/video/youtube or /process)
+    
+    Returns: (time_ranges, max_reels), both None when the whole video is to be processed
+    """
+    try:
+        from app.models.video import Video
+        
+        db = SessionLocal()
+        video = db.query(Video).filter(Video.youtube_video_id == video_id).first()
+        selection = ((video.video_metadata or {}).get('selection') if video else None) or {}
+        db.close()
+        
+        return selection.get('time_ranges') or None, selection.get('max_reels')
+    
+    except Exception as e:
+        logger.error(f"Error loading video selection: {str(e)}")
+        return None, None
+
+
 # Background job functions
 
-async def process_youtube_download_job(job_id: int, youtube_url: str, video_id: str):
-    """Background job: Download YouTube video"""
+async def process_youtube_download_job(job_id: int, youtube_url: str, video_id: str,
+                                       time_ranges: list = None, max_reels: int = None):
+    """
+    Background job: Download YouTube video
+    
+    Only the selected sections are downloaded when time_ranges/max_reels are
+    given, or else when a selection is stored for the video.
+    """
     try:
         update_job_status(job_id, JobStatus.PROCESSING, 0)
         
+        if not time_ranges and not max_reels:
+            time_ranges, max_reels = load_video_selection(video_id)
+        
         from app.services.youtube_service import YouTubeService
         yt_service = YouTubeService()
         
-        success, result = await yt_service.download_video(youtube_url, video_id)
+        if time_ranges or max_reels:
+            success, result = await yt_service.download_video_sections(youtube_url, video_id, time_ranges, max_reels)
+        elif settings.ingest_mode == "progressive":
+            # Record chunks as they are cut so progress shows before the download finishes
+            success, result = await yt_service.download_video_progressive(
+                youtube_url, video_id,
+                on_chunk_ready=lambda chunk: save_job_checkpoint(job_id, 'cutting', chunk),
+            )
+        else:
+            success, result = await yt_service.download_video(youtube_url, video_id)
         
         if success:
             update_job_status(job_id, JobStatus.COMPLETED, 100, result)
@@ -89,15 +202,35 @@ async def process_youtube_download_job(job_id: int, youtube_url: str, video_id:
         update_job_status(job_id, JobStatus.FAILED, 0, error=str(e))
 
 
-async def process_video_cutting_job(job_id: int, video_path: str, video_id: str, duration: float):
-    """Background job: Cut video into chunks"""
+async def process_video_cutting_job(job_id: int, video_path: str, video_id: str, duration: float, sections: list = None):
+    """
+    Background job: Cut video into chunks (or only the downloaded sections of it)
+    
+    A full video is cut only where the selection stored for it (if any) asks.
+    """
     try:
         update_job_status(job_id, JobStatus.PROCESSING, 10)
         
         from app.services.video_service import VideoProcessingService
         video_service = VideoProcessingService()
         
-        success, chunks = await video_service.cut_into_sequential_chunks(video_path, video_id, duration)
+        if sections:
+            success, chunks = await video_service.cut_sections(sections, video_id)
+            if success:
+                update_job_status(job_id, JobStatus.COMPLETED, 100, {'chunks': chunks})
+            else:
+                update_job_status(job_id, JobStatus.FAILED, 0, error="Cutting failed")
+            return
+        
+        time_ranges, max_reels = load_video_selection(video_id)
+        total = video_service.planned_count(duration, time_ranges, max_reels)
+        success, chunks = await video_service.cut_into_sequential_chunks(
+            video_path, video_id, duration,
+            time_ranges=time_ranges,
+            max_reels=max_reels,
+            completed=load_job_checkpoint(job_id, 'cutting'),
+            on_chunk_done=lambda chunk: save_job_checkpoint(job_id, 'cutting', chunk, total),
+        )
         
         if success:
             update_job_status(job_id, JobStatus.COMPLETED, 100, {'chunks': chunks})
@@ -117,7 +250,11 @@ async def process_vertical_conversion_job(job_id: int, chunks: list, video_id: s
         from app.services.video_service import VideoProcessingService
         video_service = VideoProcessingService()
         
-        success, reels = await video_service.convert_to_vertical_reels(chunks, video_id)
+        success, reels = await video_service.convert_to_vertical_reels(
+            chunks, video_id,
+            completed=load_job_checkpoint(job_id, 'vertical_conversion'),
+            on_reel_done=lambda reel: save_job_checkpoint(job_id, 'vertical_conversion', reel, len(chunks)),
+        )
         
         if success:
             update_job_status(job_id, JobStatus.COMPLETED, 100, {'reels': reels})
@@ -129,6 +266,38 @@ async def process_vertical_conversion_job(job_id: int, chunks: list, video_id: s
         update_job_status(job_id, JobStatus.FAILED, 0, error=str(e))
 
 
+async def process_direct_reel_job(job_id: int, video_path: str, video_id: str, duration: float, keep_chunks: bool = False):
+    """
+    Background job: Cut and convert the source straight to vertical reels (one encode per reel)
+    
+    Only the ranges of the selection stored for the video (if any) are rendered.
+    """
+    try:
+        update_job_status(job_id, JobStatus.PROCESSING, 10)
+        
+        from app.services.video_service import VideoProcessingService
+        video_service = VideoProcessingService()
+        
+        time_ranges, max_reels = load_video_selection(video_id)
+        total = video_service.planned_count(duration, time_ranges, max_reels)
+        success, reels = await video_service.render_reels_from_source(
+            video_path, video_id, duration, keep_chunks=keep_chunks,
+            time_ranges=time_ranges,
+            max_reels=max_reels,
+            completed=load_job_checkpoint(job_id, 'direct_reel'),
+            on_reel_done=lambda reel: save_job_checkpoint(job_id, 'direct_reel', reel, total),
+        )
+        
+        if success:
+            update_job_status(job_id, JobStatus.COMPLETED, 100, {'reels': reels})
+        else:
+            update_job_status(job_id, JobStatus.FAILED, 0, error="Direct reel rendering failed")
+    
+    except Exception as e:
+        logger.error(f"Job {job_id} error: {str(e)}")
+        update_job_status(job_id, JobStatus.FAILED, 0, error=str(e))
+
+
 async def process_ai_generation_job(job_id: int, reels: list, transcript: str = None, custom_caption: str = None, video_id: int = None):
     """Background job: Generate AI metadata for reels"""
     try:
@@ -147,13 +316,7 @@ async def process_ai_generation_job(job_id: int, reels: list, transcript: str =
         for i, reel in enumerate(reels):
             if custom_caption:
                 # Use custom caption instead of AI generation
-                metadata = {
-                    'title': f"Reel {i+1}",
-                    'caption': custom_caption,
-                    'hashtags': ['#reels', '#viral', '#content', '#shorts', '#trending'],
-                    'topics': ['entertainment'],
-                    'quality_score': 0.8
-                }
+                metadata = _custom_caption_metadata(i + 1, custom_caption)
             else:
                 metadata = await ai_service.generate_reel_metadata(
                     transcript=transcript,
@@ -164,21 +327,7 @@ async def process_ai_generation_job(job_id: int, reels: list, transcript: str =
             reels_with_ai.append(reel)
 
             # Save reel to database
-            db_reel = Reel(
-                video_id=video_id,
-                chunk_id=reel.get('chunk_number'),  # Assuming chunk_number is used as chunk_id
-                reel_number=i+1,
-                file_path=reel.get('file_path'),
-                file_size=reel.get('file_size'),
-                duration=reel.get('duration'),
-                title=metadata.get('title'),
-                caption=metadata.get('caption'),
-                hashtags=metadata.get('hashtags'),
-                topics=metadata.get('topics'),
-                quality_score=metadata.get('quality_score'),
-                quality_grade=ai_service.calculate_quality_grade(metadata.get('quality_score', 0)),
-            )
-            db.add(db_reel)
+            db.add(_build_reel_row(reel, metadata, i + 1, video_id, ai_service))
 
             progress = 30 + int((i + 1) / total * 50)  # 30-80%
             update_job_status(job_id, JobStatus.PROCESSING, progress)
@@ -193,6 +342,132 @@ async def process_ai_generation_job(job_id: int, reels: list, transcript: str =
         update_job_status(job_id, JobStatus.FAILED, 0, error=str(e))
 
 
+async def process_streaming_pipeline_job(job_id: int, video_path: str, video_id: str, duration: float,
+                                         transcript: str = None, custom_caption: str = None, video_db_id: int = None):
+    """
+    Background job: Render and annotate reels as a streaming pipeline
+    
+    Each reel is saved to the database as soon as it has been rendered and
+    annotated, instead of after the whole video has passed every stage. Only
+    the ranges of the selection stored for the video (if any) are rendered.
+    """
+    try:
+        update_job_status(job_id, JobStatus.PROCESSING, 10)
+        
+        from app.services.reel_pipeline import StreamingReelPipeline
+        pipeline = StreamingReelPipeline()
+        time_ranges, max_reels = load_video_selection(video_id)
+        total = pipeline.video_service.planned_count(duration, time_ranges, max_reels)
+        
+        metadata_factory = None
+        if custom_caption:
+            async def metadata_factory(reel: dict) -> dict:
+                return _custom_caption_metadata(reel['reel_number'], custom_caption)
+        
+        completed = load_job_checkpoint(job_id, 'direct_reel')
+        # Reels an earlier attempt already saved are not annotated or inserted again
+        ready = [reel['reel_number'] for reel in completed.values() if reel.get('saved')]
+        
+        def on_reel_ready(reel: dict):
+            db = SessionLocal()
+            try:
+                db.add(_build_reel_row(reel, reel['metadata'], reel['reel_number'], video_db_id, pipeline.ai_service))
+                # Same transaction as the row, so a resumed job can tell exactly which reels were saved
+                _record_checkpoint(db, job_id, 'direct_reel', {**reel, 'saved': True}, total)
+                db.commit()
+            finally:
+                db.close()
+            
+            ready.append(reel['reel_number'])
+            update_job_status(job_id, JobStatus.PROCESSING, 10 + int(len(ready) / total * 85))
+        
+        reels = await pipeline.run(
+            video_path, video_id, duration,
+            transcript=transcript,
+            metadata_factory=metadata_factory,
+            on_reel_rendered=lambda reel: save_job_checkpoint(job_id, 'direct_reel', reel, total),
+            on_reel_ready=on_reel_ready,
+            completed=completed,
+            time_ranges=time_ranges,
+            max_reels=max_reels,
+        )
+        
+        # Rows were saved as reels became ready; covers are extracted after the last one
+        _save_reel_covers(video_db_id, reels)
+        
+        update_job_status(job_id, JobStatus.COMPLETED, 100, {'reels': reels})
+    
+    except Exception as e:
+        logger.error(f"Job {job_id} error: {str(e)}")
+        update_job_status(job_id, JobStatus.FAILED, 0, error=str(e))
+
+
+def _save_reel_covers(video_id: int, reels: list):
+    """Record cover and thumbnail paths on the video's saved Reel rows"""
+    from app.models.reel import Reel
+    
+    covers = {reel['reel_number']: reel for reel in reels if reel.get('cover_path')}
+    if not covers:
+        return
+    
+    db = SessionLocal()
+    try:
+        for row in db.query(Reel).filter(Reel.video_id == video_id, Reel.reel_number.in_(list(covers))).all():
+            row.cover_path = covers[row.reel_number]['cover_path']
+            row.thumbnail_path = covers[row.reel_number].get('thumbnail_path')
+        db.commit()
+    finally:
+        db.close()
+
+
+def _custom_caption_metadata(reel_number: int, custom_caption: str) -> dict:
+    """Reel metadata used instead of AI generation when the user supplied a caption"""
+    return {
+        'title': f"Reel {reel_number}",
+        'caption': custom_caption,
+        'hashtags': ['#reels', '#viral', '#content', '#shorts', '#trending'],
+        'topics': ['entertainment'],
+    }
+
+
+def _build_reel_row(reel: dict, metadata: dict, reel_number: int, video_id: int, ai_service):
+    """Build the Reel database row (with its aspect-ratio variants) for a rendered reel and its metadata"""
+    from app.models.reel import Reel, ReelFingerprint, ReelVariant
+    from app.services.fingerprints import ReelPrint
+    
+    fingerprint = reel.get('fingerprint')
+    return Reel(
+        video_id=video_id,
+        chunk_id=reel.get('chunk_number'),  # Assuming chunk_number is used as chunk_id
+        reel_number=reel_number,
+        file_path=reel.get('file_path'),
+        file_size=reel.get('file_size'),
+        duration=reel.get('duration'),
+        cover_path=reel.get('cover_path'),
+        thumbnail_path=reel.get('thumbnail_path'),
+        preview_path=reel.get('preview_path'),
+        sprite_sheet=reel.get('sprite_sheet'),
+        title=metadata.get('title'),
+        caption=metadata.get('caption'),
+        hashtags=metadata.get('hashtags'),
+        topics=metadata.get('topics'),
+        quality_score=reel.get('quality_score'),
+        quality_grade=ai_service.calculate_quality_grade(reel.get('quality_score')),
+        quality_metrics=reel.get('quality_metrics'),
+        variants=[
+            ReelVariant(
+                aspect=variant['aspect'],
+                width=variant['width'],
+                height=variant['height'],
+                file_path=variant['file_path'],
+                file_size=variant.get('file_size'),
+            )
+            for variant in reel.get('variants') or []
+        ],
+        fingerprint=ReelFingerprint(**ReelPrint.from_dict(fingerprint).encoded()) if fingerprint else None,
+    )
+
+
 async def process_token_refresh_job(job_id: int, instagram_token_id: int):
     """Background job: Refresh Instagram long-lived access token"""
     try:
@@ -0,0 +1,37 @@
+"""Database migration: Add per-chunk checkpoint column to jobs
+
+Run this migration using Python:
+    python migrate_job_checkpoints.py
+"""
+
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from app.db.database import engine
+
+def migrate():
+    """Add checkpoint column to jobs table"""
+    
+    with engine.connect() as conn:
+        print("Starting migration: Add job checkpoints...")
+        
+        try:
+            # Add checkpoint column (JSON is stored as TEXT on SQLite)
+            conn.execute(text(
+                "ALTER TABLE jobs ADD COLUMN checkpoint JSON"
+            ))
+            print("✓ Added checkpoint column")
+        except Exception as e:
+            print(f"  checkpoint already exists or error: {e}")
+        
+        conn.commit()
+        print("\nMigration completed successfully!")
+        print("\nNext steps:")
+        print("1. Restart backend server and RQ workers")
+
+if __name__ == "__main__":
+    migrate()
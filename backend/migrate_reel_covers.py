@@ -0,0 +1,37 @@
+"""Database migration: Add cover and thumbnail columns to reels
+
+Run this migration using Python:
+    python migrate_reel_covers.py
+"""
+
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from app.db.database import engine
+
+def migrate():
+    """Add cover_path and thumbnail_path columns to reels table"""
+    
+    with engine.connect() as conn:
+        print("Starting migration: Add reel covers...")
+        
+        for column in ("cover_path", "thumbnail_path"):
+            try:
+                conn.execute(text(
+                    f"ALTER TABLE reels ADD COLUMN {column} VARCHAR(500)"
+                ))
+                print(f"✓ Added {column} column")
+            except Exception as e:
+                print(f"  {column} already exists or error: {e}")
+        
+        conn.commit()
+        print("\nMigration completed successfully!")
+        print("\nNext steps:")
+        print("1. Restart backend server and RQ workers")
+
+if __name__ == "__main__":
+    migrate()
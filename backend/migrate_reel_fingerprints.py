@@ -0,0 +1,33 @@
+"""Database migration: Add the reel_fingerprints table
+
+Run this migration using Python:
+    python migrate_reel_fingerprints.py
+"""
+
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db.database import engine
+from app.models.reel import ReelFingerprint
+
+def migrate():
+    """Create reel_fingerprints table"""
+    
+    print("Starting migration: Add reel fingerprints...")
+    
+    try:
+        ReelFingerprint.__table__.create(bind=engine, checkfirst=True)
+        print("✓ Created reel_fingerprints table")
+    except Exception as e:
+        print(f"  reel_fingerprints already exists or error: {e}")
+    
+    print("\nMigration completed successfully!")
+    print("\nNext steps:")
+    print("1. Restart backend server and RQ workers")
+    print("2. Reels rendered from now on are fingerprinted; older reels are not checked for repeats")
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,37 @@
+"""Database migration: Add preview proxy and sprite sheet columns to reels
+
+Run this migration using Python:
+    python migrate_reel_previews.py
+"""
+
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from app.db.database import engine
+
+def migrate():
+    """Add preview_path and sprite_sheet columns to reels table"""
+    
+    with engine.connect() as conn:
+        print("Starting migration: Add reel previews...")
+        
+        for column, column_type in (("preview_path", "VARCHAR(500)"), ("sprite_sheet", "JSON")):
+            try:
+                conn.execute(text(
+                    f"ALTER TABLE reels ADD COLUMN {column} {column_type}"
+                ))
+                print(f"✓ Added {column} column")
+            except Exception as e:
+                print(f"  {column} already exists or error: {e}")
+        
+        conn.commit()
+        print("\nMigration completed successfully!")
+        print("\nNext steps:")
+        print("1. Restart backend server and RQ workers")
+
+if __name__ == "__main__":
+    migrate()
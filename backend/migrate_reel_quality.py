@@ -0,0 +1,36 @@
+"""Database migration: Add the measured quality metrics column to reels
+
+Run this migration using Python:
+    python migrate_reel_quality.py
+"""
+
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from app.db.database import engine
+
+def migrate():
+    """Add quality_metrics column to reels table"""
+    
+    with engine.connect() as conn:
+        print("Starting migration: Add reel quality metrics...")
+        
+        try:
+            conn.execute(text(
+                "ALTER TABLE reels ADD COLUMN quality_metrics JSON"
+            ))
+            print("✓ Added quality_metrics column")
+        except Exception as e:
+            print(f"  quality_metrics already exists or error: {e}")
+        
+        conn.commit()
+        print("\nMigration completed successfully!")
+        print("\nNext steps:")
+        print("1. Restart backend server and RQ workers")
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,109 @@
+"""Benchmark encoder profiles: encode speed, output size and quality per profile
+
+Renders the same reel range of a source once per profile and prints a table.
+
+Run from the backend directory:
+    python scripts/benchmark_encoder_profiles.py /path/to/source.mp4
+    python scripts/benchmark_encoder_profiles.py source.mp4 --start 60 --duration 35 --profiles draft standard --ssim
+"""
+
+import argparse
+import asyncio
+import os
+import re
+import sys
+import tempfile
+import time
+
+# Add backend directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import get_settings
+from app.services.encode_pool import EncodePool
+from app.services.encoder_profiles import LADDER, get_profile, select_profile
+from app.services.media_probe import get_media_probe
+from app.services.video_service import VideoProcessingService
+from app.utils.process_runner import run_process
+
+settings = get_settings()
+
+
+async def measure_ssim(reference_filter: str, source: str, start: float, duration: float, output: str) -> float:
+    """SSIM of the encoded reel against the same range of the source run through the same filter, unencoded"""
+    cmd = [
+        settings.ffmpeg_path,
+        '-i', output,
+        '-ss', str(start), '-t', str(duration), '-i', source,
+        '-lavfi', f"[1:v]{reference_filter}[ref];[0:v][ref]ssim",
+        '-f', 'null', '-',
+    ]
+    result = await run_process(cmd, timeout=settings.job_timeout)
+    match = re.search(r"All:([0-9.]+)", result.stderr)
+    return float(match.group(1)) if match else float('nan')
+
+
+async def benchmark(source: str, start: float, duration: float, profiles: list, with_ssim: bool):
+    video_service = VideoProcessingService()
+    info = await get_media_probe(settings.ffprobe_path).probe(source)
+    if not info or not info.dimensions:
+        print(f"Could not probe {source}")
+        return
+
+    threads = EncodePool().cpu_budget
+    print(f"Source: {source} ({info.width}x{info.height}, {info.video_codec}, {(info.video_bit_rate or info.bit_rate or 0) // 1000} kbps)")
+    print(f"Automatic selection: {select_profile(info).name}")
+    print(f"Range: {start}s + {duration}s, {threads} threads\n")
+
+    header = f"{'profile':<10} {'reel':>9} {'seconds':>9} {'x realtime':>11} {'kbps':>8} {'MB':>8}"
+    if with_ssim:
+        header += f" {'ssim':>8}"
+    print(header)
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        for name in profiles:
+            profile = get_profile(name)
+            width, height = profile.reel_size()
+            vertical_filter = video_service._vertical_filter(*info.dimensions, reel_size=(width, height))
+            output = os.path.join(work_dir, f"{name}.mp4")
+
+            cmd = [
+                settings.ffmpeg_path,
+                '-ss', str(start), '-i', source, '-t', str(duration),
+                '-map', '0:v:0', '-map', '0:a:0?',
+                '-vf', vertical_filter,
+                *profile.encode_args(threads),
+                output, '-y',
+            ]
+
+            started = time.monotonic()
+            result = await run_process(cmd, timeout=settings.job_timeout)
+            elapsed = time.monotonic() - started
+
+            if not result.ok:
+                print(f"{name:<10} failed: {result.stderr[-300:]}")
+                continue
+
+            size = os.path.getsize(output)
+            row = (
+                f"{name:<10} {f'{width}x{height}':>9} {elapsed:>9.2f} {duration / elapsed:>11.2f} "
+                f"{size * 8 / duration / 1000:>8.0f} {size / 1e6:>8.2f}"
+            )
+            if with_ssim:
+                row += f" {await measure_ssim(vertical_filter, source, start, duration, output):>8.4f}"
+            print(row)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark encoder profiles on a source video")
+    parser.add_argument("source", help="Source video file")
+    parser.add_argument("--start", type=float, default=0.0, help="Range start in seconds")
+    parser.add_argument("--duration", type=float, default=float(settings.chunk_duration), help="Range length in seconds")
+    parser.add_argument("--profiles", nargs="+", default=LADDER, help="Profiles to compare")
+    parser.add_argument("--ssim", action="store_true", help="Also measure SSIM against the unencoded range")
+    args = parser.parse_args()
+
+    asyncio.run(benchmark(args.source, args.start, args.duration, args.profiles, args.ssim))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Benchmark reel layouts: CPU cost of the blurred background and smart crop over plain black bars
+
+Encodes the same reel range with each layout and prints the time and the overhead
+relative to "pad". "blur_fullres" is the usual full-resolution boxblur recipe, for
+comparison with the downscaled blur the pipeline uses. The "crop" time includes
+the smart crop analysis pass, which is also printed on its own.
+
+Run from the backend directory:
+    python scripts/benchmark_reel_layouts.py /path/to/source.mp4
+    python scripts/benchmark_reel_layouts.py source.mp4 --start 60 --duration 35 --profile draft
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+# Add backend directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import get_settings
+from app.services.encode_pool import EncodePool
+from app.services.encoder_profiles import get_profile
+from app.services.media_probe import get_media_probe
+from app.services.reel_layout import BLUR_DOWNSCALE, BLUR_RADIUS
+from app.services.smart_crop import SmartCropper
+from app.services.video_service import VideoProcessingService
+from app.utils.process_runner import run_process
+
+settings = get_settings()
+
+
+def full_resolution_blur(foreground_scale: str, width: int, height: int) -> str:
+    """Reference layout: the same blur strength applied at full canvas resolution"""
+    return (
+        f"split=2[fg][bg];"
+        f"[bg]scale={width}:{height}:force_original_aspect_ratio=increase,crop={width}:{height},"
+        f"boxblur={BLUR_RADIUS * BLUR_DOWNSCALE}:2[blurred];"
+        f"[fg]{foreground_scale}[front];"
+        f"[blurred][front]overlay=(W-w)/2:(H-h)/2"
+    )
+
+
+async def benchmark(source: str, start: float, duration: float, profile_name: str):
+    video_service = VideoProcessingService()
+    info = await get_media_probe(settings.ffprobe_path).probe(source)
+    if not info or not info.dimensions:
+        print(f"Could not probe {source}")
+        return
+
+    profile = get_profile(profile_name)
+    width, height = profile.reel_size()
+    threads = EncodePool().cpu_budget
+
+    pad_filter = video_service._vertical_filter(*info.dimensions, reel_size=(width, height), layout='pad')
+    foreground_scale = pad_filter.split(',pad=')[0]
+    layouts = [
+        ('pad', pad_filter),
+        ('blur', video_service._vertical_filter(*info.dimensions, reel_size=(width, height), layout='blur')),
+        ('blur_fullres', full_resolution_blur(foreground_scale, width, height)),
+    ]
+
+    # Fresh analysis every run: a stored trajectory would hide its cost
+    started = time.monotonic()
+    trajectory, = await SmartCropper(settings.ffmpeg_path).track(
+        source, start, duration, info.dimensions, [(width, height)], use_stored=False,
+    )
+    analysis_time = time.monotonic() - started
+    crop_x = trajectory.expression() if trajectory else None
+    layouts.append(('crop', video_service._vertical_filter(
+        *info.dimensions, reel_size=(width, height), layout='crop', crop_x=crop_x,
+    )))
+
+    print(f"Source: {source} ({info.width}x{info.height}), profile {profile.name} -> {width}x{height}")
+    print(f"Range: {start}s + {duration}s, {threads} threads\n")
+    print(f"{'layout':<13} {'seconds':>9} {'x realtime':>11} {'overhead':>9}")
+
+    baseline = None
+    with tempfile.TemporaryDirectory() as work_dir:
+        for name, layout in layouts:
+            output = os.path.join(work_dir, f"{name}.mp4")
+            cmd = [
+                settings.ffmpeg_path,
+                '-ss', str(start), '-i', source, '-t', str(duration),
+                '-map', '0:v:0', '-an',
+                '-vf', layout,
+                *profile.encode_args(threads),
+                output, '-y',
+            ]
+
+            started = time.monotonic()
+            result = await run_process(cmd, timeout=settings.job_timeout)
+            elapsed = time.monotonic() - started
+            if name == 'crop':
+                elapsed += analysis_time
+
+            if not result.ok:
+                print(f"{name:<13} failed: {result.stderr[-300:]}")
+                continue
+
+            baseline = baseline or elapsed
+            print(f"{name:<13} {elapsed:>9.2f} {duration / elapsed:>11.2f} {(elapsed / baseline - 1) * 100:>8.1f}%")
+
+    print(f"\nSmart crop analysis: {analysis_time:.2f}s of the crop layout's total")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the blurred-background and smart crop reel layouts against black bars")
+    parser.add_argument("source", help="Source video file")
+    parser.add_argument("--start", type=float, default=0.0, help="Range start in seconds")
+    parser.add_argument("--duration", type=float, default=float(settings.chunk_duration), help="Range length in seconds")
+    parser.add_argument("--profile", default="standard", help="Encoder profile to render with")
+    args = parser.parse_args()
+
+    asyncio.run(benchmark(args.source, args.start, args.duration, args.profile))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,22 @@
+"""Test settings: a throwaway SQLite database, created before the app is imported"""
+
+import os
+import tempfile
+
+_db_dir = tempfile.mkdtemp(prefix='reelai_tests_')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_db_dir, 'test.db')}"
+
+import pytest  # noqa: E402
+from app.db.database import SessionLocal, engine  # noqa: E402
+from app.models import Base  # noqa: E402
+
+
+@pytest.fixture
+def db():
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        Base.metadata.drop_all(bind=engine)
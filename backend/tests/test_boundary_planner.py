@@ -0,0 +1,39 @@
+"""The stored chunk plan must only pin boundaries that chunks were actually cut at"""
+
+import asyncio
+from app.core.config import get_settings
+from app.services.boundary_planner import PLAN_FILE, BoundaryPlanner, fit_boundaries, uniform_boundaries
+from app.utils.helpers import load_json
+
+
+def test_uniform_and_fitted_boundaries():
+    assert uniform_boundaries(80.0, 35) == [35, 70, 80.0]
+    assert fit_boundaries([35, 70, 80.0], 80.7) == [35, 70, 80.7]
+    assert fit_boundaries([35, 70, 71.0], 69.5) == [35, 69.5]
+
+
+def test_plan_without_source_is_stored_only_when_cut(tmp_path, monkeypatch):
+    monkeypatch.setattr(get_settings(), 'boundary_snapping', True)
+    planner = BoundaryPlanner()
+    missing = str(tmp_path / 'source.mp4')
+
+    ends = asyncio.run(planner.video_boundaries(tmp_path, 80.0, 35, missing))
+    assert ends == [35, 70, 80.0]
+    assert not (tmp_path / PLAN_FILE).exists()
+
+    asyncio.run(planner.video_boundaries(tmp_path, 80.0, 35, missing, cutting=True))
+    assert load_json(str(tmp_path / PLAN_FILE))['ends'] == [35, 70, 80.0]
+
+
+def test_stored_plan_is_replaced_when_snapping_settings_change(tmp_path, monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, 'boundary_snapping', False)
+    planner = BoundaryPlanner()
+    asyncio.run(planner.video_boundaries(tmp_path, 80.0, 35))
+    assert load_json(str(tmp_path / PLAN_FILE))['snapping']['enabled'] is False
+
+    monkeypatch.setattr(settings, 'boundary_snapping', True)
+    asyncio.run(planner.video_boundaries(tmp_path, 80.0, 35, cutting=True))
+    stored = load_json(str(tmp_path / PLAN_FILE))
+    assert stored['snapping'] == {'enabled': True, 'tolerance': settings.boundary_tolerance}
+    assert stored['reason'] == "the source is not on disk to analyse yet"
@@ -0,0 +1,35 @@
+"""Crop-layout covers of long videos must not build a nested per-reel expression"""
+
+import asyncio
+from app.core.config import get_settings
+from app.services import video_service
+from app.services.encoder_profiles import default_profile
+from app.services.media_probe import MediaInfo
+from app.services.smart_crop import CropTrajectory
+from app.services.video_service import RenderSpec, VideoProcessingService
+
+REELS = 200
+
+
+class FixedCropper:
+    def __init__(self, ffmpeg_path=None):
+        pass
+
+    async def track(self, media_path, start_time, duration, source_size, canvas_sizes, use_stored=True):
+        return [CropTrajectory(segments=[(0.0, duration, 0.25, 0.75)])]
+
+
+def test_crop_cover_filter_is_flat(monkeypatch):
+    monkeypatch.setattr(get_settings(), 'reel_layout', 'crop')
+    monkeypatch.setattr(video_service, 'SmartCropper', FixedCropper)
+    service = VideoProcessingService()
+    spec = RenderSpec(vertical_filter='static', copy_audio=True, profile=default_profile(),
+                      source=MediaInfo(path='source.mp4', duration=7000.0, size=0, width=1920, height=1080))
+    reels = [{'reel_number': n, 'start_time': n * 35.0, 'end_time': n * 35.0 + 35.0} for n in range(REELS)]
+
+    cover_filter = asyncio.run(service._cover_layout_filter('source.mp4', spec, reels))
+
+    assert 'if(' not in cover_filter
+    assert cover_filter.count('gte(t,') == REELS
+    # Covers are searched around the middle of each reel, where this trajectory is centred
+    assert '*0.5000' in cover_filter
@@ -0,0 +1,59 @@
+"""Only live reels of the owner's other videos may make a planned range a repeat"""
+
+import asyncio
+from app.core.config import get_settings
+from app.models.reel import Reel
+from app.models.video import Video
+from app.services.fingerprints import other_owned_reels
+from app.services.video_service import VideoProcessingService
+
+
+def _add_reel(db, video):
+    reel = Reel(video_id=video.id, chunk_id=1, reel_number=1, file_path='reel.mp4', duration=35.0)
+    db.add(reel)
+    db.commit()
+    return reel.id
+
+
+def test_other_owned_reels(db):
+    videos = {
+        youtube_id: Video(youtube_url=f"https://youtu.be/{youtube_id}", youtube_video_id=youtube_id, user_id=user_id)
+        for youtube_id, user_id in (('planned', 1), ('older', 1), ('stranger', 2))
+    }
+    db.add_all(videos.values())
+    db.commit()
+
+    own_older = _add_reel(db, videos['older'])
+    same_video = _add_reel(db, videos['planned'])
+    other_user = _add_reel(db, videos['stranger'])
+    deleted = _add_reel(db, videos['older'])
+    db.delete(db.get(Reel, deleted))
+    db.commit()
+
+    assert other_owned_reels([own_older, same_video, other_user, deleted], 'planned') == {own_older}
+    assert other_owned_reels([own_older], 'unknown') == set()
+
+
+def test_batch_cutting_skips_repeated_ranges(tmp_path, monkeypatch):
+    monkeypatch.setattr(get_settings(), 'chunking_mode', 'segment')
+    service = VideoProcessingService()
+    service.storage_base = str(tmp_path)
+    plan = service.plan_chunks(105.0, [35.0, 70.0, 105.0])
+
+    async def plan_source_chunks(video_path, total_duration):
+        return plan
+
+    async def skip_duplicate_ranges(video_path, video_id, ranges):
+        return [{**planned, 'fingerprint': {'frames': []}} for planned in ranges if planned['chunk_number'] != 2]
+
+    async def cut_single_pass(video_path, chunks_dir, section, threads=None):
+        return True, section
+
+    monkeypatch.setattr(service, 'plan_source_chunks', plan_source_chunks)
+    monkeypatch.setattr(service, 'skip_duplicate_ranges', skip_duplicate_ranges)
+    monkeypatch.setattr(service, '_cut_single_pass', cut_single_pass)
+    success, chunks = asyncio.run(service.cut_into_sequential_chunks('source.mp4', 'video', 105.0))
+
+    assert success
+    assert [chunk['chunk_number'] for chunk in chunks] == [1, 3]
+    assert all(chunk['fingerprint'] for chunk in chunks)
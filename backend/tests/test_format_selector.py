@@ -0,0 +1,22 @@
+"""Source format choice must not upscale the reel in any layout"""
+
+from app.services.format_selector import FormatSelector
+
+INFO = {
+    'duration': 60,
+    'formats': [
+        {'format_id': f"{height}p", 'width': height * 16 // 9, 'height': height, 'vcodec': 'avc1', 'acodec': 'mp4a',
+         'ext': 'mp4', 'tbr': height * 4}
+        for height in (720, 1080, 1440, 2160)
+    ],
+}
+
+
+def test_letterbox_layouts_fit_the_width():
+    for layout in ('pad', 'blur'):
+        assert FormatSelector(1080, 1920, layout=layout).select(INFO).format_id == '720p'
+
+
+def test_crop_layout_needs_the_canvas_height():
+    assert FormatSelector(1080, 1920, layout='crop').select(INFO).format_id == '2160p'
+    assert FormatSelector(720, 1280, layout='crop').select(INFO).format_id == '1440p'
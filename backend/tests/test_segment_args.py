@@ -0,0 +1,78 @@
+"""Segment muxer arguments and the passes that use them must cut exactly the planned chunks"""
+
+import asyncio
+from pathlib import Path
+from app.core.config import get_settings
+from app.services.video_service import SEGMENT_NO_SPLIT, VideoProcessingService
+
+CHUNKS_DIR = Path('/tmp/chunks')
+
+
+def _value(args, flag):
+    return args[args.index(flag) + 1]
+
+
+def test_one_chunk_plan_is_split_and_capped_at_its_end():
+    service = VideoProcessingService()
+    args = service._segment_output_args(CHUNKS_DIR, service.plan_chunks(20.0))
+
+    assert _value(args, '-segment_times') == '20.000'
+    assert _value(args, '-t') == '20.000'
+    assert '-force_key_frames' not in args
+    assert '-segment_time' not in args
+
+
+def test_full_plan_splits_at_every_boundary():
+    service = VideoProcessingService()
+    plan = service.plan_chunks(80.02, [35.0, 70.0, 80.02])
+    args = service._segment_output_args(CHUNKS_DIR, plan)
+
+    assert _value(args, '-force_key_frames') == '35.000,70.000'
+    assert _value(args, '-segment_times') == '35.000,70.000,80.020'
+    assert _value(args, '-t') == '80.020'
+    assert _value(args, '-segment_start_number') == '1'
+
+
+def test_partial_plan_is_shifted_by_the_input_seek():
+    service = VideoProcessingService()
+    plan = service.plan_chunks(200.0, [35.0, 70.0, 105.0, 140.0, 175.0, 200.0])[2:4]
+    args = service._segment_output_args(CHUNKS_DIR, plan, offset=plan[0]['start_time'])
+
+    assert _value(args, '-force_key_frames') == '35.000'
+    assert _value(args, '-segment_times') == '35.000,70.000'
+    assert _value(args, '-t') == '70.000'
+    assert _value(args, '-segment_start_number') == '3'
+
+
+def test_uncapped_plan_runs_to_the_end_of_the_stream():
+    service = VideoProcessingService()
+    args = service._segment_output_args(CHUNKS_DIR, service.plan_chunks(20.0), capped=False)
+    assert '-t' not in args
+    assert _value(args, '-segment_time') == str(SEGMENT_NO_SPLIT)
+
+    args = service._segment_output_args(CHUNKS_DIR, service.plan_chunks(80.0, [35.0, 70.0, 80.0]), capped=False)
+    assert '-t' not in args
+    assert _value(args, '-segment_times') == '35.000,70.000'
+
+
+def test_segment_mode_cuts_each_section_in_its_own_pass(tmp_path, monkeypatch):
+    monkeypatch.setattr(get_settings(), 'chunking_mode', 'segment')
+    service = VideoProcessingService()
+    service.storage_base = str(tmp_path)
+    plan = service.plan_chunks(200.0, [35.0, 70.0, 105.0, 140.0, 175.0, 200.0])
+    passes = []
+
+    async def plan_source_chunks(video_path, total_duration):
+        return [plan[1], plan[2], plan[4]]
+
+    async def cut_single_pass(video_path, chunks_dir, section, threads=None):
+        passes.append([planned['chunk_number'] for planned in section])
+        return True, section
+
+    monkeypatch.setattr(service, 'plan_source_chunks', plan_source_chunks)
+    monkeypatch.setattr(service, '_cut_single_pass', cut_single_pass)
+    success, chunks = asyncio.run(service.cut_into_sequential_chunks('source.mp4', 'video', 200.0))
+
+    assert success
+    assert passes == [[2, 3], [5]]
+    assert [chunk['chunk_number'] for chunk in chunks] == [2, 3, 5]
@@ -0,0 +1,36 @@
+"""Smart-cut chunks are cached by the boundary encoder, not by an encoder profile"""
+
+import asyncio
+from pathlib import Path
+from app.core.config import get_settings
+from app.services import video_service
+from app.services.artifact_cache import ArtifactCache
+from app.services.encoder_profiles import get_profile
+from app.services.video_service import VideoProcessingService
+
+
+def test_smart_chunk_key_ignores_the_profile(tmp_path, monkeypatch):
+    monkeypatch.setattr(get_settings(), 'chunking_mode', 'smart')
+    cuts = []
+
+    class CountingCutter:
+        def __init__(self, ffmpeg_path=None, ffprobe_path=None):
+            pass
+
+        async def cut(self, input_path, output_path, start_time, duration, threads=None):
+            cuts.append(start_time)
+            Path(output_path).write_bytes(b'chunk')
+            return True
+
+    monkeypatch.setattr(video_service, 'SmartCutter', CountingCutter)
+    source = tmp_path / 'source.mp4'
+    source.write_bytes(b'source')
+    service = VideoProcessingService()
+    service.artifact_cache = ArtifactCache(root=str(tmp_path / 'cache'))
+
+    for name in ('draft', 'archival'):
+        output = tmp_path / f"chunk_{name}.mp4"
+        assert asyncio.run(service._cut_video(str(source), str(output), 0.0, 35.0, profile=get_profile(name)))
+        assert output.read_bytes() == b'chunk'
+
+    assert cuts == [0.0]
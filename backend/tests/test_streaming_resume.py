@@ -0,0 +1,83 @@
+"""Resuming the streaming reel pipeline must not annotate or save a reel twice"""
+
+import asyncio
+from pathlib import Path
+from app.models.reel import Job, JobStatus, Reel
+from app.services import reel_pipeline
+from app.workers import rq_worker
+
+CHUNKS = 3
+
+
+class RecordingVideoService:
+    """Plans CHUNKS ranges and "renders" each one by writing a small file, counting renders"""
+
+    def __init__(self, storage_base: Path):
+        self.storage_base = str(storage_base)
+        self.rendered = []
+
+    async def prepare_render(self, video_path):
+        return object()
+
+    async def plan_source_chunks(self, video_path, total_duration):
+        return [
+            {'chunk_number': number, 'start_time': (number - 1) * 10.0, 'end_time': number * 10.0, 'duration': 10.0}
+            for number in range(1, CHUNKS + 1)
+        ]
+
+    async def restore_checkpoints(self, completed, items):
+        return {item['chunk_number']: completed[str(item['chunk_number'])]
+                for item in items if str(item['chunk_number']) in (completed or {})}
+
+    async def skip_duplicate_ranges(self, video_path, video_id, plan):
+        return plan
+
+    async def render_reel_range(self, video_path, reels_dir, planned, spec, threads=None):
+        self.rendered.append(planned['chunk_number'])
+        path = Path(reels_dir) / f"reel_{planned['chunk_number']:03d}.mp4"
+        path.write_bytes(b'reel')
+        return {**planned, 'reel_number': planned['chunk_number'], 'file_path': str(path), 'file_size': 4}
+
+    async def extract_reel_covers(self, video_path, video_id, reels, spec):
+        return True, reels
+
+    def planned_count(self, total_duration, time_ranges=None, max_reels=None):
+        return CHUNKS
+
+
+def _run_job(job_id, service, monkeypatch):
+    monkeypatch.setattr(reel_pipeline, 'VideoProcessingService', lambda: service)
+    asyncio.run(rq_worker.process_streaming_pipeline_job(
+        job_id, 'source.mp4', 'video', CHUNKS * 10.0, custom_caption='caption', video_db_id=1,
+    ))
+
+
+def test_resume_does_not_save_reels_twice(db, tmp_path, monkeypatch):
+    job = Job(user_id=1, video_id=1, job_type='streaming_pipeline', status=JobStatus.PENDING)
+    db.add(job)
+    db.commit()
+
+    service = RecordingVideoService(tmp_path)
+    _run_job(job.id, service, monkeypatch)
+    assert db.query(Reel).filter(Reel.video_id == 1).count() == CHUNKS
+
+    # Simulate a crash after reel 3 was rendered and checkpointed but before it was saved
+    db.query(Reel).filter(Reel.reel_number == 3).delete()
+    db.refresh(job)
+    checkpoint = dict(job.checkpoint)
+    stage = dict(checkpoint['direct_reel'])
+    stage['3'] = {key: value for key, value in stage['3'].items() if key not in ('saved', 'metadata')}
+    job.checkpoint = {**checkpoint, 'direct_reel': stage}
+    db.commit()
+
+    resumed = Job(user_id=1, video_id=1, job_type='streaming_pipeline', status=JobStatus.PENDING)
+    db.add(resumed)
+    db.commit()
+    _run_job(resumed.id, service, monkeypatch)
+
+    db.expire_all()
+    assert db.query(Reel).filter(Reel.video_id == 1).count() == CHUNKS
+    assert sorted(row.reel_number for row in db.query(Reel).all()) == [1, 2, 3]
+    assert service.rendered == [1, 2, 3]
+    assert db.get(Job, resumed.id).status == JobStatus.COMPLETED
+    assert all(reel.get('saved') for reel in db.get(Job, resumed.id).checkpoint['direct_reel'].values())
@@ -0,0 +1,75 @@
+"""The selection stored by the API must reach every job that plans the video"""
+
+import asyncio
+import pytest
+from app.models.reel import Job, JobStatus
+from app.models.video import Video
+from app.services import video_service
+from app.workers import rq_worker
+
+TIME_RANGES = [{'start': 40.0, 'end': 80.0}]
+
+
+class RecordingYouTubeService:
+    calls = []
+
+    async def download_video_sections(self, youtube_url, video_id, time_ranges=None, max_reels=None):
+        self.calls.append((time_ranges, max_reels))
+        return True, {'sections': []}
+
+
+class RecordingVideoService:
+    calls = []
+
+    def planned_count(self, total_duration, time_ranges=None, max_reels=None):
+        return 1
+
+    async def cut_into_sequential_chunks(self, video_path, video_id, total_duration, time_ranges=None,
+                                         max_reels=None, completed=None, on_chunk_done=None):
+        self.calls.append((time_ranges, max_reels))
+        return True, []
+
+    async def render_reels_from_source(self, video_path, video_id, total_duration, keep_chunks=False,
+                                       time_ranges=None, max_reels=None, completed=None, on_reel_done=None):
+        self.calls.append((time_ranges, max_reels))
+        return True, []
+
+
+def _add_video_and_job(db, job_type):
+    db.add(Video(youtube_url='https://youtu.be/abc', youtube_video_id='abc',
+                 video_metadata={'selection': {'time_ranges': TIME_RANGES, 'max_reels': 2}}))
+    job = Job(user_id=1, job_type=job_type, status=JobStatus.PENDING)
+    db.add(job)
+    db.commit()
+    return job.id
+
+
+def test_download_job_uses_stored_selection(db, monkeypatch):
+    youtube_service = pytest.importorskip('app.services.youtube_service', exc_type=ImportError)
+    job_id = _add_video_and_job(db, 'youtube_download')
+    RecordingYouTubeService.calls = []
+    monkeypatch.setattr(youtube_service, 'YouTubeService', RecordingYouTubeService)
+
+    asyncio.run(rq_worker.process_youtube_download_job(job_id, 'https://youtu.be/abc', 'abc'))
+
+    assert RecordingYouTubeService.calls == [(TIME_RANGES, 2)]
+
+
+def test_cutting_job_uses_stored_selection(db, monkeypatch):
+    job_id = _add_video_and_job(db, 'video_cutting')
+    RecordingVideoService.calls = []
+    monkeypatch.setattr(video_service, 'VideoProcessingService', RecordingVideoService)
+
+    asyncio.run(rq_worker.process_video_cutting_job(job_id, 'abc.mp4', 'abc', 120.0))
+
+    assert RecordingVideoService.calls == [(TIME_RANGES, 2)]
+
+
+def test_direct_reel_job_uses_stored_selection(db, monkeypatch):
+    job_id = _add_video_and_job(db, 'direct_reel')
+    RecordingVideoService.calls = []
+    monkeypatch.setattr(video_service, 'VideoProcessingService', RecordingVideoService)
+
+    asyncio.run(rq_worker.process_direct_reel_job(job_id, 'abc.mp4', 'abc', 120.0))
+
+    assert RecordingVideoService.calls == [(TIME_RANGES, 2)]